@@ -0,0 +1,144 @@
+"""
+Benchmark of the text normalization of 8-K filings with the translation table and the combined header patterns,
+compared to the chain of single-character substitutions and header regexes that clean_text() ran before.
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_clean_text.py --filings 200
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from extract_items import ExtractItems  # noqa: E402
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures"
+)
+
+SPECIAL_CHARACTER_SUBSTITUTIONS = [
+    (r"[\xa0]", " "),
+    (r"[\u200b]", " "),
+    (r"[\x91]", "‘"),
+    (r"[\x92]", "’"),
+    (r"[\x93]", "“"),
+    (r"[\x94]", "”"),
+    (r"[\x95]", "•"),
+    (r"[\x96]", "-"),
+    (r"[\x97]", "-"),
+    (r"[\x98]", "˜"),
+    (r"[\x99]", "™"),
+    (r"[\u2010\u2011\u2012\u2013\u2014\u2015]", "-"),
+    (r"[\u2018]", "‘"),
+    (r"[\u2019]", "’"),
+    (r"[\u2009]", " "),
+    (r"[\u00ae]", "®"),
+    (r"[\u201c]", "“"),
+    (r"[\u201d]", "”"),
+]
+
+
+def clean_text_chain(text):
+    for pattern, substitution in SPECIAL_CHARACTER_SUBSTITUTIONS:
+        text = re.sub(pattern, substitution, text)
+
+    def remove_whitespace(match):
+        ws = r"[^\S\r\n]"
+        return f'{match[1]}{re.sub(ws, r"", match[2])}{match[3]}{match[4]}'
+
+    def remove_whitespace_signature(match):
+        ws = r"[^\S\r\n]"
+        return f'{match[1]}{re.sub(ws, r"", match[2])}{match[4]}{match[5]}'
+
+    text = re.sub(
+        r"(\n[^\S\r\n]*)(P[^\S\r\n]*A[^\S\r\n]*R[^\S\r\n]*T)([^\S\r\n]+)((\d{1,2}|[IV]{1,2})[AB]?)",
+        remove_whitespace,
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"(\n[^\S\r\n]*)(I[^\S\r\n]*T[^\S\r\n]*E[^\S\r\n]*M)([^\S\r\n]+)(\d{1,2}[AB]?)",
+        remove_whitespace,
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"(\n[^\S\r\n]*)(S[^\S\r\n]*I[^\S\r\n]*G[^\S\r\n]*N[^\S\r\n]*A[^\S\r\n]*T[^\S\r\n]*U[^\S\r\n]*R[^\S\r\n]*E[^\S\r\n]*(S|\([^\S\r\n]*s[^\S\r\n]*\))?)([^\S\r\n]+)([^\S\r\n]?)",
+        remove_whitespace_signature,
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"(ITEM|PART)(\s+\d{1,2}[AB]?)([\-•])",
+        r"\1\2 \3 ",
+        text,
+        flags=re.IGNORECASE,
+    )
+
+    regex_flags = re.IGNORECASE | re.MULTILINE
+    text = re.sub(
+        r"\n[^\S\r\n]*"
+        r"(TABLE\s+OF\s+CONTENTS|INDEX\s+TO\s+FINANCIAL\s+STATEMENTS|BACK\s+TO\s+CONTENTS|QUICKLINKS)"
+        r"[^\S\r\n]*\n",
+        "\n",
+        text,
+        flags=regex_flags,
+    )
+    text = re.sub(
+        r"\n[^\S\r\n]*[-‒–—]*\d+[-‒–—]*[^\S\r\n]*\n", "\n", text, flags=regex_flags
+    )
+    text = re.sub(r"\n[^\S\r\n]*\d+[^\S\r\n]*\n", "\n", text, flags=regex_flags)
+    text = re.sub(r"[\n\s]F[-‒–—]*\d+", "", text, flags=regex_flags)
+    text = re.sub(r"\n[^\S\r\n]*Page\s[\d*]+[^\S\r\n]*\n", "", text, flags=regex_flags)
+
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filings", type=int, default=200)
+    args = parser.parse_args()
+
+    filings_metadata_df = pd.read_csv(
+        os.path.join(FIXTURES, "FILINGS_METADATA_TEST.csv"), dtype=str
+    ).replace({np.nan: None})
+    filings_metadata_df = filings_metadata_df[filings_metadata_df["Type"] == "8-K"]
+
+    # The normalization works on the text of the filings without their HTML tags
+    texts = []
+    with zipfile.ZipFile(os.path.join(FIXTURES, "RAW_FILINGS", "8-K.zip")) as zf:
+        for filing_metadata in filings_metadata_df.iloc[: args.filings].to_dict(
+            "records"
+        ):
+            content = zf.read(f"8-K/{filing_metadata['filename']}").decode(
+                errors="backslashreplace"
+            )
+            texts.append(ExtractItems.strip_html(content))
+    megabytes = sum(len(text.encode()) for text in texts) / 1e6
+
+    start = time.perf_counter()
+    chain_texts = [clean_text_chain(text) for text in texts]
+    chain_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clean_texts = [ExtractItems.clean_text(text) for text in texts]
+    elapsed = time.perf_counter() - start
+
+    assert clean_texts == chain_texts
+
+    print(f"{len(texts)} 8-K filings, {megabytes:.1f} MB of text")
+    print(f"  substitution chain: {megabytes / chain_elapsed:.1f} MB/s")
+    print(f"  translation table: {megabytes / elapsed:.1f} MB/s")
+    print(f"  speedup: {chain_elapsed / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
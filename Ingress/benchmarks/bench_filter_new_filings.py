@@ -0,0 +1,108 @@
+"""
+Benchmark of the "only download new filings" step of download_filings.main() on a synthetic filings metadata file.
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_filter_new_filings.py --rows 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from download_filings import filter_new_filings  # noqa: E402
+from metadata_store import FILINGS_METADATA_COLUMNS  # noqa: E402
+
+
+def make_filings(n_rows: int, offset: int = 0) -> pd.DataFrame:
+    """
+    Creates n_rows synthetic filings, numbered from offset.
+    """
+    numbers = np.arange(offset, offset + n_rows)
+    df = pd.DataFrame(index=range(n_rows), columns=FILINGS_METADATA_COLUMNS, dtype=str)
+    df["CIK"] = (numbers % 5000).astype(str)
+    df["Type"] = np.where(numbers % 3 == 0, "10-K", "8-K")
+    df["html_index"] = [
+        f"https://www.sec.gov/Archives/edgar/data/{n % 5000}/{n:010d}-index.html"
+        for n in numbers
+    ]
+    df["filename"] = [f"{n % 5000}_{n:010d}.htm" for n in numbers]
+    return df
+
+
+def legacy_filter_new_filings(df, old_metadata_df, raw_filings_folder):
+    """
+    The previous implementation: one stat call per old filing and one scan of the old metadata per new filing.
+
+    Returns the duration of both phases in seconds.
+    """
+    start = time.perf_counter()
+    old_df = []
+    for _, series in old_metadata_df.iterrows():
+        if os.path.exists(
+            os.path.join(raw_filings_folder, series["Type"], series["filename"])
+        ):
+            old_df.append((series.to_frame()).T)
+    old_df = pd.concat(old_df)
+    stat_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    series_to_download = []
+    for _, series in df.iterrows():
+        if len(old_df[old_df["html_index"] == series["html_index"]]) == 0:
+            series_to_download.append((series.to_frame()).T)
+    pd.concat(series_to_download)
+    return stat_elapsed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument(
+        "--legacy-rows",
+        type=int,
+        default=200,
+        help="Number of new filings to check with the previous implementation, which is too slow for all rows",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as raw_filings_folder:
+        # The old metadata holds `rows` filings, 90% of which are still in the download folder
+        old_df = make_filings(args.rows)
+        for filing_type in ("10-K", "8-K"):
+            os.mkdir(os.path.join(raw_filings_folder, filing_type))
+        for filing_type, filename in old_df.iloc[: int(args.rows * 0.9)][
+            ["Type", "filename"]
+        ].itertuples(index=False):
+            open(os.path.join(raw_filings_folder, filing_type, filename), "w").close()
+
+        # The indices hold the same filings plus 10% new ones
+        df = pd.concat([old_df, make_filings(args.rows // 10, offset=args.rows)])
+
+        start = time.perf_counter()
+        new_df, missing = filter_new_filings(df, old_df, raw_filings_folder)
+        elapsed = time.perf_counter() - start
+        print(
+            f"filter_new_filings: {len(df)} filings vs {len(old_df)} metadata rows "
+            f"-> {len(new_df)} to download, {len(missing)} missing files, {elapsed:.3f}s"
+        )
+
+        legacy_df = df.iloc[-args.legacy_rows :]
+        stat_elapsed, scan_elapsed = legacy_filter_new_filings(
+            legacy_df, old_df, raw_filings_folder
+        )
+        extrapolated = stat_elapsed + scan_elapsed / args.legacy_rows * len(df)
+        print(
+            f"previous implementation: {stat_elapsed:.3f}s for the stat calls, {scan_elapsed:.3f}s to scan "
+            f"{args.legacy_rows} filings (~{extrapolated:.0f}s extrapolated to {len(df)} filings)"
+        )
+
+
+if __name__ == "__main__":
+    main()
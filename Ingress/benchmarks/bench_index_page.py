@@ -0,0 +1,55 @@
+"""
+Benchmark of parsing an EDGAR filing index page (-index.html) with the fast lxml parser and with BeautifulSoup.
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_index_page.py --pages 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_page import parse_index_page, parse_index_page_soup  # noqa: E402
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests",
+    "fixtures",
+    "EDGAR_INDEX_PAGE_TEST.html",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(FIXTURE, "rb") as f:
+        content = f.read()
+
+    start = time.perf_counter()
+    for _ in range(args.pages):
+        index_page = parse_index_page_soup(content)
+        index_page["Document Format Files"] = [
+            list(rows) for rows in index_page["Document Format Files"]
+        ]
+    soup_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.pages):
+        fast_index_page = parse_index_page(content)
+    fast_elapsed = time.perf_counter() - start
+
+    assert fast_index_page == index_page
+
+    print(f"{args.pages} index pages of {len(content)} bytes")
+    print(f"  BeautifulSoup: {soup_elapsed / args.pages * 1e6:.0f} us/page")
+    print(f"  lxml fast path: {fast_elapsed / args.pages * 1e6:.0f} us/page")
+    print(f"  speedup: {soup_elapsed / fast_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
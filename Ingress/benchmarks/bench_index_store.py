@@ -0,0 +1,111 @@
+"""
+Benchmark of reading the filings of some types and CIKs from synthetic quarterly index files,
+with the Parquet index store and with the previous per-TSV implementation of get_specific_indices().
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_index_store.py --quarters 40 --rows 250000 --ciks 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_store import convert_index, read_indices  # noqa: E402
+from metadata_store import FILINGS_METADATA_COLUMNS  # noqa: E402
+
+FILING_TYPES = ["10-K", "10-Q", "8-K", "4", "SC 13G", "424B2", "D", "13F-HR"]
+
+
+def make_index(filepath: str, n_rows: int, seed: int) -> None:
+    """
+    Writes a synthetic TSV index file in the format created by download_filings.download_indices().
+    """
+    rng = np.random.default_rng(seed)
+    ciks = rng.integers(1000, 2000000, n_rows)
+    types = rng.choice(
+        FILING_TYPES, n_rows, p=[0.02, 0.06, 0.2, 0.5, 0.1, 0.07, 0.03, 0.02]
+    )
+    with open(filepath, "w", encoding="utf-8") as f:
+        for i, (cik, filing_type) in enumerate(zip(ciks, types)):
+            link = f"edgar/data/{cik}/{seed:04d}{i:010d}"
+            f.write(
+                f"{cik}|COMPANY {cik} INC|{filing_type}|2020-01-02|{link}.txt|{link}-index.html\n"
+            )
+
+
+def legacy_read_indices(tsv_filenames, filing_types, ciks):
+    """
+    The previous implementation: every TSV is read completely and all URLs are built before filtering.
+    """
+    dfs_list = []
+    for filepath in tsv_filenames:
+        df = pd.read_csv(
+            filepath, sep="|", header=None, dtype=str, names=FILINGS_METADATA_COLUMNS
+        )
+        df["complete_text_file_link"] = "https://www.sec.gov/Archives/" + df[
+            "complete_text_file_link"
+        ].astype(str)
+        df["html_index"] = "https://www.sec.gov/Archives/" + df["html_index"].astype(
+            str
+        )
+        df = df[df.Type.isin(filing_types)]
+        if len(ciks):
+            df = df[(df.CIK.isin(ciks))]
+        dfs_list.append(df)
+    return pd.concat(dfs_list) if (len(dfs_list) > 1) else dfs_list[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quarters", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=250000)
+    parser.add_argument("--ciks", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as indices_folder:
+        tsv_filenames = []
+        for quarter in range(args.quarters):
+            filepath = os.path.join(
+                indices_folder, f"{1994 + quarter // 4}_QTR{quarter % 4 + 1}.tsv"
+            )
+            make_index(filepath, args.rows, seed=quarter)
+            tsv_filenames.append(filepath)
+
+        sample = pd.read_csv(tsv_filenames[0], sep="|", header=None, dtype=str)
+        ciks = sample[0].drop_duplicates().sample(args.ciks, random_state=0).tolist()
+
+        start = time.perf_counter()
+        legacy_df = legacy_read_indices(tsv_filenames, ["10-K"], ciks)
+        legacy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for filepath in tsv_filenames:
+            convert_index(filepath)
+        convert_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = read_indices(tsv_filenames, ["10-K"], ciks)
+        elapsed = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(
+            df.reset_index(drop=True).fillna(""),
+            legacy_df.reset_index(drop=True).fillna(""),
+        )
+
+    print(
+        f"{args.quarters} quarters x {args.rows} rows, 10-K filings of {args.ciks} CIKs: {len(df)} filings"
+    )
+    print(f"  legacy TSV scan:         {legacy_elapsed:.2f}s")
+    print(f"  one-off conversion:      {convert_elapsed:.2f}s")
+    print(f"  Parquet with pushdown:   {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
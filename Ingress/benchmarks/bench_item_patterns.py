@@ -0,0 +1,113 @@
+"""
+Benchmark of the item parsing of 8-K filings with the precompiled item pattern table, compared to compiling
+the item patterns again for every filing, which is what a miss in the cache of the re module costs.
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_item_patterns.py --filings 200
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import extract_items  # noqa: E402
+from extract_items import ExtractItems, ItemPatterns  # noqa: E402
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures"
+)
+
+
+def parse_items(extraction, text):
+    positions = []
+    for i, item_index in enumerate(extraction.items_list):
+        extraction.parse_item(
+            text, item_index, extraction.items_list[i + 1 :], positions
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filings", type=int, default=200)
+    args = parser.parse_args()
+
+    filings_metadata_df = pd.read_csv(
+        os.path.join(FIXTURES, "FILINGS_METADATA_TEST.csv"), dtype=str
+    ).replace({np.nan: None})
+    filings_metadata_df = filings_metadata_df[filings_metadata_df["Type"] == "8-K"]
+
+    extraction = ExtractItems(
+        remove_tables=False,
+        items_to_extract=[],
+        include_signature=False,
+        raw_files_folder="",
+        extracted_files_folder="",
+        skip_extracted_filings=False,
+    )
+
+    # The item parsing works on the cleaned text of the filings
+    filings = []
+    with zipfile.ZipFile(os.path.join(FIXTURES, "RAW_FILINGS", "8-K.zip")) as zf:
+        for filing_metadata in filings_metadata_df.iloc[: args.filings].to_dict(
+            "records"
+        ):
+            content = zf.read(f"8-K/{filing_metadata['filename']}").decode(
+                errors="backslashreplace"
+            )
+            text = ExtractItems.clean_text(ExtractItems.strip_html(content))
+            filings.append((filing_metadata, text))
+
+    table = extract_items.ITEM_PATTERNS
+    start = time.perf_counter()
+    for filing_metadata, text in filings:
+        # Neither the table nor the cache of the re module holds the patterns of a previous filing
+        extract_items.ITEM_PATTERNS = ItemPatterns([])
+        extract_items.item_index_pattern.cache_clear()
+        re.purge()
+        extraction.determine_items_to_extract(filing_metadata)
+        parse_items(extraction, text)
+    uncached_elapsed = time.perf_counter() - start
+    extract_items.ITEM_PATTERNS = table
+
+    start = time.perf_counter()
+    for filing_metadata, text in filings:
+        extraction.determine_items_to_extract(filing_metadata)
+        parse_items(extraction, text)
+    table_elapsed = time.perf_counter() - start
+
+    extract_items.item_index_pattern.cache_clear()
+    re.purge()
+    build_start = time.perf_counter()
+    ItemPatterns(
+        [
+            extract_items.item_list_10k,
+            ["part_1", "part_2"] + extract_items.item_list_10q,
+            extract_items.item_list_8k,
+            extract_items.item_list_8k_obsolete,
+        ]
+    )
+    build_elapsed = time.perf_counter() - build_start
+
+    print(f"{len(filings)} 8-K filings")
+    print(
+        f"  patterns compiled per filing: {uncached_elapsed / len(filings) * 1e3:.2f} ms/filing"
+    )
+    print(
+        f"  precompiled pattern table: {table_elapsed / len(filings) * 1e3:.2f} ms/filing"
+    )
+    print(
+        f"  saving: {(uncached_elapsed - table_elapsed) / len(filings) * 1e3:.2f} ms/filing"
+    )
+    print(f"  one-off table compilation: {build_elapsed * 1e3:.1f} ms/process")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark of the removal of the tables with a background color from 8-K filings with the cached style checks,
+compared to extracting the text of every table and parsing the style of every row and cell, as
+remove_html_tables() did before.
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_remove_tables.py --filings 200
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cssutils  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from extract_items import (  # noqa: E402
+    DEFAULT_BACKGROUND_COLORS,
+    ITEM_PATTERNS,
+    ExtractItems,
+    style_has_background,
+)
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures"
+)
+
+
+def remove_html_tables_per_table(extraction, doc_report):
+    for tbl in doc_report.find_all("table"):
+        tbl_text = ExtractItems.clean_text(ExtractItems.strip_html(str(tbl)))
+        if any(
+            ITEM_PATTERNS.table_header(item_index).search(tbl_text)
+            for item_index in extraction.items_list
+        ):
+            continue
+
+        background_found = False
+        for tr in (
+            tbl.find_all("tr", attrs={"style": True})
+            + tbl.find_all("td", attrs={"style": True})
+            + tbl.find_all("th", attrs={"style": True})
+        ):
+            style = cssutils.parseStyle(tr["style"])
+            if (
+                style["background"]
+                and style["background"].lower() not in DEFAULT_BACKGROUND_COLORS
+            ) or (
+                style["background-color"]
+                and style["background-color"].lower() not in DEFAULT_BACKGROUND_COLORS
+            ):
+                background_found = True
+                break
+
+        bgcolor_found = any(
+            tr["bgcolor"].lower() not in DEFAULT_BACKGROUND_COLORS
+            for tr in tbl.find_all("tr", attrs={"bgcolor": True})
+            + tbl.find_all("td", attrs={"bgcolor": True})
+            + tbl.find_all("th", attrs={"bgcolor": True})
+        )
+
+        if bgcolor_found or background_found:
+            tbl.decompose()
+    return doc_report
+
+
+def remove_tables(remove, extraction, filings):
+    texts = []
+    elapsed = 0
+    for filing_metadata, doc in filings:
+        extraction.determine_items_to_extract(filing_metadata)
+        # The tables are removed from the parsed document, so every run parses it again
+        doc_report, is_html = ExtractItems.parse_document(doc)
+        start = time.perf_counter()
+        doc_report = remove(extraction, doc_report)
+        elapsed += time.perf_counter() - start
+        texts.append(ExtractItems.html_tree_to_text(doc_report))
+    return texts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filings", type=int, default=200)
+    args = parser.parse_args()
+
+    filings_metadata_df = pd.read_csv(
+        os.path.join(FIXTURES, "FILINGS_METADATA_TEST.csv"), dtype=str
+    ).replace({np.nan: None})
+    filings_metadata_df = filings_metadata_df[filings_metadata_df["Type"] == "8-K"]
+
+    extraction = ExtractItems(
+        remove_tables=True,
+        items_to_extract=[],
+        include_signature=False,
+        raw_files_folder="",
+        extracted_files_folder="",
+        skip_extracted_filings=False,
+    )
+
+    # Only the HTML filings have tables to remove
+    filings = []
+    with zipfile.ZipFile(os.path.join(FIXTURES, "RAW_FILINGS", "8-K.zip")) as zf:
+        for filing_metadata in filings_metadata_df.iloc[: args.filings].to_dict(
+            "records"
+        ):
+            doc = zf.read(f"8-K/{filing_metadata['filename']}").decode(
+                errors="backslashreplace"
+            )
+            if ExtractItems.parse_document(doc)[1]:
+                filings.append((filing_metadata, doc))
+
+    per_table_texts, per_table_elapsed = remove_tables(
+        remove_html_tables_per_table, extraction, filings
+    )
+    style_has_background.cache_clear()
+    texts, elapsed = remove_tables(
+        lambda extraction, doc_report: extraction.remove_html_tables(
+            doc_report, is_html=True
+        ),
+        extraction,
+        filings,
+    )
+
+    assert texts == per_table_texts
+
+    print(f"{len(filings)} HTML 8-K filings")
+    print(
+        f"  text and styles of every table: {per_table_elapsed / len(filings) * 1e3:.2f} ms/filing"
+    )
+    print(f"  cached style checks first: {elapsed / len(filings) * 1e3:.2f} ms/filing")
+    print(f"  speedup: {per_table_elapsed / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
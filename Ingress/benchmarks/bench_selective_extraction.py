@@ -0,0 +1,94 @@
+"""
+Benchmark of the item parsing of 8-K filings when only some items are requested, compared to parsing all
+the items and keeping the requested ones.
+
+Usage (from the Ingress folder):
+    python benchmarks/bench_selective_extraction.py --filings 200
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from extract_items import ExtractItems  # noqa: E402
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures"
+)
+
+REQUESTS = [
+    ["2.02"],
+    ["2.02", "5.02"],
+    ["1.01", "2.02", "5.02", "7.01", "8.01"],
+]
+
+
+def add_item_sections(items_to_extract, filings):
+    extraction = ExtractItems(
+        remove_tables=False,
+        items_to_extract=items_to_extract,
+        include_signature=False,
+        raw_files_folder="",
+        extracted_files_folder="",
+        skip_extracted_filings=False,
+    )
+    json_contents = []
+    start = time.perf_counter()
+    for filing_metadata, text in filings:
+        extraction.determine_items_to_extract(filing_metadata)
+        json_content = {}
+        extraction.add_item_sections(text, filing_metadata, json_content)
+        json_contents.append(json_content)
+    return json_contents, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filings", type=int, default=200)
+    args = parser.parse_args()
+
+    filings_metadata_df = pd.read_csv(
+        os.path.join(FIXTURES, "FILINGS_METADATA_TEST.csv"), dtype=str
+    ).replace({np.nan: None})
+    # Filings before August 23, 2004 have the obsolete 8-K items
+    filings_metadata_df = filings_metadata_df[
+        (filings_metadata_df["Type"] == "8-K")
+        & (pd.to_datetime(filings_metadata_df["Date"]) > pd.to_datetime("2004-08-23"))
+    ]
+
+    # The item parsing works on the cleaned text of the filings
+    filings = []
+    with zipfile.ZipFile(os.path.join(FIXTURES, "RAW_FILINGS", "8-K.zip")) as zf:
+        for filing_metadata in filings_metadata_df.iloc[: args.filings].to_dict(
+            "records"
+        ):
+            content = zf.read(f"8-K/{filing_metadata['filename']}").decode(
+                errors="backslashreplace"
+            )
+            text = ExtractItems.clean_text(ExtractItems.strip_html(content))
+            filings.append((filing_metadata, text))
+
+    all_json_contents, all_elapsed = add_item_sections([], filings)
+
+    print(f"{len(filings)} 8-K filings")
+    print(f"  all items: {all_elapsed / len(filings) * 1e3:.2f} ms/filing")
+    for items_to_extract in REQUESTS:
+        json_contents, elapsed = add_item_sections(items_to_extract, filings)
+        for json_content, all_json_content in zip(json_contents, all_json_contents):
+            assert json_content == {key: all_json_content[key] for key in json_content}
+        print(
+            f"  {len(items_to_extract)} item(s) {', '.join(items_to_extract)}: "
+            f"{elapsed / len(filings) * 1e3:.2f} ms/filing, "
+            f"speedup {all_elapsed / elapsed:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+from typing import Optional
+
+
+class CompanyInfoCache:
+    """
+    Process-wide, in-memory cache of the companies info stored in companies_info.json.
+
+    The file is read once when the cache is created. Crawl threads only read from and add to the in-memory
+    dictionary, and a single writer persists it: flush() atomically replaces the file, and is called every
+    flush_interval new companies and at the end of the crawl.
+    """
+
+    def __init__(self, filepath: str, flush_interval: int = 100) -> None:
+        """
+        Loads the previously stored companies info.
+
+        Args:
+            filepath (str): The path of companies_info.json. It is created on the first flush if it doesn't exist.
+            flush_interval (int): Persist the cache after this many new companies. Default is 100.
+        """
+        self.filepath = filepath
+        self.flush_interval = flush_interval
+        self.new_companies = 0
+        self.lock = threading.Lock()
+
+        if os.path.isfile(filepath):
+            with open(filepath) as f:
+                self.company_info_dict = json.load(fp=f)
+        else:
+            self.company_info_dict = {}
+
+    def __contains__(self, cik: str) -> bool:
+        return cik in self.company_info_dict
+
+    def get(self, cik: str) -> Optional[dict]:
+        """
+        Returns:
+            Optional[dict]: The info of the company, or None if it is not cached.
+        """
+        return self.company_info_dict.get(cik)
+
+    def add(self, cik: str, company_info: dict) -> None:
+        """
+        Adds the info of a company to the cache, and persists the cache every flush_interval new companies.
+
+        Args:
+            cik (str): The CIK of the company.
+            company_info (dict): The info of the company, as returned by fetch_company_info().
+        """
+        with self.lock:
+            self.company_info_dict[cik] = company_info
+            self.new_companies += 1
+            if self.new_companies >= self.flush_interval:
+                self._flush()
+
+    def flush(self) -> None:
+        """
+        Persists the cache to companies_info.json.
+        """
+        with self.lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        # Write to a temporary file first and then move it in place, so that the file is never left half-written
+        temp_filepath = f"{self.filepath}.tmp"
+        with open(temp_filepath, "w") as f:
+            json.dump(obj=self.company_info_dict, fp=f, indent=4)
+        os.replace(temp_filepath, self.filepath)
+        self.new_companies = 0
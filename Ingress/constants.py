@@ -3,4 +3,7 @@ QDRANT_API_KEY=""
 COLLECTION_NAME="financial_reports_collection"
 
 OPENAI_KEY=""
-EMBEDDING_MODEL="text-embedding-ada-002"
\ No newline at end of file
+EMBEDDING_MODEL="text-embedding-ada-002"
+
+# User agent for requests to SEC EDGAR, e.g. "YourName (your-email@example.com)"
+SEC_USER_AGENT=""
\ No newline at end of file
@@ -0,0 +1,238 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+# The states of a filing in the crawl queue
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+class CrawlQueue:
+    """
+    Persists a crawl job, i.e. the filings that download_filings.main() has to crawl, in an SQLite table.
+
+    Every filing moves from pending to in-flight when it is handed to a worker, and then to done, or to failed
+    with the reason of the failure. Failed filings are retried with an exponential backoff until they run out
+    of attempts. Since every transition is committed on its own, a crash or Ctrl + C loses nothing: the next run
+    with the same job key resumes the unfinished filings directly, without downloading and filtering the indices
+    or re-listing the download folder again.
+    """
+
+    def __init__(self, db_filepath: str) -> None:
+        """
+        Opens the crawl queue, and puts back the filings that were in flight when the previous run stopped.
+
+        Args:
+            db_filepath (str): The path of the SQLite database of the queue.
+        """
+        self.db_filepath = db_filepath
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(db_filepath, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS job (key TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS filings (
+                html_index TEXT PRIMARY KEY,
+                series TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                reason TEXT,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )
+            """)
+        # The filings of a crashed run never finished, so they are crawled again
+        self.connection.execute(
+            "UPDATE filings SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT)
+        )
+        self.connection.commit()
+
+    def job_key(self) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The key of the job in the queue, or None if no job was started.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT key FROM job").fetchone()
+        return None if row is None else row[0]
+
+    def can_resume(self, key: str) -> bool:
+        """
+        Checks whether the queue holds an interrupted run of the given job.
+
+        Args:
+            key (str): The key of the job, which identifies the configuration that selected its filings.
+
+        Returns:
+            bool: True if the job in the queue has the same key and still has pending filings.
+        """
+        return self.job_key() == key and self.count(PENDING) > 0
+
+    def start(self, key: str, df: pd.DataFrame) -> None:
+        """
+        Replaces the queue with a new job, with all of its filings pending.
+
+        Args:
+            key (str): The key of the job.
+            df (pd.DataFrame): The filings to crawl, with an html_index column.
+        """
+        rows = [
+            (series["html_index"], series.to_json(), PENDING)
+            for _, series in df.iterrows()
+        ]
+        with self.lock:
+            self.connection.execute("DELETE FROM job")
+            self.connection.execute("DELETE FROM filings")
+            self.connection.execute("INSERT INTO job VALUES (?, ?)", (key, time.time()))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO filings (html_index, series, state) VALUES (?, ?, ?)",
+                rows,
+            )
+            self.connection.commit()
+
+    def count(self, state: Optional[str] = None) -> int:
+        """
+        Args:
+            state (Optional[str]): Only count the filings in this state. Default is None, which counts all filings.
+
+        Returns:
+            int: The number of filings.
+        """
+        with self.lock:
+            if state is None:
+                return self.connection.execute(
+                    "SELECT COUNT(*) FROM filings"
+                ).fetchone()[0]
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM filings WHERE state = ?", (state,)
+            ).fetchone()[0]
+
+    def claim(self, max_attempts: int) -> List[pd.Series]:
+        """
+        Marks the pending filings, and the failed filings that are due for a retry, as in flight.
+
+        Args:
+            max_attempts (int): The maximum number of attempts of a filing.
+
+        Returns:
+            List[pd.Series]: The claimed filings, in the order in which they were queued.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                """
+                SELECT html_index, series FROM filings
+                WHERE state = ? OR (state = ? AND attempts < ? AND next_attempt_at <= ?)
+                ORDER BY rowid
+                """,
+                (PENDING, FAILED, max_attempts, time.time()),
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE filings SET state = ? WHERE html_index = ?",
+                ((IN_FLIGHT, html_index) for html_index, _ in rows),
+            )
+            self.connection.commit()
+
+        return [pd.Series(json.loads(series), dtype=object) for _, series in rows]
+
+    def next_retry(self, max_attempts: int) -> Optional[float]:
+        """
+        Args:
+            max_attempts (int): The maximum number of attempts of a filing.
+
+        Returns:
+            Optional[float]: The earliest time (in seconds since the epoch) at which a failed filing can be retried,
+                or None if no failed filing has attempts left.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT MIN(next_attempt_at) FROM filings WHERE state = ? AND attempts < ?",
+                (FAILED, max_attempts),
+            ).fetchone()[0]
+
+    def done(self, html_index: str) -> None:
+        """
+        Marks a filing as successfully crawled.
+
+        Args:
+            html_index (str): The html_index of the filing.
+        """
+        with self.lock:
+            self.connection.execute(
+                "UPDATE filings SET state = ?, reason = NULL WHERE html_index = ?",
+                (DONE, html_index),
+            )
+            self.connection.commit()
+
+    def fail(self, html_index: str, reason: str, retry_delay: float) -> None:
+        """
+        Marks a filing as failed and schedules its next attempt.
+
+        Args:
+            html_index (str): The html_index of the filing.
+            reason (str): Why the filing could not be crawled.
+            retry_delay (float): The delay before the second attempt, in seconds.
+                    The delay doubles after every failed attempt.
+        """
+        with self.lock:
+            self.connection.execute(
+                """
+                UPDATE filings SET state = ?, reason = ?, attempts = attempts + 1,
+                    next_attempt_at = ? * (1 << attempts) + ?
+                WHERE html_index = ?
+                """,
+                (FAILED, reason, retry_delay, time.time(), html_index),
+            )
+            self.connection.commit()
+
+    def failures(self) -> List[Tuple[str, int, str]]:
+        """
+        Returns:
+            List[Tuple[str, int, str]]: The html_index, the number of attempts and the reason of every failed filing.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT html_index, attempts, reason FROM filings WHERE state = ? ORDER BY rowid",
+                (FAILED,),
+            ).fetchall()
+
+    def close(self) -> None:
+        """
+        Closes the connection to the queue.
+        """
+        with self.lock:
+            self.connection.close()
+
+
+def crawl_job_key(config: dict) -> str:
+    """
+    Returns the key of the crawl job that the given configuration selects.
+    Runs with the same filing types, companies and periods resume each other's unfinished filings.
+
+    Args:
+        config (dict): The download_filings configuration.
+
+    Returns:
+        str: The key of the crawl job.
+    """
+    return json.dumps(
+        {
+            key: config[key]
+            for key in [
+                "start_year",
+                "end_year",
+                "quarters",
+                "filing_types",
+                "cik_tickers",
+            ]
+        },
+        sort_keys=True,
+    )
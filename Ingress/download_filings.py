@@ -4,15 +4,19 @@ import logging
 import math
 import os
 import re
-import shutil
 import tempfile
+import time
 import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
+from filelock import FileLock
+from lxml import etree
 from requests.adapters import HTTPAdapter
 from requests.exceptions import (
     ConnectionError,
@@ -24,16 +28,22 @@ from requests.exceptions import (
 from tqdm import tqdm
 from urllib3.util import Retry
 
+from company_info_cache import CompanyInfoCache
+from crawl_queue import PENDING, CrawlQueue, crawl_job_key
+from index_page import parse_index_page, parse_index_page_soup
+from index_store import convert_index, read_indices
 from logger import Logger
-
-# Python version compatibility for HTML parser
-try:
-    from html.parser.HTMLParser import HTMLParseError
-except ImportError:  # Python 3.5+
-
-    class HTMLParseError(Exception):
-        pass
-
+from metadata_store import FilingsMetadataStore
+from rate_limiter import RateLimiter, SharedRateLimiter
+from raw_store import RawFilingStore
+from sharding import (
+    filter_shard,
+    merge_shard_metadata,
+    seed_shard_metadata,
+    shard_filepath,
+)
+from submissions import ARCHIVES_URL, SUBMISSIONS_URL, SubmissionsResolver
+from ticker_index import TickerIndex
 
 # Import constants from the project's __init__ file
 from __init__ import DATASET_DIR, LOGGING_DIR
@@ -50,8 +60,21 @@ LOGGER = Logger(
 # Log where the logs are being saved
 LOGGER.info(f"Saving log to {os.path.join(LOGGING_DIR)}\n")
 
+# Part of the page that SEC EDGAR returns instead of the requested content when our traffic is throttled
+THROTTLING_MESSAGE = "will be managed until action is taken to declare your traffic."
 
-def main(config_param = None):
+# EDGAR answers throttled requests with these status codes, so they must not be blindly retried by urllib3
+THROTTLING_STATUS_CODES = (403, 429)
+
+# The title of the throttling page, which is found at the very beginning of the page
+THROTTLING_TITLE = "Request Rate Threshold Exceeded"
+
+# Streamed downloads only inspect their first KB for throttling and are written to disk in chunks of 1 MB
+THROTTLING_SNIFF_BYTES = 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def main(config_param = None, on_filing = None):
     """
     Orchestrates the entire flow of crawling and downloading filings from SEC EDGAR.
 
@@ -62,10 +85,23 @@ def main(config_param = None):
     4. Downloads the indices.
     5. Gets specific indices according to the provided filing types and CIKs/tickers.
     6. Compares the new indices with the old ones to download only the new filings.
+       Steps 4 to 6 are skipped if the previous run with the same configuration was interrupted,
+       in which case its unfinished filings are resumed from the crawl queue.
     7. Crawls through each index to download (.tsv files) and save the filing.
+       If max_workers is larger than 1, several filings are crawled concurrently under a shared rate limit.
+       Failed filings are retried with an exponential backoff.
+       With shard_count > 1, only the companies of the shard_index-th shard are crawled, under a rate budget
+       shared with the other shards, and the filings metadata of all shards is merged when the crawl finishes.
+
+    Args:
+            config_param (dict): The configuration, with a "download_filings" section. Default is None,
+                    which loads config.json.
+            on_filing (Callable[[pd.Series], None]): Called with the metadata of every filing as soon as it is
+                    downloaded, e.g. to hand it over to the extraction. Default is None.
 
     Raises:
-            SystemExit: If no filing types are provided or if there are no new filings to download.
+            SystemExit: If no filing types are provided or if the shard is invalid.
+            KeyboardInterrupt: If the download is interrupted by the user (Ctrl + C), after its progress is saved.
     """
     if config_param is None:
         # Load the configuration file
@@ -86,143 +122,320 @@ def main(config_param = None):
         LOGGER.info("Please provide at least one filing type")
         exit()
 
+    # In a sharded crawl, every node crawls the companies of its own shard and keeps its own filings metadata,
+    # which is merged into the filings metadata file of the whole crawl when the node finishes
+    shard_index = config.get("shard_index", 0)
+    shard_count = config.get("shard_count", 1)
+    if not 0 <= shard_index < shard_count:
+        LOGGER.info(f"Invalid shard {shard_index} of {shard_count} shards")
+        exit()
+    shard_metadata_filepath = shard_filepath(
+        filings_metadata_filepath, shard_index, shard_count
+    )
+    seed_shard_metadata(filings_metadata_filepath, shard_index, shard_count)
+
     # If the indices and/or download folder doesn't exist, create them
-    if not os.path.isdir(indices_folder):
-        os.mkdir(indices_folder)
-    if not os.path.isdir(raw_filings_folder):
-        os.mkdir(raw_filings_folder)
+    # (other shards may be creating them at the same time)
+    os.makedirs(indices_folder, exist_ok=True)
+    os.makedirs(raw_filings_folder, exist_ok=True)
 
     # We also create subfolders for each filing type in the raw_filings_folder for better organization
     for filing_type in config["filing_types"]:
-        filing_type_folder = os.path.join(raw_filings_folder, filing_type)
-        if not os.path.isdir(filing_type_folder):
-            os.mkdir(filing_type_folder)
-
-    # If companies_info.json doesn't exist, create it with empty JSON
-    if not os.path.isfile(os.path.join(DATASET_DIR, "companies_info.json")):
-        with open(os.path.join(DATASET_DIR, "companies_info.json"), "w") as f:
-            json.dump(obj={}, fp=f)
-
-    # Download the indices for the given years and quarters
-    download_indices(
-        start_year=config["start_year"],
-        end_year=config["end_year"],
-        quarters=config["quarters"],
-        skip_present_indices=config["skip_present_indices"],
-        indices_folder=indices_folder,
+        os.makedirs(os.path.join(raw_filings_folder, filing_type), exist_ok=True)
+
+    # All requests to SEC EDGAR share a single rate limiter and a single pool of keep-alive connections.
+    # The shards of a crawl share the rate budget of SEC EDGAR through a state file.
+    if shard_count > 1 or "shared_rate_limit_file" in config:
+        rate_limiter = SharedRateLimiter(
+            state_filepath=os.path.join(
+                DATASET_DIR, config.get("shared_rate_limit_file", "RATE_LIMIT.json")
+            ),
+            max_requests_per_second=config.get("max_requests_per_second", 10),
+        )
+    else:
+        rate_limiter = RateLimiter(
+            max_requests_per_second=config.get("max_requests_per_second", 10)
+        )
+    session = create_edgar_session(
         user_agent=config["user_agent"],
+        pool_size=config.get("http_pool_size", max(10, config.get("max_workers", 1))),
     )
 
-    # Filter out the indices of years that are not in the provided range
-    tsv_filenames = []
-    for year in range(config["start_year"], config["end_year"] + 1):
-        for quarter in config["quarters"]:
-            filepath = os.path.join(indices_folder, f"{year}_QTR{quarter}.tsv")
-
-            if os.path.isfile(filepath):
-                tsv_filenames.append(filepath)
-
-    # Get the indices that are specific to your needs
-    df = get_specific_indices(
-        tsv_filenames=tsv_filenames,
-        filing_types=config["filing_types"],
-        cik_tickers=config["cik_tickers"],
-        user_agent=config["user_agent"],
+    # Open the filings metadata store. On the first run, it imports the existing filings metadata CSV file.
+    metadata_store = FilingsMetadataStore(
+        csv_filepath=shard_metadata_filepath,
+        compaction_interval=config.get("metadata_compaction_interval", 1000),
     )
 
-    # Initialize list for old filings metadata
-    old_df = []
-    if os.path.exists(filings_metadata_filepath):
-        # Initialize list for the filings to be downloaded
-        series_to_download = []
-        LOGGER.info("\nReading filings metadata...\n")
+    # Open the crawl queue. If the previous run with the same configuration was interrupted,
+    # its unfinished filings are crawled right away, without selecting the filings again.
+    crawl_queue = CrawlQueue(
+        db_filepath=shard_filepath(
+            os.path.join(DATASET_DIR, config.get("crawl_queue_file", "CRAWL_QUEUE.db")),
+            shard_index,
+            shard_count,
+        )
+    )
+    job_key = crawl_job_key(config)
 
-        # Read the old filings metadata and filter out the filings that already exist in the download folder
-        for _, series in pd.read_csv(filings_metadata_filepath, dtype=str).iterrows():
-            if os.path.exists(
-                os.path.join(raw_filings_folder, series["Type"], series["filename"])
-            ):
-                old_df.append((series.to_frame()).T)
-
-        # Concatenate the old filings metadata
-        if len(old_df) == 1:
-            old_df = old_df[0]
-        elif len(old_df) > 1:
-            old_df = pd.concat(old_df)
-
-        # Check if each filing in the new indices already exists in the old metadata
-        # If it doesn't, add it to the list of filings to be downloaded
-        for _, series in tqdm(df.iterrows(), total=len(df), ncols=100):
-            if (
-                len(old_df) == 0
-                or len(old_df[old_df["html_index"] == series["html_index"]]) == 0
-            ):
-                series_to_download.append((series.to_frame()).T)
+    if crawl_queue.can_resume(job_key):
+        LOGGER.info(
+            f"\nResuming the interrupted crawl job with {crawl_queue.count(PENDING)} pending filings...\n"
+        )
+    else:
+        df = select_new_filings(
+            config=config,
+            indices_folder=indices_folder,
+            raw_filings_folder=raw_filings_folder,
+            metadata_store=metadata_store,
+            session=session,
+            rate_limiter=rate_limiter,
+        )
 
-        # If there are no new filings to download, exit
-        if len(series_to_download) == 0:
+        # If there are no new filings to download, return
+        if len(df) == 0:
             LOGGER.info(
                 "\nThere are no more filings to download for the given years, quarters and companies"
             )
-            exit()
+            metadata_store.close()
+            crawl_queue.close()
+            return
+
+        crawl_queue.start(key=job_key, df=df)
+
+    # Load the companies info once, and download the info of the new companies before crawling their filings
+    company_info_cache = CompanyInfoCache(
+        filepath=os.path.join(DATASET_DIR, "companies_info.json")
+    )
 
-        # Concatenate the series to be downloaded
-        df = (
-            pd.concat(series_to_download)
-            if (len(series_to_download) > 1)
-            else series_to_download[0]
+    # Resolve the filings from the submissions JSON of their companies, which lists many filings in one request.
+    # The HTML index pages are only crawled for the filings that it misses.
+    submissions = None
+    if config.get("use_submissions_json", True):
+        submissions = SubmissionsResolver(
+            get=lambda url: get_with_backoff(
+                session=session, url=url, rate_limiter=rate_limiter
+            ),
+            forms=config["filing_types"],
+            submissions_url=config.get("submissions_url", SUBMISSIONS_URL),
+            archives_url=config.get("archives_url", ARCHIVES_URL),
         )
 
-    # Create a list for each series in the dataframe
-    list_of_series = []
-    for i in range(len(df)):
-        list_of_series.append(df.iloc[i])
+    # The downloaded filings are moved into a content-addressed, compressed store, unless disabled in the config.
+    # Plain files that were downloaded before are still found in the filing type folders.
+    raw_store = RawFilingStore(raw_filings_folder)
+    compress_raw_filings = config.get("compress_raw_filings", True)
 
-    LOGGER.info(f"\nDownloading {len(df)} filings directly from EDGAR...\n")
+    max_attempts = config.get("crawl_max_attempts", 3)
+    retry_delay = config.get("crawl_retry_delay", 10)
+    total_filings = crawl_queue.count(PENDING)
 
-    # Initialize list for final series
-    final_series = []
-    for series in tqdm(list_of_series, ncols=100):
-        # Crawl each series to download and save the filing
-        series = crawl(
-            series=series,
-            filing_types=config["filing_types"],
-            raw_filings_folder=raw_filings_folder,
-            user_agent=config["user_agent"],
-        )
+    LOGGER.info(f"\nDownloading {total_filings} filings directly from EDGAR...\n")
 
-        # If the series was successfully downloaded, append it to the final series
+    # Crawl the filings with a bounded pool of threads. With max_workers = 1, the filings are crawled one after another.
+    # All threads share the same rate limiter, so that we never exceed the SEC EDGAR rate limit.
+    executor = ThreadPoolExecutor(max_workers=config.get("max_workers", 1))
+
+    def record_result(future: Future, html_index: str) -> Optional[pd.Series]:
+        """
+        Records the result of a crawled filing in the filings metadata store and the crawl queue,
+        and returns its series if it was successfully downloaded.
+        """
+        try:
+            series = future.result()
+            reason = "The filing could not be found or downloaded"
+        except Exception as e:
+            series = None
+            reason = f"{type(e).__name__}: {e}"
+
+        # If the series was successfully downloaded, append it to the filings metadata store.
+        # The store commits every filing on its own and periodically exports the metadata CSV file.
         if series is not None:
-            final_series.append((series.to_frame()).T)
-            # Concatenate the final series and export it to the metadata file
-            final_df = (
-                pd.concat(final_series) if (len(final_series) > 1) else final_series[0]
+            metadata_store.append(series)
+            crawl_queue.done(html_index)
+        else:
+            crawl_queue.fail(html_index, reason=reason, retry_delay=retry_delay)
+        return series
+
+    # Count the successfully downloaded filings and their size, to report the download throughput
+    downloaded_filings = 0
+    downloaded_bytes = 0
+    start_time = time.monotonic()
+    # The futures of the current round whose results are not recorded yet
+    futures = {}
+    try:
+        # Every round crawls the pending filings and the failed filings whose retry is due
+        while True:
+            list_of_series = crawl_queue.claim(max_attempts=max_attempts)
+            if len(list_of_series) == 0:
+                next_retry = crawl_queue.next_retry(max_attempts=max_attempts)
+                if next_retry is None:
+                    break
+                time.sleep(max(next_retry - time.time(), 0))
+                continue
+
+            prefetch_companies_info(
+                ciks=[series["CIK"] for series in list_of_series],
+                company_info_cache=company_info_cache,
+                session=session,
+                rate_limiter=rate_limiter,
+                max_workers=config.get("max_workers", 1),
+                submissions=submissions,
             )
-            if len(old_df) > 0:
-                final_df = pd.concat([old_df, final_df])
-
-            # Write to a temporary file first, in order to avoid possible data loss (issue #19)
-            temp_filepath = f"{filings_metadata_filepath}.tmp"
-            try:
-                final_df.to_csv(temp_filepath, index=False, header=True)
-
-                # Move the temporary file to the final file
-                shutil.move(temp_filepath, filings_metadata_filepath)
-            except KeyboardInterrupt:
-                final_df.to_csv(temp_filepath, index=False, header=True)
-                shutil.move(temp_filepath, filings_metadata_filepath)
-                LOGGER.info(
-                    f"Keyboard interrupt by the user detected (Ctrl + C). Saving filings metadata to {filings_metadata_filepath} and exiting."
-                )
-                exit(0)
 
+            futures = {
+                executor.submit(
+                    crawl,
+                    series=series,
+                    filing_types=config["filing_types"],
+                    raw_filings_folder=raw_filings_folder,
+                    company_info_cache=company_info_cache,
+                    session=session,
+                    rate_limiter=rate_limiter,
+                    submissions=submissions,
+                    raw_store=raw_store if compress_raw_filings else None,
+                ): series["html_index"]
+                for series in list_of_series
+            }
+
+            for future in tqdm(
+                as_completed(list(futures)), total=len(futures), ncols=100
+            ):
+                series = record_result(future, futures.pop(future))
+                if series is not None:
+                    if on_filing is not None:
+                        on_filing(series)
+                    downloaded_filings += 1
+                    downloaded_bytes += raw_store.size(
+                        series["Type"], series["filename"]
+                    )
+    except KeyboardInterrupt:
+        LOGGER.info(
+            f"Keyboard interrupt by the user detected (Ctrl + C). Saving filings metadata to {shard_metadata_filepath} and exiting. "
+            f"Rerun the script to resume the crawl job."
+        )
+        # Do not start the filings that are still waiting in the queue.
+        # Their state stays in flight, so that the next run crawls them again.
+        # The filings that are being crawled are finished and recorded before the stores are closed.
+        executor.shutdown(wait=True, cancel_futures=True)
+        for future, html_index in futures.items():
+            if not future.cancelled():
+                record_result(future, html_index)
+        metadata_store.export_csv()
+        metadata_store.close()
+        crawl_queue.close()
+        raw_store.close()
+        company_info_cache.flush()
+        if shard_count > 1:
+            merge_shard_metadata(filings_metadata_filepath, shard_count)
+        # Let the caller tell the interruption apart from a completed download
+        raise
+    executor.shutdown()
+    raw_store.close()
+    company_info_cache.flush()
+
+    # Compact the store into the filings metadata CSV file, and merge it with the files of the other shards
+    metadata_store.export_csv()
+    metadata_store.close()
+    if shard_count > 1:
+        merge_shard_metadata(filings_metadata_filepath, shard_count)
+
+    elapsed = max(time.monotonic() - start_time, 1e-6)
+    LOGGER.info(
+        f"\nDownloaded {downloaded_bytes} bytes at {downloaded_bytes / elapsed:.0f} bytes/s"
+    )
     LOGGER.info(f"\nFilings metadata exported to {filings_metadata_filepath}")
-    # If some filings failed to download, notify to rerun the script
-    if len(final_series) < len(list_of_series):
+    # If some filings failed to download, report why and notify to rerun the script
+    if downloaded_filings < total_filings:
+        for html_index, attempts, reason in crawl_queue.failures():
+            LOGGER.debug(f"Failed after {attempts} attempts: {html_index} ({reason})")
         LOGGER.info(
-            f"\nDownloaded {len(final_series)} / {len(list_of_series)} filings. "
+            f"\nDownloaded {downloaded_filings} / {total_filings} filings. "
             f"Rerun the script to retry downloading the failed filings."
         )
+    crawl_queue.close()
+
+
+def select_new_filings(
+    config: dict,
+    indices_folder: str,
+    raw_filings_folder: str,
+    metadata_store: FilingsMetadataStore,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+) -> pd.DataFrame:
+    """
+    Selects the filings to crawl: downloads the indices of the configured years and quarters, keeps the filings
+    of the configured filing types and companies of the configured shard, and drops the filings that were
+    already downloaded.
+
+    Args:
+            config (dict): The download_filings configuration.
+            indices_folder (str): Folder where the indices are stored.
+            raw_filings_folder (str): Folder where the filings are downloaded.
+            metadata_store (FilingsMetadataStore): The store of the downloaded filings metadata.
+                    The filings that were deleted from the download folder are removed from it.
+            session (requests.Session): The shared SEC EDGAR session.
+            rate_limiter (RateLimiter): The shared rate limiter of SEC EDGAR requests.
+
+    Returns:
+            pd.DataFrame: The new filings.
+    """
+    shard_index = config.get("shard_index", 0)
+    shard_count = config.get("shard_count", 1)
+
+    # Download the indices for the given years and quarters, and convert them to Parquet.
+    # The shards of a crawl download and convert the indices one after another, so that only the first one
+    # downloads and converts each index and the others find it up to date.
+    # Only the first shard downloads the indices again if they are not skipped.
+    with FileLock(os.path.join(indices_folder, "download.lock")):
+        download_indices(
+            start_year=config["start_year"],
+            end_year=config["end_year"],
+            quarters=config["quarters"],
+            skip_present_indices=config["skip_present_indices"] or shard_index > 0,
+            indices_folder=indices_folder,
+            session=session,
+            rate_limiter=rate_limiter,
+            max_workers=config.get("max_workers", 1),
+        )
+
+        # Filter out the indices of years that are not in the provided range
+        tsv_filenames = []
+        for year in range(config["start_year"], config["end_year"] + 1):
+            for quarter in config["quarters"]:
+                filepath = os.path.join(indices_folder, f"{year}_QTR{quarter}.tsv")
+
+                if os.path.isfile(filepath):
+                    convert_index(filepath)
+                    tsv_filenames.append(filepath)
+
+    # Get the indices that are specific to your needs
+    df = get_specific_indices(
+        tsv_filenames=tsv_filenames,
+        filing_types=config["filing_types"],
+        cik_tickers=config["cik_tickers"],
+        session=session,
+        rate_limiter=rate_limiter,
+    )
+
+    # Keep the filings of the companies of this shard
+    df = filter_shard(df, shard_index, shard_count)
+
+    if len(metadata_store) > 0:
+        LOGGER.info("\nReading filings metadata...\n")
+
+        # Filter out the filings that already exist in the download folder
+        df, missing_html_indices = filter_new_filings(
+            df=df,
+            old_df=metadata_store.to_dataframe(),
+            raw_filings_folder=raw_filings_folder,
+        )
+
+        # Forget the filings that were deleted from the download folder, so that they are downloaded again
+        metadata_store.remove(missing_html_indices)
+
+    return df
 
 
 def download_indices(
@@ -231,18 +444,29 @@ def download_indices(
     quarters: List[str],
     skip_present_indices: bool,
     indices_folder: str,
-    user_agent: str,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+    max_workers: int = 1,
+    retries: int = 3,
+    retry_delay: float = 10,
 ) -> None:
     """
     Downloads EDGAR Index files for the specified years and quarters.
 
+    The quarters are downloaded in parallel. Indices that fail to download are retried in up to `retries`
+    further rounds, waiting `retry_delay` seconds before the first retry and doubling the wait after every round.
+
     Args:
             start_year (int): The first year of the indices to be downloaded.
             end_year (int): The last year of the indices to be downloaded.
             quarters (List[str]): A list of quarters (in the format 'Q1', 'Q2', etc.) for which the indices will be downloaded.
             skip_present_indices (bool): If True, the function will skip downloading indices that are already present in the directory.
             indices_folder (str): Directory where the indices will be saved.
-            user_agent (str): The User-Agent string that will be declared to SEC EDGAR.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+            max_workers (int): The number of indices downloaded in parallel. Default is 1.
+            retries (int): The number of rounds in which failed indices are retried. Default is 3.
+            retry_delay (float): Seconds to wait before the first retry round. Default is 10.
 
     Raises:
             ValueError: If an invalid quarter is passed.
@@ -257,83 +481,123 @@ def download_indices(
         if quarter not in [1, 2, 3, 4]:
             raise Exception(f'Invalid quarter "{quarter}"')
 
-    first_iteration = True
-    # Loop over the years and quarters to download the indices
-    while True:
-        failed_indices = []
-        for year in range(start_year, end_year + 1):
-            for quarter in quarters:
-                if year == datetime.now().year and quarter > math.ceil(
-                    datetime.now().month / 3
-                ):  # Skip future quarters
-                    break
+    # Collect the indices to download for the given years and quarters
+    pending_indices = []
+    for year in range(start_year, end_year + 1):
+        for quarter in quarters:
+            if year == datetime.now().year and quarter > math.ceil(
+                datetime.now().month / 3
+            ):  # Skip future quarters
+                break
 
-                index_filename = f"{year}_QTR{quarter}.tsv"
+            index_filename = f"{year}_QTR{quarter}.tsv"
 
-                # Check if the index file is already present
-                if skip_present_indices and os.path.exists(
-                    os.path.join(indices_folder, index_filename)
-                ):
-                    if first_iteration:
-                        LOGGER.info(f"Skipping {index_filename}")
-                    continue
+            # Check if the index file is already present
+            if skip_present_indices and os.path.exists(
+                os.path.join(indices_folder, index_filename)
+            ):
+                LOGGER.info(f"Skipping {index_filename}")
+                continue
 
-                # If not, download the index file
-                url = f"{base_url}/{year}/QTR{quarter}/master.zip"
-
-                # Retry the download in case of failures
-                with tempfile.TemporaryFile(mode="w+b") as tmp:
-                    session = requests.Session()
-                    try:
-                        request = requests_retry_session(
-                            retries=5, backoff_factor=0.2, session=session
-                        ).get(url=url, headers={"User-agent": user_agent})
-                    except requests.exceptions.RetryError as e:
-                        LOGGER.info(f'Failed downloading "{index_filename}" - {e}')
-                        failed_indices.append(index_filename)
-                        continue
-
-                    tmp.write(request.content)
-
-                    # Process the downloaded index file
-                    with zipfile.ZipFile(tmp).open("master.idx") as f:
-                        lines = [
-                            line.decode("latin-1")
-                            for line in itertools.islice(f, 11, None)
-                        ]
-                        lines = [
-                            line.strip()
-                            + "|"
-                            + line.split("|")[-1].replace(".txt", "-index.html")
-                            for line in lines
-                        ]
-
-                    # Save the processed index file
-                    with open(
-                        os.path.join(indices_folder, index_filename),
-                        "w+",
-                        encoding="utf-8",
-                    ) as f:
-                        f.write("".join(lines))
-                        LOGGER.info(f"{index_filename} downloaded")
-
-        first_iteration = False
-        # Handle failed downloads
-        if len(failed_indices) > 0:
-            LOGGER.info(f"Could not download the following indices:\n{failed_indices}")
-            user_input = input("Retry (Y/N): ")
-            if user_input in ["Y", "y", "yes"]:
-                LOGGER.info("Retry downloading failed indices")
-            else:
+            pending_indices.append(
+                (f"{base_url}/{year}/QTR{quarter}/master.zip", index_filename)
+            )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for retry in range(retries + 1):
+            if retry > 0:
+                # Give EDGAR some time before retrying, instead of blocking on the user
+                LOGGER.info(
+                    f"Retrying to download {len(pending_indices)} indices in {retry_delay:.0f} seconds"
+                )
+                time.sleep(retry_delay)
+                retry_delay *= 2
+
+            futures = {
+                executor.submit(
+                    download_index,
+                    url=url,
+                    index_filepath=os.path.join(indices_folder, index_filename),
+                    session=session,
+                    rate_limiter=rate_limiter,
+                ): (url, index_filename)
+                for url, index_filename in pending_indices
+            }
+
+            # Handle failed downloads
+            pending_indices = []
+            for future in as_completed(futures):
+                url, index_filename = futures[future]
+                if future.result():
+                    LOGGER.info(f"{index_filename} downloaded")
+                else:
+                    LOGGER.info(f'Failed downloading "{index_filename}"')
+                    pending_indices.append((url, index_filename))
+
+            if len(pending_indices) == 0:
                 break
-        else:
-            break
+
+    if len(pending_indices) > 0:
+        LOGGER.info(
+            f"Could not download the following indices:\n"
+            f"{sorted(index_filename for _, index_filename in pending_indices)}"
+        )
+
+
+def download_index(
+    url: str, index_filepath: str, session: requests.Session, rate_limiter: RateLimiter
+) -> bool:
+    """
+    Downloads a single master.zip index file and converts its master.idx into a TSV index file.
+
+    The zip file is streamed to a temporary directory, and master.idx is converted line by line straight
+    into a temporary TSV file, which is atomically moved in place once complete.
+
+    Args:
+            url (str): The URL of the master.zip file.
+            index_filepath (str): The path of the TSV index file to create.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+
+    Returns:
+            bool: True if the index was downloaded successfully, False otherwise.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not download(
+            url=url,
+            filename="master.zip",
+            download_folder=tmp_dir,
+            session=session,
+            rate_limiter=rate_limiter,
+        ):
+            return False
+
+        # Skip the header of master.idx and append the link to the index page of every filing
+        temp_filepath = f"{index_filepath}.tmp"
+        try:
+            with zipfile.ZipFile(os.path.join(tmp_dir, "master.zip")).open(
+                "master.idx"
+            ) as f, open(temp_filepath, "w", encoding="utf-8") as tsv:
+                for line in itertools.islice(f, 11, None):
+                    line = line.decode("latin-1")
+                    tsv.write(
+                        line.strip()
+                        + "|"
+                        + line.split("|")[-1].replace(".txt", "-index.html")
+                    )
+        except (zipfile.BadZipFile, KeyError) as err:
+            LOGGER.debug(f"Invalid index file {url}: {err}")
+            return False
+
+    os.replace(temp_filepath, index_filepath)
+    return True
 
 
 def get_specific_indices(
     tsv_filenames: List[str],
     filing_types: List[str],
-    user_agent: str,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
     cik_tickers: Optional[List[str]] = None,
 ) -> pd.DataFrame:
     """
@@ -342,7 +606,8 @@ def get_specific_indices(
     Args:
             tsv_filenames (List[str]): The filenames of the indices.
             filing_types (List[str]): The filing types to download, e.g., ['10-K', '8-K'].
-            user_agent (str): The User-Agent string that will be declared to SEC EDGAR.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
             cik_tickers (Optional[List[str]]): List of CIKs or Tickers. If None, the function processes all CIKs in the provided indices.
 
     Returns:
@@ -369,138 +634,246 @@ def get_specific_indices(
 
     # Check if cik_tickers is a list and not empty
     if isinstance(cik_tickers, List) and len(cik_tickers):
-        # Define the company_tickers_url
-        company_tickers_url = "https://www.sec.gov/files/company_tickers.json"
-
-        # Initialize a session for requests
-        session = requests.Session()
-        try:
-            # Try to download the company_tickers data
-            request = requests_retry_session(
-                retries=5, backoff_factor=0.2, session=session
-            ).get(url=company_tickers_url, headers={"User-agent": user_agent})
-        except (
-            RequestException,
-            HTTPError,
-            ConnectionError,
-            Timeout,
-            RetryError,
-        ) as err:
-            # If download fails, log the error and exit
-            LOGGER.info(f'Failed downloading "{company_tickers_url}" - {err}')
+        # Load the cached ticker index and refresh it at most once a day with a conditional request
+        ticker_index = TickerIndex(
+            cache_filepath=os.path.join(DATASET_DIR, "company_tickers.pickle"),
+            seed_filepath=os.path.join(
+                os.path.dirname(os.path.abspath(__file__)),
+                "company_tickers_exchange.json",
+            ),
+        )
+        if ticker_index.is_stale():
+            ticker_index.refresh(session=session, rate_limiter=rate_limiter)
+        if len(ticker_index) == 0:
+            # If there is neither a cached nor a downloaded ticker index, log the error and exit
+            LOGGER.info("Could not load the company tickers from SEC EDGAR")
             exit()
 
-        # Load the company tickers data
-        company_tickers = json.loads(request.content)
-
-        # Create a mapping from ticker to CIK
-        ticker2cik = {
-            company["ticker"]: company["cik_str"]
-            for company in company_tickers.values()
-        }
-        ticker2cik = dict(sorted(ticker2cik.items(), key=lambda item: item[0]))
-
         # Convert all tickers in the cik_tickers list to CIKs
         for c_t in cik_tickers:
             if isinstance(c_t, int) or c_t.isdigit():  # If it is a CIK
                 ciks.append(str(c_t))
             else:  # If it is a ticker
-                if c_t in ticker2cik:
-                    # If the ticker exists in the mapping, convert it to CIK
-                    ciks.append(str(ticker2cik[c_t]))
+                cik = ticker_index.cik(c_t)
+                if cik is not None:
+                    # If the ticker exists in the index, convert it to CIK
+                    ciks.append(cik)
                 else:
                     # If the ticker does not exist in the mapping, log the error
                     LOGGER.debug(f'Could not find CIK for ticker "{c_t}"')
 
-    # Initialize list for dataframes
-    dfs_list = []
-
-    # For each file in the provided filenames
-    for filepath in tsv_filenames:
-        # Load the index file into a dataframe
-        df = pd.read_csv(
-            filepath,
-            sep="|",
-            header=None,
-            dtype=str,
-            names=[
-                "CIK",
-                "Company",
-                "Type",
-                "Date",
-                "complete_text_file_link",
-                "html_index",
-                "Filing Date",
-                "Period of Report",
-                "SIC",
-                "htm_file_link",
-                "State of Inc",
-                "State location",
-                "Fiscal Year End",
-                "filename",
-            ],
-        )
+    # Read the filings of the given types and CIKs from the columnar copies of the indices
+    return read_indices(
+        tsv_filepaths=tsv_filenames, filing_types=filing_types, ciks=ciks
+    )
 
-        # Prepend the URL for SEC Archives to the links
-        df["complete_text_file_link"] = "https://www.sec.gov/Archives/" + df[
-            "complete_text_file_link"
-        ].astype(str)
-        df["html_index"] = "https://www.sec.gov/Archives/" + df["html_index"].astype(
-            str
-        )
 
-        # Filter the dataframe by filing type
-        df = df[df.Type.isin(filing_types)]
+def filter_new_filings(
+    df: pd.DataFrame, old_df: pd.DataFrame, raw_filings_folder: str
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Keeps only the filings that have not been downloaded yet.
+
+    A filing counts as downloaded if it is in the old filings metadata and its file exists in the download folder,
+    either as a plain file or in the raw filing store. Each filing type folder and its manifest are listed once, and the filings are matched on html_index with hash lookups,
+    so the cost is linear in the number of filings.
+
+    Args:
+            df (pd.DataFrame): The filings from the indices.
+            old_df (pd.DataFrame): The old filings metadata.
+            raw_filings_folder (str): Raw filings folder path.
+
+    Returns:
+            Tuple[pd.DataFrame, List[str]]: The filings to download, and the html_index of the old filings
+                    whose file no longer exists in the download folder.
+    """
+
+    # List the folder of each filing type once, instead of checking every file on its own
+    raw_store = RawFilingStore(raw_filings_folder)
+    downloaded_files = set()
+    for filing_type in old_df["Type"].dropna().unique():
+        downloaded_files.update(
+            f"{filing_type}/{filename}" for filename in raw_store.filenames(filing_type)
+        )
+    raw_store.close()
 
-        # If CIKs were provided, filter the dataframe by CIK
-        if len(ciks):
-            df = df[(df.CIK.isin(ciks))]
+    # Keep the old filings metadata whose file still exists
+    is_downloaded = (old_df["Type"] + "/" + old_df["filename"]).isin(downloaded_files)
+    missing_html_indices = old_df.loc[~is_downloaded, "html_index"].tolist()
 
-        # Add the filtered dataframe to the list
-        dfs_list.append(df)
+    # Anti-join of the new indices with the old filings metadata on html_index
+    df = df[~df["html_index"].isin(old_df.loc[is_downloaded, "html_index"])]
 
-    # Return the concatenated dataframe if there are multiple dataframes in the list, else return the single dataframe
-    return pd.concat(dfs_list) if (len(dfs_list) > 1) else dfs_list[0]
+    return df, missing_html_indices
 
 
 def crawl(
-    filing_types: List[str], series: pd.Series, raw_filings_folder: str, user_agent: str
+    filing_types: List[str],
+    series: pd.Series,
+    raw_filings_folder: str,
+    company_info_cache: CompanyInfoCache,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+    submissions: Optional[SubmissionsResolver] = None,
+    raw_store: Optional[RawFilingStore] = None,
 ) -> pd.Series:
     """
     Crawls the EDGAR HTML indexes and extracts required details.
 
     Such details include the Filing Date, the Period of Report, the State location, the Fiscal Year End, and many more.
+    If a submissions resolver is given, the filing is first resolved from the structured submissions JSON
+    of its company, and the HTML index page is only crawled when that misses any of the required details.
 
     Args:
             filing_types (List[str]): List of filing types to download.
             series (pd.Series): A single series with info for specific filings.
             raw_filings_folder (str): Raw filings folder path.
-            user_agent (str): The User-agent string that will be declared to SEC EDGAR.
+            company_info_cache (CompanyInfoCache): The companies info cache shared by all crawl threads.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+            submissions (Optional[SubmissionsResolver]): The submissions resolver shared by all crawl threads.
+                    Default is None, which always crawls the HTML index page.
+            raw_store (Optional[RawFilingStore]): The compressed store into which the downloaded files are moved.
+                    Default is None, which keeps them as plain files in the filing type folder.
 
     Returns:
             pd.Series: The series with the extracted data.
     """
 
+    documents = None
+    if submissions is not None:
+        documents = resolve_from_submissions(
+            series=series, filing_types=filing_types, submissions=submissions
+        )
+    if documents is None:
+        documents = resolve_from_index_page(
+            series=series,
+            filing_types=filing_types,
+            session=session,
+            rate_limiter=rate_limiter,
+        )
+    if documents is None:
+        return None
+
+    # Ensuring info of current company is in the companies info cache
+    cik = series["CIK"]
+    company_info = company_info_cache.get(cik)
+    if company_info is None:
+        company_info = get_company_info(
+            cik=cik, session=session, rate_limiter=rate_limiter, submissions=submissions
+        )
+        if company_info is None:
+            return None
+        company_info_cache.add(cik, company_info)
+
+    # Filling series data with information from company_info if they are missing in the series
+    if pd.isna(series["SIC"]):
+        series["SIC"] = company_info["SIC"]
+    if pd.isna(series["State of Inc"]):
+        series["State of Inc"] = company_info["State of Inc"]
+    if pd.isna(series["State location"]):
+        series["State location"] = company_info["State location"]
+    if pd.isna(series["Fiscal Year End"]):
+        series["Fiscal Year End"] = company_info["Fiscal Year End"]
+
+    for link_to_download, file_extension, filing_type in documents:
+        # In the filename, we remove any special characters from the filing type
+        filing_type_name = re.sub(r"[\-/\\]", "", filing_type)
+        accession_num = os.path.splitext(
+            os.path.basename(series["complete_text_file_link"])
+        )[0]
+        filename = f"{str(series['CIK'])}_{filing_type_name}_{series['Period of Report'][:4]}_{accession_num}.{file_extension}"
+
+        # Download the file
+        success = download(
+            url=link_to_download,
+            filename=filename,
+            download_folder=os.path.join(raw_filings_folder, filing_type),
+            session=session,
+            rate_limiter=rate_limiter,
+        )
+        if success:
+            series["filename"] = filename
+        else:
+            return None
+
+        if raw_store is not None:
+            raw_store.put(
+                filing_type=filing_type,
+                filename=filename,
+                source_filepath=os.path.join(raw_filings_folder, filing_type, filename),
+            )
+
+    return series
+
+
+def resolve_from_submissions(
+    series: pd.Series, filing_types: List[str], submissions: SubmissionsResolver
+) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Resolves the document to download and the details of a filing from the submissions JSON of its company.
+
+    Args:
+            series (pd.Series): A single series with info for specific filings.
+            filing_types (List[str]): List of filing types to download.
+            submissions (SubmissionsResolver): The submissions resolver shared by all crawl threads.
+
+    Returns:
+            Optional[List[Tuple[str, str, str]]]: The link, file extension and filing type of the document to download,
+                    or None if the submissions JSON misses any of them, so that the index page must be crawled.
+    """
+    accession_num = os.path.splitext(
+        os.path.basename(series["complete_text_file_link"])
+    )[0]
+    filing = submissions.filing(
+        cik=series["CIK"], accession_number=accession_num, filing_date=series["Date"]
+    )
+
+    # The index page would download the complete submission text file if the primary document is not HTML
+    if (
+        filing is None
+        or not filing["Period of Report"]
+        or filing["form"] not in filing_types
+        or filing["primaryDocument"].split(".")[-1] not in ["htm", "html"]
+    ):
+        return None
+
+    series["Filing Date"] = filing["Filing Date"]
+    series["Period of Report"] = filing["Period of Report"]
+    series["htm_file_link"] = filing["url"]
+
+    return [(filing["url"], filing["primaryDocument"].split(".")[-1], filing["form"])]
+
+
+def resolve_from_index_page(
+    series: pd.Series,
+    filing_types: List[str],
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Crawls the EDGAR HTML index page of a filing for the documents to download and the details of the filing.
+
+    Args:
+            series (pd.Series): A single series with info for specific filings.
+            filing_types (List[str]): List of filing types to download.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+
+    Returns:
+            Optional[List[Tuple[str, str, str]]]: The link, file extension and filing type of every document to download,
+                    or None if the index page could not be crawled.
+    """
+
     html_index = series["html_index"]
 
     # Retries for making the request if not successful at first attempt
     try:
-        # Exponential backoff retry logic
-        retries_exceeded = True
-        for _ in range(5):
-            session = requests.Session()
-            request = requests_retry_session(
-                retries=5, backoff_factor=0.2, session=session
-            ).get(url=html_index, headers={"User-agent": user_agent})
-
-            if (
-                "will be managed until action is taken to declare your traffic."
-                not in request.text
-            ):
-                retries_exceeded = False
-                break
+        request = get_with_backoff(
+            session=session, url=html_index, rate_limiter=rate_limiter
+        )
 
-        if retries_exceeded:
+        if request is None:
             LOGGER.debug(f'Retries exceeded, could not download "{html_index}"')
             return None
 
@@ -510,37 +883,24 @@ def crawl(
         )
         return None
 
-    soup = BeautifulSoup(request.content, "lxml")
-
-    # Parsing HTML to extract required details
+    # Parse the index page with the fast lxml parser. Pages that it cannot handle fall back to BeautifulSoup.
     try:
-        list_of_forms = soup.find_all("div", {"class": ["infoHead", "info"]})
-    except (HTMLParseError, Exception):
-        list_of_forms = None
+        index_page = parse_index_page(request.content)
+    except (ValueError, etree.LxmlError):
+        index_page = parse_index_page_soup(request.content)
 
     # Extraction of 'Filing Date' and 'Period of Report'
-    period_of_report = None
-    for form in list_of_forms:
-        if form.attrs["class"][0] == "infoHead" and form.text == "Filing Date":
-            series["Filing Date"] = form.nextSibling.nextSibling.text
-
-        if form.attrs["class"][0] == "infoHead" and form.text == "Period of Report":
-            period_of_report = form.nextSibling.nextSibling.text
-            series["Period of Report"] = period_of_report
+    if index_page["Filing Date"] is not None:
+        series["Filing Date"] = index_page["Filing Date"]
 
+    period_of_report = index_page["Period of Report"]
     if period_of_report is None:
         LOGGER.debug(f'Can not crawl "Period of Report" for {html_index}')
         return None
+    series["Period of Report"] = period_of_report
 
     # Extracting the company info
-    try:
-        company_info = (
-            soup.find("div", {"class": ["companyInfo"]})
-            .find("p", {"class": ["identInfo"]})
-            .text
-        )
-    except (HTMLParseError, Exception):
-        company_info = None
+    company_info = index_page["identInfo"]
 
     # Parsing company info to extract details like 'State of Incorporation', 'State location'
     try:
@@ -563,184 +923,220 @@ def crawl(
         series["Fiscal Year End"] = fiscal_year_end_regex.group(1)
 
     # Crawl for the Sector Industry Code (SIC)
-    try:
-        sic = soup.select_one('.identInfo a[href*="SIC"]')
-        if sic is not None:
-            series["SIC"] = sic.text
-    except (HTMLParseError, Exception):
-        pass
+    if index_page["SIC"] is not None:
+        series["SIC"] = index_page["SIC"]
 
-    # Loading previously stored companies info
-    with open(os.path.join(DATASET_DIR, "companies_info.json")) as f:
-        company_info_dict = json.load(fp=f)
+    """
+    Tables are of 2 kinds. 
+    The 'Document Format Files' table contains all the htms, jpgs, pngs and txts for the reports.
+    The 'Data Format Files' table contains all the xml instances that contain structured information.
+    """
+    # The links are relative to the host of the index page, i.e. https://www.sec.gov
+    documents = []
+    for rows in index_page["Document Format Files"]:
+        # Get the htm/html/txt files
+        htm_file_link, complete_text_file_link, link_to_download = None, None, None
+        filing_type = None
+
+        # Iterate through rows to identify required links
+        for description, href, document_type in rows:
+            # If it's the specific document type (e.g. 10-K)
+            if document_type in filing_types:
+                filing_type = document_type
+                if href.split(".")[-1] in ["htm", "html"]:
+                    htm_file_link = urljoin(html_index, href)
+                    series["htm_file_link"] = str(htm_file_link)
+                    break
 
-    # Ensuring info of current company is in the companies info dictionary
-    cik = series["CIK"]
-    if cik not in company_info_dict:
-        company_url = f"https://www.sec.gov/cgi-bin/browse-edgar?CIK={cik}"
+            # Else get the complete submission text file
+            elif description == "Complete submission text file":
+                filing_type = series["Type"]
+                complete_text_file_link = urljoin(html_index, href)
+                series["complete_text_file_link"] = str(complete_text_file_link)
+                break
 
-        # Similar retry logic for fetching the company info
-        try:
-            retries_exceeded = True
-            for _ in range(5):
-                session = requests.Session()
-                request = requests_retry_session(
-                    retries=5, backoff_factor=0.2, session=session
-                ).get(url=company_url, headers={"User-agent": user_agent})
-
-                if (
-                    "will be managed until action is taken to declare your traffic."
-                    not in request.text
-                ):
-                    retries_exceeded = False
-                    break
+        # Prepare final link to download
+        if htm_file_link is not None:
+            # In case of iXBRL documents, a slight URL modification is required
+            if "ix?doc=/" in htm_file_link:
+                link_to_download = htm_file_link.replace("ix?doc=/", "")
+                series["htm_file_link"] = link_to_download
+                file_extension = "htm"
+            else:
+                link_to_download = htm_file_link
+                file_extension = htm_file_link.split(".")[-1]
 
-            if retries_exceeded:
-                LOGGER.debug(f'Retries exceeded, could not download "{company_url}"')
-                return None
-
-        except (
-            RequestException,
-            HTTPError,
-            ConnectionError,
-            Timeout,
-            RetryError,
-        ) as err:
-            LOGGER.debug(
-                f"Request for {company_url} failed due to network-related error: {err}"
-            )
+        elif complete_text_file_link is not None:
+            link_to_download = complete_text_file_link
+            file_extension = link_to_download.split(".")[-1]
+
+        # If a valid link is available, add it to the documents to download
+        if link_to_download is None:
             return None
+        documents.append((link_to_download, file_extension, filing_type))
+
+    # Without a Document Format Files table, there is nothing to download
+    return documents if len(documents) > 0 else None
 
-        # Storing the extracted company info into the dictionary
-        company_info_dict[cik] = {
-            "Company Name": None,
-            "SIC": None,
-            "State location": None,
-            "State of Inc": None,
-            "Fiscal Year End": None,
-        }
-        company_info_soup = BeautifulSoup(request.content, "lxml")
 
-        # Parsing the company_info_soup to extract required details
-        company_info = company_info_soup.find("div", {"class": ["companyInfo"]})
+def get_company_info(
+    cik: str,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+    submissions: Optional[SubmissionsResolver] = None,
+) -> Optional[dict]:
+    """
+    Gets the details of a company from its submissions JSON, falling back to crawling its EDGAR company page.
+
+    Args:
+            cik (str): The CIK of the company.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+            submissions (Optional[SubmissionsResolver]): The submissions resolver shared by all crawl threads.
+                    Default is None, which always crawls the company page.
+
+    Returns:
+            Optional[dict]: The info of the company, or None if it could not be downloaded.
+    """
+    if submissions is not None:
+        company_info = submissions.company_info(cik)
         if company_info is not None:
-            company_info_dict[cik]["Company Name"] = str(
-                company_info.find("span", {"class": ["companyName"]}).contents[0]
-            ).strip()
-            company_info_contents = company_info.find(
-                "p", {"class": ["identInfo"]}
-            ).contents
-
-            for idx, content in enumerate(company_info_contents):
-                if ";SIC=" in str(content):
-                    company_info_dict[cik]["SIC"] = content.text
-                if ";State=" in str(content):
-                    company_info_dict[cik]["State location"] = content.text
-                if "State of Inc" in str(content):
-                    company_info_dict[cik]["State of Inc"] = company_info_contents[
-                        idx + 1
-                    ].text
-                if "Fiscal Year End" in str(content):
-                    company_info_dict[cik]["Fiscal Year End"] = str(content).split()[-1]
-
-        # Updating the json file with the latest data
-        with open(os.path.join(DATASET_DIR, "companies_info.json"), "w") as f:
-            json.dump(obj=company_info_dict, fp=f, indent=4)
-
-    # Filling series data with information from company_info_dict if they are missing in the series
-    if pd.isna(series["SIC"]):
-        series["SIC"] = company_info_dict[cik]["SIC"]
-    if pd.isna(series["State of Inc"]):
-        series["State of Inc"] = company_info_dict[cik]["State of Inc"]
-    if pd.isna(series["State location"]):
-        series["State location"] = company_info_dict[cik]["State location"]
-    if pd.isna(series["Fiscal Year End"]):
-        series["Fiscal Year End"] = company_info_dict[cik]["Fiscal Year End"]
+            return company_info
+
+    return fetch_company_info(cik=cik, session=session, rate_limiter=rate_limiter)
+
+
+def fetch_company_info(
+    cik: str, session: requests.Session, rate_limiter: RateLimiter
+) -> Optional[dict]:
+    """
+    Crawls the EDGAR company page of a company and extracts its details.
+
+    Args:
+            cik (str): The CIK of the company.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+
+    Returns:
+            Optional[dict]: The info of the company, or None if the company page could not be downloaded.
+    """
 
-    # Crawl the soup for the financial files
+    company_url = f"https://www.sec.gov/cgi-bin/browse-edgar?CIK={cik}"
+
+    # Similar retry logic as for the filing index pages
     try:
-        all_tables = soup.find_all("table")
-    except (HTMLParseError, Exception):
+        request = get_with_backoff(
+            session=session, url=company_url, rate_limiter=rate_limiter
+        )
+
+        if request is None:
+            LOGGER.debug(f'Retries exceeded, could not download "{company_url}"')
+            return None
+
+    except (
+        RequestException,
+        HTTPError,
+        ConnectionError,
+        Timeout,
+        RetryError,
+    ) as err:
+        LOGGER.debug(
+            f"Request for {company_url} failed due to network-related error: {err}"
+        )
         return None
 
+    # Storing the extracted company info into a dictionary
+    company_info_dict = {
+        "Company Name": None,
+        "SIC": None,
+        "State location": None,
+        "State of Inc": None,
+        "Fiscal Year End": None,
+    }
+    company_info_soup = BeautifulSoup(request.content, "lxml")
+
+    # Parsing the company_info_soup to extract required details
+    company_info = company_info_soup.find("div", {"class": ["companyInfo"]})
+    if company_info is not None:
+        company_info_dict["Company Name"] = str(
+            company_info.find("span", {"class": ["companyName"]}).contents[0]
+        ).strip()
+        company_info_contents = company_info.find(
+            "p", {"class": ["identInfo"]}
+        ).contents
+
+        for idx, content in enumerate(company_info_contents):
+            if ";SIC=" in str(content):
+                company_info_dict["SIC"] = content.text
+            if ";State=" in str(content):
+                company_info_dict["State location"] = content.text
+            if "State of Inc" in str(content):
+                company_info_dict["State of Inc"] = company_info_contents[idx + 1].text
+            if "Fiscal Year End" in str(content):
+                company_info_dict["Fiscal Year End"] = str(content).split()[-1]
+
+    return company_info_dict
+
+
+def prefetch_companies_info(
+    ciks: List[str],
+    company_info_cache: CompanyInfoCache,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+    max_workers: int = 1,
+    submissions: Optional[SubmissionsResolver] = None,
+) -> None:
     """
-    Tables are of 2 kinds. 
-    The 'Document Format Files' table contains all the htms, jpgs, pngs and txts for the reports.
-    The 'Data Format Files' table contains all the xml instances that contain structured information.
-    """
-    for table in all_tables:
-        # Get the htm/html/txt files
-        if table.attrs["summary"] == "Document Format Files":
-            htm_file_link, complete_text_file_link, link_to_download = None, None, None
-            filing_type = None
-
-            # Iterate through rows to identify required links
-            for tr in table.find_all("tr")[1:]:
-                # If it's the specific document type (e.g. 10-K)
-                if tr.contents[7].text in filing_types:
-                    filing_type = tr.contents[7].text
-                    if tr.contents[5].contents[0].attrs["href"].split(".")[-1] in [
-                        "htm",
-                        "html",
-                    ]:
-                        htm_file_link = (
-                            "https://www.sec.gov"
-                            + tr.contents[5].contents[0].attrs["href"]
-                        )
-                        series["htm_file_link"] = str(htm_file_link)
-                        break
-
-                # Else get the complete submission text file
-                elif tr.contents[3].text == "Complete submission text file":
-                    filing_type = series["Type"]
-                    complete_text_file_link = (
-                        "https://www.sec.gov" + tr.contents[5].contents[0].attrs["href"]
-                    )
-                    series["complete_text_file_link"] = str(complete_text_file_link)
-                    break
+    Crawls the EDGAR company pages of all companies that are not cached yet, before the filings are crawled.
 
-            # Prepare final link to download
-            if htm_file_link is not None:
-                # In case of iXBRL documents, a slight URL modification is required
-                if "ix?doc=/" in htm_file_link:
-                    link_to_download = htm_file_link.replace("ix?doc=/", "")
-                    series["htm_file_link"] = link_to_download
-                    file_extension = "htm"
-                else:
-                    link_to_download = htm_file_link
-                    file_extension = htm_file_link.split(".")[-1]
-
-            elif complete_text_file_link is not None:
-                link_to_download = complete_text_file_link
-                file_extension = link_to_download.split(".")[-1]
-
-            # If a valid link is available, initiate download
-            if link_to_download is not None:
-                # In the filename, we remove any special characters from the filing type
-                filing_type_name = re.sub(r"[\-/\\]", "", filing_type)
-                accession_num = os.path.splitext(
-                    os.path.basename(series["complete_text_file_link"])
-                )[0]
-                filename = f"{str(series['CIK'])}_{filing_type_name}_{period_of_report[:4]}_{accession_num}.{file_extension}"
-
-                # Download the file
-                success = download(
-                    url=link_to_download,
-                    filename=filename,
-                    download_folder=os.path.join(raw_filings_folder, filing_type),
-                    user_agent=user_agent,
-                )
-                if success:
-                    series["filename"] = filename
-                else:
-                    return None
-            else:
-                return None
+    With a submissions resolver, the submissions JSON of the companies is downloaded instead, which also
+    resolves their recent filings ahead of the crawl.
 
-    return series
+    Args:
+            ciks (List[str]): The CIKs of the companies whose filings will be crawled.
+            company_info_cache (CompanyInfoCache): The companies info cache to fill.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+            max_workers (int): The number of company pages to crawl concurrently. Default is 1.
+            submissions (Optional[SubmissionsResolver]): The submissions resolver shared by all crawl threads.
+                    Default is None.
+    """
 
+    missing_ciks = [cik for cik in dict.fromkeys(ciks) if cik not in company_info_cache]
+    if not missing_ciks:
+        return
+
+    LOGGER.info(
+        f"\nDownloading the info of {len(missing_ciks)} companies from EDGAR...\n"
+    )
 
-def download(url: str, filename: str, download_folder: str, user_agent: str) -> bool:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                get_company_info,
+                cik=cik,
+                session=session,
+                rate_limiter=rate_limiter,
+                submissions=submissions,
+            ): cik
+            for cik in missing_ciks
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), ncols=100):
+            company_info = future.result()
+            # The companies that failed here are retried when their filings are crawled
+            if company_info is not None:
+                company_info_cache.add(futures[future], company_info)
+
+    company_info_cache.flush()
+
+
+def download(
+    url: str,
+    filename: str,
+    download_folder: str,
+    session: requests.Session,
+    rate_limiter: RateLimiter,
+) -> bool:
     """
     Downloads a file from the given URL and saves it to the specified directory.
 
@@ -751,57 +1147,164 @@ def download(url: str, filename: str, download_folder: str, user_agent: str) ->
             url (str): The URL of the file to download.
             filename (str): The name to give to the downloaded file. This should include the file extension.
             download_folder (str): The directory to save the downloaded file in.
-            user_agent (str): The User-Agent string to use when making the request.
+            session (requests.Session): The session shared by all requests to SEC EDGAR.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
 
     Returns:
             bool: True if the download was successful, False otherwise.
     """
 
-    # Create the full file path
+    # Create the full file path. The file is streamed to a partial file first, which is renamed once it is complete.
+    # A partial file left behind by an interrupted download is resumed with an HTTP Range request.
     filepath = os.path.join(download_folder, filename)
+    partial_filepath = f"{filepath}.part"
 
     try:
-        # Initialize a flag to track if retries are exceeded
-        retries_exceeded = True
-
-        # Attempt to download the file up to 5 times
+        # Attempt to download the file up to 5 times, backing off whenever EDGAR throttles us
         for _ in range(5):
-            # Create a new requests session
-            session = requests.Session()
-
-            # Make a GET request to the URL with retries and backoff
-            request = requests_retry_session(
-                retries=5, backoff_factor=0.2, session=session
-            ).get(url=url, headers={"User-agent": user_agent})
-
-            # If the response does not contain a specific error message, break the loop
-            if (
-                "will be managed until action is taken to declare your traffic."
-                not in request.text
-            ):
-                retries_exceeded = False
-                break
+            resumed_bytes = (
+                os.path.getsize(partial_filepath)
+                if os.path.exists(partial_filepath)
+                else 0
+            )
+            # Byte ranges are only consistent with the uncompressed representation of the file
+            headers = (
+                {"Range": f"bytes={resumed_bytes}-", "Accept-Encoding": "identity"}
+                if resumed_bytes
+                else {}
+            )
+
+            rate_limiter.acquire()
+            start_time = time.monotonic()
+            with session.get(url=url, headers=headers, stream=True) as request:
+                # Only the first KB is read before deciding whether EDGAR throttled the request
+                head = request.raw.read(THROTTLING_SNIFF_BYTES, decode_content=True)
+                if is_throttled(request, head):
+                    rate_limiter.throttled()
+                    continue
+                rate_limiter.succeeded()
+
+                # The partial file is already complete or does not match the file anymore, so start over
+                if request.status_code == 416:
+                    os.remove(partial_filepath)
+                    continue
+                request.raise_for_status()
+
+                # If the server ignored the Range header, it sent the whole file again
+                mode = "ab" if request.status_code == 206 else "wb"
+                with open(partial_filepath, mode) as f:
+                    f.write(head)
+                    downloaded_bytes = len(head)
+                    for chunk in request.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        downloaded_bytes += len(chunk)
+
+            os.replace(partial_filepath, filepath)
+
+            elapsed = max(time.monotonic() - start_time, 1e-6)
+            LOGGER.debug(
+                f'Downloaded "{filename}": {downloaded_bytes} bytes'
+                f"{f' (resumed after {resumed_bytes} bytes)' if mode == 'ab' else ''}"
+                f" at {downloaded_bytes / elapsed:.0f} bytes/s"
+            )
+            return True
 
         # If retries are exceeded, log a debug message and return False
-        if retries_exceeded:
-            LOGGER.debug(f'Retries exceeded, could not download "{filename}" - "{url}"')
-            return False
+        LOGGER.debug(f'Retries exceeded, could not download "{filename}" - "{url}"')
+        return False
 
     except (RequestException, HTTPError, ConnectionError, Timeout, RetryError) as err:
-        # If a network-related error occurs, log a debug message and return False
+        # If a network-related error occurs, log a debug message and return False.
+        # The partial file is kept, so that the next run resumes the download.
         LOGGER.debug(f"Request for {url} failed due to network-related error: {err}")
         return False
 
-    # If the download was successful, save the file
-    with open(filepath, "wb") as f:
-        f.write(request.content)
 
-    # Uncomment the following lines to check the MD5 hash of the downloaded file
-    # if hashlib.md5(open(filepath, 'rb').read()).hexdigest() != headers._headers[1][1].strip('"'):
-    # 	LOGGER.info(f'Wrong MD5 hash for file: {abs_filename} - {url}')
+def is_throttled(request: requests.Response, head: Optional[bytes] = None) -> bool:
+    """
+    Checks whether SEC EDGAR throttled a request instead of returning the requested content.
 
-    # If the function has not returned False by this point, the download was successful
-    return True
+    Args:
+            request (requests.Response): The response of SEC EDGAR.
+            head (Optional[bytes]): For streamed responses, the first bytes of the body that were already read.
+                    Only these bytes are inspected, unless the status code is one of the throttling status codes,
+                    in which case the (small) error page is read completely. Default is None, for non-streamed responses.
+
+    Returns:
+            bool: True if the response is the throttling page, False otherwise.
+    """
+    if request.status_code == 429:
+        return True
+    if head is None:
+        return THROTTLING_MESSAGE in request.text
+
+    if request.status_code in THROTTLING_STATUS_CODES:
+        head += request.content
+    return THROTTLING_MESSAGE.encode() in head or THROTTLING_TITLE.encode() in head
+
+
+def get_with_backoff(
+    session: requests.Session, url: str, rate_limiter: RateLimiter, retries: int = 5
+) -> Optional[requests.Response]:
+    """
+    Sends a GET request to SEC EDGAR, respecting the shared rate limit.
+
+    Whenever SEC EDGAR responds with its throttling page, the rate limiter is notified so that all threads
+    slow down and pause, and the request is retried afterwards.
+
+    Args:
+            session (requests.Session): The session shared by all requests to SEC EDGAR, see create_edgar_session().
+            url (str): The URL to request.
+            rate_limiter (RateLimiter): The rate limiter shared by all requests to SEC EDGAR.
+            retries (int): The number of times to retry a throttled request. Default is 5.
+
+    Returns:
+            Optional[requests.Response]: The response, or None if the request was still throttled after all retries.
+
+    Raises:
+            RequestException: If a network-related error occurs.
+    """
+    for _ in range(retries):
+        rate_limiter.acquire()
+        request = session.get(url=url)
+
+        if not is_throttled(request):
+            rate_limiter.succeeded()
+            # Other 403 responses are errors that no amount of waiting is going to fix
+            if request.status_code in THROTTLING_STATUS_CODES:
+                request.raise_for_status()
+            return request
+
+        rate_limiter.throttled()
+
+    return None
+
+
+def create_edgar_session(user_agent: str, pool_size: int = 10) -> requests.Session:
+    """
+    Creates the long-lived session that is shared by all requests to SEC EDGAR.
+
+    The session keeps a pool of keep-alive connections, so that every request after the first one to a host
+    reuses an open TCP+TLS connection instead of paying a new handshake.
+
+    Args:
+            user_agent (str): The User-Agent string that will be declared to SEC EDGAR.
+            pool_size (int): The maximum number of connections kept alive per host.
+                    It should not be smaller than the number of threads crawling concurrently. Default is 10.
+
+    Returns:
+            requests.Session: A requests session configured with retry behavior and connection pooling.
+    """
+    # Throttling responses (403/429) are not retried by urllib3, since get_with_backoff() backs off on them
+    session = requests_retry_session(
+        retries=5,
+        backoff_factor=0.2,
+        status_forcelist=(400, 401, 500, 502, 503, 504, 505),
+        pool_maxsize=pool_size,
+    )
+    session.headers.update({"User-agent": user_agent, "Connection": "keep-alive"})
+
+    return session
 
 
 def requests_retry_session(
@@ -809,6 +1312,7 @@ def requests_retry_session(
     backoff_factor: float = 0.5,
     status_forcelist: tuple = (400, 401, 403, 500, 502, 503, 504, 505),
     session: requests.Session = None,
+    pool_maxsize: int = 10,
 ) -> requests.Session:
     """
     Creates a new requests session that automatically retries failed requests.
@@ -820,6 +1324,7 @@ def requests_retry_session(
                     A retry is initiated if the HTTP status code of the response is in this list.
                     Default is a tuple of common server error codes.
             session (requests.Session): An existing requests session to use. If not provided, a new session will be created.
+            pool_maxsize (int): The maximum number of connections kept alive per host. Default is 10.
 
     Returns:
             requests.Session: A requests session configured with retry behavior.
@@ -840,7 +1345,7 @@ def requests_retry_session(
 
     # Create an HTTPAdapter with the Retry object
     # HTTPAdapter is a built-in requests Adapter that sends HTTP requests
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
 
     # Mount the HTTPAdapter to the session for both HTTP and HTTPS requests
     session.mount("http://", adapter)
@@ -851,4 +1356,7 @@ def requests_retry_session(
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:
+        exit(0)
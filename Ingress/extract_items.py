@@ -1,22 +1,29 @@
+import bisect
+import functools
+import heapq
 import json
 import logging
 import os
 import re
 import sys
+import time
 from html.parser import HTMLParser
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import click
 import cssutils
 import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
+from bs4.element import PreformattedString, Tag
 from pathos.pools import ProcessPool
 from tqdm import tqdm
 
 from __init__ import DATASET_DIR
 from item_lists import item_list_8k, item_list_8k_obsolete, item_list_10k, item_list_10q
 from logger import Logger
+from raw_store import RawFilingStore
+from sgml_documents import SgmlIndex
 
 # Change the default recursion limit of 1000 to 30000
 sys.setrecursionlimit(30000)
@@ -55,6 +62,435 @@ roman_numeral_map = {
 # Instantiate a logger object
 LOGGER = Logger(name="ExtractItems").get_logger()
 
+# Documents are only parsed as HTML if they contain both of these tags
+HTML_TD_TAG_PATTERN = re.compile(r"<td", re.IGNORECASE)
+HTML_TR_TAG_PATTERN = re.compile(r"<tr", re.IGNORECASE)
+
+# The texts that mark_text_breaks() adds after the closing tags of blocks and around the closing tags of cells
+CLOSING_TAG_TEXTS = {
+    "div": "\n\n",
+    "tr": "\n\n",
+    "p": "\n\n",
+    "li": "\n\n",
+    "th": "  ",
+    "td": "  ",
+}
+# The elements whose strings are serialized without escaping, and which HTMLParser does not unescape
+CDATA_ELEMENTS = HTMLParser.CDATA_CONTENT_ELEMENTS
+
+# The substitutions of special characters in clean_text(). Characters that were substituted by themselves,
+# e.g. \u2018 by ‘, are left out.
+SPECIAL_CHARACTER_TABLE = str.maketrans(
+    {
+        "\xa0": " ",
+        "\u200b": " ",
+        "\u2009": " ",
+        "\x91": "‘",
+        "\x92": "’",
+        "\x93": "“",
+        "\x94": "”",
+        "\x95": "•",
+        "\x96": "-",
+        "\x97": "-",
+        "\x98": "˜",
+        "\x99": "™",
+        "\u2010": "-",
+        "\u2011": "-",
+        "\u2012": "-",
+        "\u2013": "-",
+        "\u2014": "-",
+        "\u2015": "-",
+    }
+)
+# The special characters, which are looked up in the table as they are found. str.translate() would look up
+# every character of a text that is not pure ASCII, which is slower than one regex pass over it.
+SPECIAL_CHARACTER_PATTERN = re.compile(
+    "[" + "".join(map(chr, SPECIAL_CHARACTER_TABLE)) + "]"
+)
+
+HORIZONTAL_WHITESPACE_PATTERN = re.compile(r"[^\S\r\n]")
+# The headers with whitespace between their letters, e.g. "P A R T I" or "S IGNATURES", at the start of a line.
+# The first group is the start of the line and the second one the header word, up to the whitespace before
+# the number of the part or item, or after the signature.
+BROKEN_HEADER_PATTERN = re.compile(
+    r"(\n[^\S\r\n]*)("
+    r"P[^\S\r\n]*A[^\S\r\n]*R[^\S\r\n]*T(?=[^\S\r\n]+(?:\d|[IV]))"
+    r"|I[^\S\r\n]*T[^\S\r\n]*E[^\S\r\n]*M(?=[^\S\r\n]+\d)"
+    r"|S[^\S\r\n]*I[^\S\r\n]*G[^\S\r\n]*N[^\S\r\n]*A[^\S\r\n]*T[^\S\r\n]*U[^\S\r\n]*R[^\S\r\n]*E"
+    r"[^\S\r\n]*(?:S|\([^\S\r\n]*s[^\S\r\n]*\))?(?=[^\S\r\n])"
+    r")",
+    re.IGNORECASE,
+)
+# A part or item number followed by a dash or bullet, in any case. The pattern starts with the first letters of
+# ITEM and PART that match when ignoring case, including the dotted and dotless I, so that the regex engine scans
+# for them instead of trying the whole pattern at every position.
+HEADER_DASH_PATTERN = re.compile(
+    r"([IiİıPp](?i:(?<=I)TEM|(?<=P)ART))(?i:(\s+\d{1,2}[AB]?)([\-•]))"
+)
+UNNECESSARY_HEADER_PATTERN = re.compile(
+    r"\n[^\S\r\n]*"
+    r"(TABLE\s+OF\s+CONTENTS|INDEX\s+TO\s+FINANCIAL\s+STATEMENTS|BACK\s+TO\s+CONTENTS|QUICKLINKS)"
+    r"[^\S\r\n]*\n",
+    re.IGNORECASE | re.MULTILINE,
+)
+DASHED_PAGE_NUMBER_PATTERN = re.compile(
+    r"\n[^\S\r\n]*[-‒–—]*\d+[-‒–—]*[^\S\r\n]*\n", re.IGNORECASE | re.MULTILINE
+)
+PAGE_NUMBER_PATTERN = re.compile(
+    r"\n[^\S\r\n]*\d+[^\S\r\n]*\n", re.IGNORECASE | re.MULTILINE
+)
+FINANCIAL_PAGE_NUMBER_PATTERN = re.compile(
+    r"[\n\s]F[-‒–—]*\d+", re.IGNORECASE | re.MULTILINE
+)
+PAGE_HEADER_PATTERN = re.compile(
+    r"\n[^\S\r\n]*Page\s[\d*]+[^\S\r\n]*\n", re.IGNORECASE | re.MULTILINE
+)
+
+# Filings are batched into tasks of up to this many bytes, so that tiny filings do not cost one task each
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+MAX_BATCH_FILINGS = 256
+
+
+@functools.lru_cache(maxsize=None)
+def item_index_pattern(item_index: str) -> str:
+    """
+    Returns the regex pattern of the header of an item in the document text. See ExtractItems.adjust_item_patterns().
+    """
+    # For 10-Q reports, we have two parts of items: part1 and part2
+    if "part" in item_index:
+        if "__" not in item_index:
+            # We are searching for the general part, not a specific item (e.g. PART I)
+            item_index_number = item_index.split("_")[1]
+            item_index_pattern = rf"PART\s*(?:{roman_numeral_map[item_index_number]}|{item_index_number})"
+            return item_index_pattern
+        else:
+            # We are working with an item, but we just consider the string after the part as the item_index
+            item_index = item_index.split("__")[1]
+
+    # Create a regex pattern from the item index
+    item_index_pattern = item_index
+
+    # Modify the item index format for matching in the text
+    if item_index == "9A":
+        item_index_pattern = item_index_pattern.replace(
+            "A", r"[^\S\r\n]*A(?:\(T\))?"
+        )  # Regex pattern for item index "9A"
+    elif item_index == "SIGNATURE":
+        # Quit here so the A in SIGNATURE is not changed
+        pass
+    elif "A" in item_index:
+        item_index_pattern = item_index_pattern.replace(
+            "A", r"[^\S\r\n]*A"
+        )  # Regex pattern for other "A" item indexes
+    elif "B" in item_index:
+        item_index_pattern = item_index_pattern.replace(
+            "B", r"[^\S\r\n]*B"
+        )  # Regex pattern for "B" item indexes
+    elif "C" in item_index:
+        item_index_pattern = item_index_pattern.replace(
+            "C", r"[^\S\r\n]*C"
+        )  # Regex pattern for "C" item indexes
+
+    # If the item is SIGNATURE, we don't want to look for ITEM
+    if item_index == "SIGNATURE":
+        # Some reports have SIGNATURES or Signature(s) instead of SIGNATURE
+        item_index_pattern = rf"{item_index}(s|\(s\))?"
+    else:
+        if "." in item_index:
+            # We need to escape the '.', otherwise it will be treated as a special character - for 8Ks
+            item_index = item_index.replace(".", r"\.")
+        if item_index in roman_numeral_map:
+            # Rarely, reports use roman numerals for the item indexes. For 8-K, we assume this does not occur (due to their format - e.g. 5.01)
+            item_index = f"(?:{roman_numeral_map[item_index]}|{item_index})"
+        item_index_pattern = rf"ITEM\s*{item_index}"
+
+    return item_index_pattern
+
+
+class ItemPatterns:
+    """
+    Table of the compiled regex patterns of the item headers, shared by all extraction paths.
+
+    The header patterns of the 10-K, 10-Q, 8-K and obsolete 8-K items are compiled once per process when the
+    table is created, instead of being rebuilt from f-strings for every item of every filing and looked up in
+    the small cache of the re module, which the hundreds of distinct item patterns overflow.
+    The patterns of whole sections between an item and a possible next item, which HeaderIndex only falls
+    back to in rare cases, are compiled when they are first needed and kept in the table from then on.
+    """
+
+    def __init__(self, items_lists: List[List[str]]) -> None:
+        """
+        Compiles the header patterns of the items.
+
+        Args:
+            items_lists (List[List[str]]): The items of every filing type.
+        """
+        self.patterns: Dict[Tuple[Any, ...], re.Pattern] = {}
+        for items_list in items_lists:
+            for item_index in items_list:
+                for ignore_case in [True, False]:
+                    self.header(item_index, ignore_case)
+                    self.section_start(item_index, ignore_case)
+                self.table_header(item_index)
+                self.last_section(item_index)
+
+    def _compile(self, key: Tuple[Any, ...], pattern: str, flags: int) -> re.Pattern:
+        compiled_pattern = self.patterns.get(key)
+        if compiled_pattern is None:
+            compiled_pattern = self.patterns[key] = re.compile(pattern, flags)
+        return compiled_pattern
+
+    def header(self, item_index: str, ignore_case: bool = True) -> re.Pattern:
+        """
+        Returns the pattern of the headers of an item, as searched for by ExtractItems.parse_item().
+        This is also the pattern of the header of the next item that ends a section.
+        """
+        return self._compile(
+            ("header", item_index, ignore_case),
+            rf"\n[^\S\r\n]*{item_index_pattern(item_index)}[.*~\-:\s\(]",
+            (re.IGNORECASE | re.DOTALL) if ignore_case else re.DOTALL,
+        )
+
+    def section_start(self, item_index: str, ignore_case: bool) -> re.Pattern:
+        """
+        Returns the pattern of the header of an item that starts a section, which also allows a closing parenthesis.
+        """
+        return self._compile(
+            ("section_start", item_index, ignore_case),
+            rf"\n[^\S\r\n]*{item_index_pattern(item_index)}[.*~\-:\s\()]",
+            (re.IGNORECASE | re.DOTALL) if ignore_case else re.DOTALL,
+        )
+
+    def table_header(self, item_index: str) -> re.Pattern:
+        """
+        Returns the pattern of the headers of an item in a table, as searched for by ExtractItems.remove_html_tables().
+        """
+        return self._compile(
+            ("table_header", item_index),
+            rf"\n[^\S\r\n]*{item_index_pattern(item_index)}[.*~\-:\s]",
+            regex_flags,
+        )
+
+    def table_headers(self, items_list: List[str]) -> re.Pattern:
+        """
+        Returns the pattern of the headers of any of the items in a table, which matches wherever
+        the table_header() pattern of one of the items matches.
+        """
+        return self._compile(
+            ("table_headers", tuple(items_list)),
+            rf"\n[^\S\r\n]*(?:{'|'.join(map(item_index_pattern, items_list))})[.*~\-:\s]",
+            regex_flags,
+        )
+
+    def last_section(self, item_index: str) -> re.Pattern:
+        """
+        Returns the pattern of the start of the last item section, as searched for by ExtractItems.get_last_item_section().
+        """
+        return self._compile(
+            ("last_section", item_index),
+            rf"\n[^\S\r\n]*{item_index_pattern(item_index)}[.\-:\s].+?",
+            regex_flags,
+        )
+
+    def section(
+        self, item_index: str, next_item_index: str, ignore_case: bool
+    ) -> re.Pattern:
+        """
+        Returns the pattern of the sections between the header of an item and the header of the next item.
+
+        Args:
+            item_index (str): The item index.
+            next_item_index (str): The index of the possible next item.
+            ignore_case (bool): Whether the headers are matched case-insensitively.
+
+        Returns:
+            re.Pattern: The compiled pattern, whose group 1 is the header of the next item.
+        """
+        return self._compile(
+            ("section", item_index, next_item_index, ignore_case),
+            rf"\n[^\S\r\n]*{item_index_pattern(item_index)}[.*~\-:\s\()].+?"
+            rf"(\n[^\S\r\n]*{item_index_pattern(next_item_index)}[.*~\-:\s\(])",
+            (re.IGNORECASE | re.DOTALL) if ignore_case else re.DOTALL,
+        )
+
+
+# The background colors of table cells that do not mark a table for removal, in lower case
+DEFAULT_BACKGROUND_COLORS = ["none", "transparent", "#ffffff", "#fff", "white"]
+
+
+@functools.lru_cache(maxsize=4096)
+def style_has_background(style: str) -> bool:
+    """
+    Returns whether a style attribute sets a background other than the default ones. The cells of a filing
+    repeat the same few styles, so each style is only parsed once.
+    """
+    # A style without the property name cannot set a background, unless the name is written with CSS escapes
+    if "background" not in style.lower() and "\\" not in style:
+        return False
+
+    # Parse given cssText which is assumed to be the content of a HTML style attribute
+    style = cssutils.parseStyle(style)
+    return bool(
+        (
+            style["background"]
+            and style["background"].lower() not in DEFAULT_BACKGROUND_COLORS
+        )
+        or (
+            style["background-color"]
+            and style["background-color"].lower() not in DEFAULT_BACKGROUND_COLORS
+        )
+    )
+
+
+# The compiled item patterns of all filing types, including the 10-Q parts
+ITEM_PATTERNS = ItemPatterns(
+    [
+        item_list_10k,
+        ["part_1", "part_2"] + item_list_10q,
+        item_list_8k,
+        item_list_8k_obsolete,
+    ]
+)
+
+# Every header of an item, part or signature starts at one of the lines that this pattern finds
+HEADER_CANDIDATE_PATTERN = re.compile(
+    r"\n[^\S\r\n]*(?:ITEM|PART|SIGNATURE)", re.IGNORECASE
+)
+
+
+class Section(NamedTuple):
+    """
+    A section between the header of an item and the header of the next item, as positions in the text.
+    """
+
+    # The start of the header of the item
+    start: int
+    # The start of the header of the next item, where the text of the section ends
+    next_start: int
+    # The end of the header of the next item
+    end: int
+
+
+class HeaderIndex:
+    """
+    Index of the item, part and signature headers of a text, from which the item sections are resolved.
+
+    A single scan of the text finds the lines where a header can start, and the header patterns of an item
+    are only matched at these lines, once per text. The sections between an item and a next item are then
+    resolved from the sorted header positions, exactly as the section pattern of ItemPatterns.section() would
+    find them with re.finditer() from a given offset, but without a scan of the rest of the text, and
+    without a copy of it, for every header of the item and every possible next item.
+
+    The header matches and the resolved sections are memoized, so that parsing the same text again, e.g. the
+    10-Q parts with more and more ignored matches, only selects among the sections found before.
+    """
+
+    def __init__(self, text: str) -> None:
+        """
+        Finds the lines of the text where a header can start.
+
+        Args:
+            text (str): The report text.
+        """
+        self.text = text
+        self.candidates = [
+            match.start() for match in HEADER_CANDIDATE_PATTERN.finditer(text)
+        ]
+        self.headers: Dict[re.Pattern, List[re.Match]] = {}
+        self.header_positions: Dict[re.Pattern, List[int]] = {}
+        self.non_overlapping_headers: Dict[re.Pattern, List[re.Match]] = {}
+        self.section_lists: Dict[Tuple[str, str, int, bool], List[Section]] = {}
+
+    def find_all(self, pattern: re.Pattern) -> List[re.Match]:
+        """
+        Returns all the matches of a header pattern in the text, including overlapping ones, by start position.
+        """
+        matches = self.headers.get(pattern)
+        if matches is None:
+            matches = []
+            for candidate in self.candidates:
+                match = pattern.match(self.text, candidate)
+                if match:
+                    matches.append(match)
+            self.headers[pattern] = matches
+            self.header_positions[pattern] = [match.start() for match in matches]
+        return matches
+
+    def finditer(self, pattern: re.Pattern) -> List[re.Match]:
+        """
+        Returns the matches of a header pattern that pattern.finditer() finds in the text, i.e. without overlaps.
+        """
+        matches = self.non_overlapping_headers.get(pattern)
+        if matches is None:
+            matches = []
+            end = 0
+            for match in self.find_all(pattern):
+                if match.start() >= end:
+                    matches.append(match)
+                    end = match.end()
+            self.non_overlapping_headers[pattern] = matches
+        return matches
+
+    def sections(
+        self, item_index: str, next_item_index: str, offset: int, ignore_case: bool
+    ) -> List[Section]:
+        """
+        Resolves the sections between the headers of an item and the headers of a next item after an offset.
+
+        A section starts at a header of the item and ends at the first header of the next item after at least
+        one more character. The next section is searched from the end of the previous one.
+
+        Args:
+            item_index (str): The item index.
+            next_item_index (str): The index of the possible next item.
+            offset (int): The position from which the sections are searched.
+            ignore_case (bool): Whether the headers are matched case-insensitively.
+
+        Returns:
+            List[Section]: The sections, in the order of ItemPatterns.section().finditer(text[offset:]).
+                The list is memoized and must not be modified.
+        """
+        key = (item_index, next_item_index, offset, ignore_case)
+        if key in self.section_lists:
+            return self.section_lists[key]
+
+        start_pattern = ITEM_PATTERNS.section_start(item_index, ignore_case)
+        end_pattern = ITEM_PATTERNS.header(next_item_index, ignore_case)
+        starts = self.find_all(start_pattern)
+        ends = self.find_all(end_pattern)
+        start_positions = self.header_positions[start_pattern]
+        end_positions = self.header_positions[end_pattern]
+
+        sections = []
+        i = bisect.bisect_left(start_positions, offset)
+        while i < len(starts):
+            start = starts[i]
+            # The next header must start after the end of the item header and at least one more character
+            j = bisect.bisect_right(end_positions, start.end())
+            if j < len(ends):
+                section = Section(start.start(), ends[j].start(), ends[j].end())
+            elif bisect.bisect_right(end_positions, start.start()) < j:
+                # A next header only starts within or right after the item header. The section pattern may still
+                # match with a shorter item header, e.g. "ITEM 9A(" for "ITEM 9A(T).", which the regex decides.
+                match = ITEM_PATTERNS.section(
+                    item_index, next_item_index, ignore_case
+                ).match(self.text, start.start())
+                if not match:
+                    i += 1
+                    continue
+                # The header of the next item is the group that is closed last
+                section = Section(
+                    match.start(), match.start(match.lastindex), match.end()
+                )
+            else:
+                i += 1
+                continue
+            sections.append(section)
+            i = bisect.bisect_left(start_positions, section.end, i + 1)
+
+        self.section_lists[key] = sections
+        return sections
+
 
 class HtmlStripper(HTMLParser):
     """
@@ -155,10 +591,16 @@ class ExtractItems:
         self.remove_tables = remove_tables
         # Default list of items to extract
         self.items_to_extract = items_to_extract
+        # The items requested by the user, which determine_items_to_extract() narrows down for every filing type
+        self.requested_items = items_to_extract
         self.include_signature = include_signature
         self.raw_files_folder = raw_files_folder
+        # Reads the raw filings from the compressed store, or from plain files in the filing type folders
+        self.raw_store = RawFilingStore(raw_files_folder)
         self.extracted_files_folder = extracted_files_folder
         self.skip_extracted_filings = skip_extracted_filings
+        # The header index of the last parsed text
+        self.header_index = None
 
     def determine_items_to_extract(self, filing_metadata) -> None:
         """
@@ -184,10 +626,11 @@ class ExtractItems:
 
         self.items_list = items_list
 
-        # Check which items the user provided and which items are available for the filing type
-        if self.items_to_extract:
+        # Check which items the user provided and which items are available for the filing type.
+        # The requested items are kept apart, so that one object can process filings of different types.
+        if self.requested_items:
             overlapping_items_to_extract = [
-                item for item in self.items_to_extract if item in items_list
+                item for item in self.requested_items if item in items_list
             ]
             if overlapping_items_to_extract:
                 self.items_to_extract = overlapping_items_to_extract
@@ -209,17 +652,76 @@ class ExtractItems:
         Returns:
             str: The stripped HTML content.
         """
+        html_content = ExtractItems.mark_text_breaks(html_content)
+        # Use HtmlStripper to strip remaining HTML tags
+        html_content = HtmlStripper().strip_tags(html_content)
+
+        return html_content
+
+    @staticmethod
+    def mark_text_breaks(html_content: str) -> str:
+        """
+        Adds the line breaks and spaces that separate the text of blocks and table cells to the HTML content.
+
+        Args:
+            html_content (str): The HTML content.
+
+        Returns:
+            str: The HTML content with line breaks after the closing tags of blocks and <br> tags,
+                 and spaces around the closing tags of table cells.
+        """
         # Replace closing tags of certain elements with two newline characters
         html_content = re.sub(r"(<\s*/\s*(div|tr|p|li|)\s*>)", r"\1\n\n", html_content)
         # Replace <br> tags with two newline characters
         html_content = re.sub(r"(<br\s*>|<br\s*/>)", r"\1\n\n", html_content)
         # Replace closing tags of certain elements with a space
         html_content = re.sub(r"(<\s*/\s*(th|td)\s*>)", r" \1 ", html_content)
-        # Use HtmlStripper to strip remaining HTML tags
-        html_content = HtmlStripper().strip_tags(html_content)
 
         return html_content
 
+    @staticmethod
+    def html_tree_to_text(doc: Tag) -> str:
+        """
+        Extracts the text of a parsed HTML document, like strip_html() does on the serialized document,
+        but without serializing the tree and parsing the HTML again.
+
+        The strings of the tree are joined in document order, with the line breaks that mark_text_breaks() adds
+        after the closing tags of blocks and <br> tags, and the spaces around the closing tags of table cells.
+        Comments, declarations and processing instructions are serialized on their own and stripped by HtmlStripper.
+
+        Args:
+            doc (Tag): The parsed HTML document, or an element of it.
+
+        Returns:
+            str: The text of the document.
+        """
+        texts = []
+        # The nodes left to visit in reverse document order, and the texts that follow the closing tags
+        stack = [doc]
+        while stack:
+            node = stack.pop()
+            if type(node) is str:
+                texts.append(node)
+            elif isinstance(node, Tag):
+                # Only <br> tags without attributes are serialized as <br/>, which mark_text_breaks() matches
+                if node.name == "br" and not node.attrs:
+                    texts.append("\n\n")
+                closing_tag_text = CLOSING_TAG_TEXTS.get(node.name)
+                if closing_tag_text is not None:
+                    stack.append(closing_tag_text)
+                stack.extend(reversed(node.contents))
+            elif isinstance(node, PreformattedString):
+                # Comments and declarations are serialized with their delimiters, e.g. a doctype with
+                # a line break after it, and HtmlStripper keeps what is not markup
+                texts.append(HtmlStripper().strip_tags(node.output_ready()))
+            elif node.parent is not None and node.parent.name in CDATA_ELEMENTS:
+                # Scripts and stylesheets are serialized as they are, so their tags were marked like the others
+                texts.append(ExtractItems.mark_text_breaks(node))
+            else:
+                texts.append(node)
+
+        return "".join(texts)
+
     @staticmethod
     def remove_multiple_lines(text: str) -> str:
         """
@@ -253,82 +755,29 @@ class ExtractItems:
         Returns:
             str: The normalized, clean text.
         """
-        # Replace special characters with their corresponding substitutions
-        text = re.sub(r"[\xa0]", " ", text)
-        text = re.sub(r"[\u200b]", " ", text)
-        text = re.sub(r"[\x91]", "‘", text)
-        text = re.sub(r"[\x92]", "’", text)
-        text = re.sub(r"[\x93]", "“", text)
-        text = re.sub(r"[\x94]", "”", text)
-        text = re.sub(r"[\x95]", "•", text)
-        text = re.sub(r"[\x96]", "-", text)
-        text = re.sub(r"[\x97]", "-", text)
-        text = re.sub(r"[\x98]", "˜", text)
-        text = re.sub(r"[\x99]", "™", text)
-        text = re.sub(r"[\u2010\u2011\u2012\u2013\u2014\u2015]", "-", text)
-        text = re.sub(r"[\u2018]", "‘", text)
-        text = re.sub(r"[\u2019]", "’", text)
-        text = re.sub(r"[\u2009]", " ", text)
-        text = re.sub(r"[\u00ae]", "®", text)
-        text = re.sub(r"[\u201c]", "“", text)
-        text = re.sub(r"[\u201d]", "”", text)
+        # Replace special characters with their corresponding substitutions. They are all non-ASCII.
+        if not text.isascii():
+            text = SPECIAL_CHARACTER_PATTERN.sub(
+                lambda match: SPECIAL_CHARACTER_TABLE[ord(match[0])], text
+            )
 
         def remove_whitespace(match):
-            ws = r"[^\S\r\n]"
-            return f'{match[1]}{re.sub(ws, r"", match[2])}{match[3]}{match[4]}'
-
-        def remove_whitespace_signature(match):
-            ws = r"[^\S\r\n]"
-            return f'{match[1]}{re.sub(ws, r"", match[2])}{match[4]}{match[5]}'
+            return f"{match[1]}{HORIZONTAL_WHITESPACE_PATTERN.sub('', match[2])}"
 
         # Fix broken section headers (PART, ITEM, SIGNATURE)
-        text = re.sub(
-            r"(\n[^\S\r\n]*)(P[^\S\r\n]*A[^\S\r\n]*R[^\S\r\n]*T)([^\S\r\n]+)((\d{1,2}|[IV]{1,2})[AB]?)",
-            remove_whitespace,
-            text,
-            flags=re.IGNORECASE,
-        )
-        text = re.sub(
-            r"(\n[^\S\r\n]*)(I[^\S\r\n]*T[^\S\r\n]*E[^\S\r\n]*M)([^\S\r\n]+)(\d{1,2}[AB]?)",
-            remove_whitespace,
-            text,
-            flags=re.IGNORECASE,
-        )
-        text = re.sub(
-            r"(\n[^\S\r\n]*)(S[^\S\r\n]*I[^\S\r\n]*G[^\S\r\n]*N[^\S\r\n]*A[^\S\r\n]*T[^\S\r\n]*U[^\S\r\n]*R[^\S\r\n]*E[^\S\r\n]*(S|\([^\S\r\n]*s[^\S\r\n]*\))?)([^\S\r\n]+)([^\S\r\n]?)",
-            remove_whitespace_signature,
-            text,
-            flags=re.IGNORECASE,
-        )
+        text = BROKEN_HEADER_PATTERN.sub(remove_whitespace, text)
 
-        text = re.sub(
-            r"(ITEM|PART)(\s+\d{1,2}[AB]?)([\-•])",
-            r"\1\2 \3 ",
-            text,
-            flags=re.IGNORECASE,
-        )
+        text = HEADER_DASH_PATTERN.sub(r"\1\2 \3 ", text)
 
         # Remove unnecessary headers
-        regex_flags = re.IGNORECASE | re.MULTILINE
-        text = re.sub(
-            r"\n[^\S\r\n]*"
-            r"(TABLE\s+OF\s+CONTENTS|INDEX\s+TO\s+FINANCIAL\s+STATEMENTS|BACK\s+TO\s+CONTENTS|QUICKLINKS)"
-            r"[^\S\r\n]*\n",
-            "\n",
-            text,
-            flags=regex_flags,
-        )
+        text = UNNECESSARY_HEADER_PATTERN.sub("\n", text)
 
         # Remove page numbers and headers
-        text = re.sub(
-            r"\n[^\S\r\n]*[-‒–—]*\d+[-‒–—]*[^\S\r\n]*\n", "\n", text, flags=regex_flags
-        )
-        text = re.sub(r"\n[^\S\r\n]*\d+[^\S\r\n]*\n", "\n", text, flags=regex_flags)
+        text = DASHED_PAGE_NUMBER_PATTERN.sub("\n", text)
+        text = PAGE_NUMBER_PATTERN.sub("\n", text)
 
-        text = re.sub(r"[\n\s]F[-‒–—]*\d+", "", text, flags=regex_flags)
-        text = re.sub(
-            r"\n[^\S\r\n]*Page\s[\d*]+[^\S\r\n]*\n", "", text, flags=regex_flags
-        )
+        text = FINANCIAL_PAGE_NUMBER_PATTERN.sub("", text)
+        text = PAGE_HEADER_PATTERN.sub("", text)
 
         return text
 
@@ -368,6 +817,30 @@ class ExtractItems:
 
         return non_blank_digits_percentage, spaces_percentage
 
+    @staticmethod
+    def has_background_color(tbl: Tag) -> bool:
+        """
+        Checks whether a row or cell of a table has a background or bgcolor attribute with a non-default color.
+
+        Args:
+            tbl (Tag): The table element
+
+        Returns:
+            bool: Whether a background color is found
+        """
+        for cell in tbl.find_all(["tr", "td", "th"]):
+            # Check the style attribute for a background color
+            style = cell.get("style")
+            if style is not None and style_has_background(style):
+                return True
+
+            # Check the bgcolor attribute
+            bgcolor = cell.get("bgcolor")
+            if bgcolor is not None and bgcolor.lower() not in DEFAULT_BACKGROUND_COLORS:
+                return True
+
+        return False
+
     def remove_html_tables(self, doc_report: str, is_html: bool) -> str:
         """
         Remove HTML tables that contain numerical data
@@ -385,75 +858,17 @@ class ExtractItems:
             tables = doc_report.find_all("table")
             # Detect tables that have numerical data
             for tbl in tables:
-                tbl_text = ExtractItems.clean_text(ExtractItems.strip_html(str(tbl)))
-                item_index_found = False
-                for item_index in self.items_list:
-                    # Adjust the item index pattern
-                    item_index_pattern = self.adjust_item_patterns(item_index)
-                    if (
-                        len(
-                            list(
-                                re.finditer(
-                                    rf"\n[^\S\r\n]*{item_index_pattern}[.*~\-:\s]",
-                                    tbl_text,
-                                    flags=regex_flags,
-                                )
-                            )
-                        )
-                        > 0
-                    ):
-                        item_index_found = True
-                        break
-                if item_index_found:
+                # Only tables with a background color are removed. Most tables have none, so this cheap check of
+                # the cell attributes comes first, and the text of the other tables is never extracted.
+                if not ExtractItems.has_background_color(tbl):
                     continue
 
-                # Find all <tr> elements with style attribute and check for background color
-                trs = (
-                    tbl.find_all("tr", attrs={"style": True})
-                    + tbl.find_all("td", attrs={"style": True})
-                    + tbl.find_all("th", attrs={"style": True})
-                )
-
-                background_found = False
-                for tr in trs:
-                    # Parse given cssText which is assumed to be the content of a HTML style attribute
-                    style = cssutils.parseStyle(tr["style"])
-
-                    # Check for background color
-                    if (
-                        style["background"]
-                        and style["background"].lower()
-                        not in ["none", "transparent", "#ffffff", "#fff", "white"]
-                    ) or (
-                        style["background-color"]
-                        and style["background-color"].lower()
-                        not in ["none", "transparent", "#ffffff", "#fff", "white"]
-                    ):
-                        background_found = True
-                        break
-
-                # Find all <tr> elements with bgcolor attribute and check for background color
-                trs = (
-                    tbl.find_all("tr", attrs={"bgcolor": True})
-                    + tbl.find_all("td", attrs={"bgcolor": True})
-                    + tbl.find_all("th", attrs={"bgcolor": True})
-                )
+                # Keep the table if it contains an item header
+                tbl_text = ExtractItems.clean_text(ExtractItems.html_tree_to_text(tbl))
+                if ITEM_PATTERNS.table_headers(self.items_list).search(tbl_text):
+                    continue
 
-                bgcolor_found = False
-                for tr in trs:
-                    if tr["bgcolor"].lower() not in [
-                        "none",
-                        "transparent",
-                        "#ffffff",
-                        "#fff",
-                        "white",
-                    ]:
-                        bgcolor_found = True
-                        break
-
-                # Remove the table if a background or bgcolor attribute with non-default color is found
-                if bgcolor_found or background_found:
-                    tbl.decompose()
+                tbl.decompose()
 
         else:
             # If the input is plain text, remove the table tags using regex
@@ -531,56 +946,22 @@ class ExtractItems:
         Returns:
             item_index_pattern (str): The adjusted item pattern
         """
+        return item_index_pattern(item_index)
 
-        # For 10-Q reports, we have two parts of items: part1 and part2
-        if "part" in item_index:
-            if "__" not in item_index:
-                # We are searching for the general part, not a specific item (e.g. PART I)
-                item_index_number = item_index.split("_")[1]
-                item_index_pattern = rf"PART\s*(?:{roman_numeral_map[item_index_number]}|{item_index_number})"
-                return item_index_pattern
-            else:
-                # We are working with an item, but we just consider the string after the part as the item_index
-                item_index = item_index.split("__")[1]
-
-        # Create a regex pattern from the item index
-        item_index_pattern = item_index
-
-        # Modify the item index format for matching in the text
-        if item_index == "9A":
-            item_index_pattern = item_index_pattern.replace(
-                "A", r"[^\S\r\n]*A(?:\(T\))?"
-            )  # Regex pattern for item index "9A"
-        elif item_index == "SIGNATURE":
-            # Quit here so the A in SIGNATURE is not changed
-            pass
-        elif "A" in item_index:
-            item_index_pattern = item_index_pattern.replace(
-                "A", r"[^\S\r\n]*A"
-            )  # Regex pattern for other "A" item indexes
-        elif "B" in item_index:
-            item_index_pattern = item_index_pattern.replace(
-                "B", r"[^\S\r\n]*B"
-            )  # Regex pattern for "B" item indexes
-        elif "C" in item_index:
-            item_index_pattern = item_index_pattern.replace(
-                "C", r"[^\S\r\n]*C"
-            )  # Regex pattern for "C" item indexes
-
-        # If the item is SIGNATURE, we don't want to look for ITEM
-        if item_index == "SIGNATURE":
-            # Some reports have SIGNATURES or Signature(s) instead of SIGNATURE
-            item_index_pattern = rf"{item_index}(s|\(s\))?"
-        else:
-            if "." in item_index:
-                # We need to escape the '.', otherwise it will be treated as a special character - for 8Ks
-                item_index = item_index.replace(".", "\.")
-            if item_index in roman_numeral_map:
-                # Rarely, reports use roman numerals for the item indexes. For 8-K, we assume this does not occur (due to their format - e.g. 5.01)
-                item_index = f"(?:{roman_numeral_map[item_index]}|{item_index})"
-            item_index_pattern = rf"ITEM\s*{item_index}"
+    def get_header_index(self, text: str) -> HeaderIndex:
+        """
+        Returns the header index of a text. The index of the last text is kept, since all the items of
+        a report text, or of a 10-Q part, are parsed one after another.
 
-        return item_index_pattern
+        Args:
+            text (str): The report text.
+
+        Returns:
+            HeaderIndex: The header index of the text.
+        """
+        if self.header_index is None or self.header_index.text is not text:
+            self.header_index = HeaderIndex(text)
+        return self.header_index
 
     def parse_item(
         self,
@@ -589,6 +970,7 @@ class ExtractItems:
         next_item_list: List[str],
         positions: List[int],
         ignore_matches: int = 0,
+        extract_text: bool = True,
     ) -> Tuple[str, List[int]]:
         """
         Parses the specified item/section in a report text.
@@ -599,19 +981,15 @@ class ExtractItems:
             next_item_list (List[str]): List of possible next report item sections.
             positions (List[int]): List of the end positions of previous item sections.
             ignore_matches (int): Default is 0. If positive, we skip the first [value] matches. Only used for 10-Q part extraction.
+            extract_text (bool): Default is True. If False, only the end positions are updated and no text is returned,
+                                 for items that are not extracted but bound the sections of the next items.
 
         Returns:
             Tuple[str, List[int]]: The item/section as a text string and the updated end positions of item sections.
         """
 
-        # Set the regex flags
-        regex_flags = re.IGNORECASE | re.DOTALL
-
-        # Adjust the item index pattern
-        item_index_pattern = self.adjust_item_patterns(item_index)
-
         # Determine the current part in case of 10-Q reports
-        if "part" in item_index and "PART" not in item_index_pattern:
+        if "part" in item_index and "__" in item_index:
             item_index_part_number = item_index.split("__")[0]
 
         # Depending on the item_index, search for subsequent sections.
@@ -619,9 +997,12 @@ class ExtractItems:
         # For example, the Table of Contents (ToC) still counts as a match when searching text between 'Item 3' and 'Item 4'
         # But we do NOT want that specific text section; We want the detailed section which is *after* the ToC
 
-        possible_sections_list = []  # possible list of (start, end) matches
+        header_index = self.get_header_index(text)
+        possible_sections_list = []  # possible list of (start, end) sections
         impossible_match = None  # list of matches where no possible section was found - (start, None) matches
         last_item = True
+        # The headers of the current item, which are the same for every next item
+        matches = header_index.finditer(ITEM_PATTERNS.header(item_index))
         for next_item_index in next_item_list:
             # Check if the next item is the last one
             last_item = False
@@ -630,11 +1011,8 @@ class ExtractItems:
             if next_item_index == next_item_list[-1]:
                 last_item = True
 
-            # Adjust the next item index pattern
-            next_item_index_pattern = self.adjust_item_patterns(next_item_index)
-
             # Check if the next item is in a different part - in this case we exit the loop
-            if "part" in next_item_index and "PART" not in next_item_index_pattern:
+            if "part" in next_item_index and "__" in next_item_index:
                 next_item_index_part_number = next_item_index.split("__")[0]
                 if next_item_index_part_number != item_index_part_number:
                     # If the next item is in a subsequent part, we won't find it in the text -> should simply extract the rest of the current part
@@ -642,13 +1020,6 @@ class ExtractItems:
                     break
 
             # Find all the text sections between the current item and the next item
-            matches = list(
-                re.finditer(
-                    rf"\n[^\S\r\n]*{item_index_pattern}[.*~\-:\s\(]",
-                    text,
-                    flags=regex_flags,
-                )
-            )
             for i, match in enumerate(matches):
                 if i < ignore_matches:
                     # In some cases, the first matches might capture longer sections because parts/items are mentioned in the ToC.
@@ -659,27 +1030,19 @@ class ExtractItems:
                 # First we do a case-sensitive search. This is because in some reports, parts or items are mentioned in the content,
                 # which we don't want to detect as a section header.
                 # The section headers are usually in uppercase, so checking this first avoids some errors.
-                possible = list(
-                    re.finditer(
-                        rf"\n[^\S\r\n]*{item_index_pattern}[.*~\-:\s\()].+?(\n[^\S\r\n]*{str(next_item_index_pattern)}[.*~\-:\s\(])",
-                        text[offset:],
-                        flags=re.DOTALL,
-                    )
+                possible = header_index.sections(
+                    item_index, next_item_index, offset, ignore_case=False
                 )
 
                 if not possible:
                     # If there is no match, follow with a case-insensitive search
-                    possible = list(
-                        re.finditer(
-                            rf"\n[^\S\r\n]*{item_index_pattern}[.*~\-:\s\()].+?(\n[^\S\r\n]*{str(next_item_index_pattern)}[.*~\-:\s\(])",
-                            text[offset:],
-                            flags=regex_flags,
-                        )
+                    possible = header_index.sections(
+                        item_index, next_item_index, offset, ignore_case=True
                     )
 
                 # If there is a match, add it to the list of possible sections
                 if possible:
-                    possible_sections_list += [(offset, possible)]
+                    possible_sections_list += possible
                 elif (
                     next_item_index == next_item_list[-1]
                     and not possible_sections_list
@@ -688,6 +1051,15 @@ class ExtractItems:
                     # If there is no (start, end) section, there might only be a single item in the report (can happen for 8-K)
                     impossible_match = match
 
+        if not extract_text:
+            # The text of the section is not needed, and the text until EOF never changes the positions
+            item_section = ExtractItems.select_item_section(
+                possible_sections_list, positions
+            )
+            if item_section is not None:
+                positions.append(item_section.next_start - 1)
+            return "", positions
+
         # Extract the wanted section from the text
         item_section, positions = ExtractItems.get_item_section(
             possible_sections_list, text, positions
@@ -711,9 +1083,47 @@ class ExtractItems:
 
         return item_section, positions
 
+    @staticmethod
+    def select_item_section(
+        possible_sections_list: List[Section], positions: List[int]
+    ) -> Optional[Section]:
+        """
+        Selects the correct section from a list of all possible item sections, i.e. the largest section
+        that starts after the last item section.
+
+        Args:
+            possible_sections_list: List containing all the possible sections between Item X and Item Y.
+            positions: List of the end positions of previous item sections.
+
+        Returns:
+            Optional[Section]: The correct section, or None if there is none.
+        """
+
+        # Initialize variables
+        max_section_length: int = 0
+        max_section: Optional[Section] = None
+
+        # Find the largest section
+        for section in possible_sections_list:
+            section_length = section.end - section.start
+            # If there are previous item sections, check if the current section is after the last item section
+            if positions:
+                if (
+                    section_length > max_section_length
+                    and section.start >= positions[-1]
+                ):
+                    max_section = section
+                    max_section_length = section_length
+            # If there are no previous item sections, just get the first largest section
+            elif section_length > max_section_length:
+                max_section = section
+                max_section_length = section_length
+
+        return max_section
+
     @staticmethod
     def get_item_section(
-        possible_sections_list: List[Tuple[int, List[re.Match]]],
+        possible_sections_list: List[Section],
         text: str,
         positions: List[int],
     ) -> Tuple[str, List[int]]:
@@ -729,48 +1139,16 @@ class ExtractItems:
             Tuple[str, List[int]]: The correct section and the updated list of end positions.
         """
 
-        # Initialize variables
         item_section: str = ""
-        max_match_length: int = 0
-        max_match: Optional[re.Match] = None
-        max_match_offset: Optional[int] = None
-
-        # Find the match with the largest section
-        for offset, matches in possible_sections_list:
-            # Find the match with the largest section
-            for match in matches:
-                match_length = match.end() - match.start()
-                # If there are previous item sections, check if the current match is after the last item section
-                if positions:
-                    if (
-                        match_length > max_match_length
-                        and offset + match.start() >= positions[-1]
-                    ):
-                        max_match = match
-                        max_match_offset = offset
-                        max_match_length = match_length
-                # If there are no previous item sections, just get the first match
-                elif match_length > max_match_length:
-                    max_match = match
-                    max_match_offset = offset
-                    max_match_length = match_length
-
-        # Return the text section inside that match
-        if max_match:
-            # If there are previous item sections, check if the current match is after the last item section and get it
-            if positions:
-                if max_match_offset + max_match.start() >= positions[-1]:
-                    item_section = text[
-                        max_match_offset + max_match.start() : max_match_offset
-                        + max_match.regs[1][0]
-                    ]
-            else:  # If there are no previous item sections, just get the text section inside that match
-                item_section = text[
-                    max_match_offset + max_match.start() : max_match_offset
-                    + max_match.regs[1][0]
-                ]
+        max_section = ExtractItems.select_item_section(
+            possible_sections_list, positions
+        )
+
+        # Return the text of that section, up to the header of the next item
+        if max_section is not None:
+            item_section = text[max_section.start : max_section.next_start]
             # Update the list of end positions
-            positions.append(max_match_offset + max_match.end() - len(max_match[1]) - 1)
+            positions.append(max_section.next_start - 1)
 
         return item_section, positions
 
@@ -791,14 +1169,9 @@ class ExtractItems:
             str: All the remaining text until the end, starting from the specified item_index
         """
 
-        # Adjust the item index pattern
-        item_index_pattern = self.adjust_item_patterns(item_index)
-
         # Find all occurrences of the item/section using regex
-        item_list = list(
-            re.finditer(
-                rf"\n[^\S\r\n]*{item_index_pattern}[.\-:\s].+?", text, flags=regex_flags
-            )
+        item_list = self.get_header_index(text).finditer(
+            ITEM_PATTERNS.last_section(item_index)
         )
 
         item_section = ""
@@ -930,6 +1303,8 @@ class ExtractItems:
         # Need to re-set items_list to parts for this step
         self.items_list = parts
 
+        # The PART headers of the text are indexed by the first parse, and every retry below selects other
+        # sections from the same header index instead of scanning the text again
         texts, part_positions = self.parse_10q_parts(parts, text, ignore_matches=0)
 
         ### Check for potential problems in 10-Q reports - see docstring ###
@@ -980,6 +1355,31 @@ class ExtractItems:
 
         return texts
 
+    @staticmethod
+    def parse_document(doc: str) -> Tuple[Any, bool]:
+        """
+        Parses a document as HTML if it has tables, or keeps it as plain text otherwise.
+
+        Args:
+            doc (str): The text of the document.
+
+        Returns:
+            Tuple[Any, bool]: The BeautifulSoup object of an HTML document or the text of a plain text document,
+                              and whether the document is HTML.
+        """
+        # A document without td and tr tags cannot have td and tr elements, so no tree needs to be built for it
+        if not (HTML_TD_TAG_PATTERN.search(doc) and HTML_TR_TAG_PATTERN.search(doc)):
+            return doc, False
+
+        # Check if the document is HTML or plain text
+        doc_report = BeautifulSoup(doc, "lxml")
+        is_html = (True if doc_report.find("td") else False) and (
+            True if doc_report.find("tr") else False
+        )
+        if not is_html:
+            return doc, False
+        return doc_report, True
+
     def extract_items(self, filing_metadata: Dict[str, Any]) -> Any:
         """
         Extracts all items/sections for a file and writes it to a CIK_TYPE_YEAR.json file (eg. 1384400_10K_2017.json)
@@ -995,51 +1395,32 @@ class ExtractItems:
             self.raw_files_folder, filing_metadata["Type"], filing_metadata["filename"]
         )
 
-        # Read the content of the file
-        with open(absolute_filename, "r", errors="backslashreplace") as file:
-            content = file.read()
-
-        # Remove all embedded pdfs that might be seen in few old txt annual reports
-        content = re.sub(r"<PDF>.*?</PDF>", "", content, flags=regex_flags)
-
-        # Find all <DOCUMENT> tags within the content
-        documents = re.findall("<DOCUMENT>.*?</DOCUMENT>", content, flags=regex_flags)
-
-        # Initialize variables
-        doc_report = None
-        found, is_html = False, False
-
-        # Find the document
-        for doc in documents:
-            # Find the <TYPE> tag within each <DOCUMENT> tag to identify the type of document
-            doc_type = re.search(r"\n[^\S\r\n]*<TYPE>(.*?)\n", doc, flags=regex_flags)
-            doc_type = doc_type.group(1) if doc_type else None
-
-            # Check if the document is an allowed document type
-            if doc_type.startswith(("10", "8")):
+        # Index the documents of the filing on its raw bytes, which are memory-mapped if it is a plain file,
+        # so that only the text of the filing document is decoded and parsed
+        with self.raw_store.map(
+            filing_metadata["Type"], filing_metadata["filename"]
+        ) as buffer:
+            sgml_index = SgmlIndex(buffer)
+            documents = sgml_index.documents
+
+            # Find the document. The last document of an allowed type is the one that is extracted.
+            filing_document = None
+            for document in documents:
                 # For 10-K, 10-Q and 8-K filings. We only check for the number in case it is e.g. '10K' instead of '10-K'
-                # Check if the document is HTML or plain text
-                doc_report = BeautifulSoup(doc, "lxml")
-                is_html = (True if doc_report.find("td") else False) and (
-                    True if doc_report.find("tr") else False
-                )
-                if not is_html:
-                    doc_report = doc
-                found = True
-                # break
-
-        if not found:
-            if documents:
-                LOGGER.info(
-                    f'\nCould not find documents for {filing_metadata["filename"]}'
+                if document.type is not None and document.type.startswith(("10", "8")):
+                    filing_document = document
+
+            if filing_document is not None:
+                doc_report, is_html = ExtractItems.parse_document(
+                    sgml_index.text(filing_document.start, filing_document.end)
                 )
-            # If no document is found, parse the entire content as HTML or plain text
-            doc_report = BeautifulSoup(content, "lxml")
-            is_html = (True if doc_report.find("td") else False) and (
-                True if doc_report.find("tr") else False
-            )
-            if not is_html:
-                doc_report = content
+            else:
+                if documents:
+                    LOGGER.info(
+                        f'\nCould not find documents for {filing_metadata["filename"]}'
+                    )
+                # If no document is found, parse the entire content (without embedded pdfs) as HTML or plain text
+                doc_report, is_html = ExtractItems.parse_document(sgml_index.text())
 
         # Check if the document is plain text without <DOCUMENT> tags (e.g., old TXT format)
         if filing_metadata["filename"].endswith("txt") and not documents:
@@ -1078,13 +1459,51 @@ class ExtractItems:
         #         json_content[f"item_{item_index}"] = ""
 
         # Extract the text from the document and clean it
-        text = ExtractItems.strip_html(str(doc_report))
+        if is_html:
+            text = ExtractItems.html_tree_to_text(doc_report)
+        else:
+            text = ExtractItems.strip_html(doc_report)
         text = ExtractItems.clean_text(text)
 
+        # Parse the items and add the requested ones to the JSON content
+        all_items_null = self.add_item_sections(text, filing_metadata, json_content)
+
+        if all_items_null:
+            LOGGER.info(f"\nCould not extract any item for {absolute_filename}")
+            return None
+
+        return json_content
+
+    def add_item_sections(
+        self, text: str, filing_metadata: Dict[str, Any], json_content: Dict[str, Any]
+    ) -> bool:
+        """
+        Parses the items of a report text and adds the requested items to the JSON content.
+
+        When only some items are requested, the text is only extracted for the requested items, and no item
+        after the last requested one is parsed. The requested items are the same as with all items requested.
+
+        Args:
+            text (str): The cleaned report text.
+            filing_metadata (Dict[str, Any]): A dictionary containing the filing metadata.
+            json_content (Dict[str, Any]): The JSON content, to which the item sections are added.
+
+        Returns:
+            bool: True if none of the requested items was found.
+        """
+
         # For 10-Qs, need to separate the text into Part 1 and Part 2
         if filing_metadata["Type"] == "10-Q":
             part_texts = self.get_10q_parts(text, filing_metadata)
 
+        # Only the items up to the last requested one are parsed. The items before it are parsed for their
+        # end positions only, since they decide where the sections of the next items may start.
+        last_requested_index = max(
+            i
+            for i, item_index in enumerate(self.items_list)
+            if item_index in self.items_to_extract
+        )
+
         positions = []
         all_items_null = True
         for i, item_index in enumerate(self.items_list):
@@ -1108,6 +1527,11 @@ class ExtractItems:
                     )
                     json_content[item_index.split("__")[0]] = parts_text
 
+            if i > last_requested_index:
+                # The items after the last requested one cannot change the requested sections
+                continue
+
+            extract_text = item_index in self.items_to_extract
             if "part" in self.items_list[i - 1] and item_index == "SIGNATURE":
                 # We are working with a 10-Q but the above if-statement is not triggered
                 # We can just take the detected part_text for the signature - but we do not want to run parse_item again below
@@ -1115,36 +1539,36 @@ class ExtractItems:
             else:
                 ### Parse each item/section and get its content and positions - For 10-K and 8-K we will just run this! ###
                 item_section, positions = self.parse_item(
-                    text, item_index, next_item_list, positions
+                    text,
+                    item_index,
+                    next_item_list,
+                    positions,
+                    extract_text=extract_text,
                 )
 
+            if not extract_text:
+                continue
+
             # Remove multiple lines from the item section
             item_section = ExtractItems.remove_multiple_lines(item_section.strip())
 
-            if item_index in self.items_to_extract:
-                if item_section != "":
-                    all_items_null = False
+            if item_section != "":
+                all_items_null = False
 
-                # Add the item section to the JSON content
-                if item_index == "SIGNATURE":
-                    if self.include_signature:
-                        json_content[f"{item_index}"] = item_section
+            # Add the item section to the JSON content
+            if item_index == "SIGNATURE":
+                if self.include_signature:
+                    json_content[f"{item_index}"] = item_section
+            else:
+                if "part" in item_index:
+                    # special naming convention for 10-Qs
+                    json_content[
+                        item_index.split("__")[0] + "_item_" + item_index.split("__")[1]
+                    ] = item_section
                 else:
-                    if "part" in item_index:
-                        # special naming convention for 10-Qs
-                        json_content[
-                            item_index.split("__")[0]
-                            + "_item_"
-                            + item_index.split("__")[1]
-                        ] = item_section
-                    else:
-                        json_content[f"item_{item_index}"] = item_section
-
-        if all_items_null:
-            LOGGER.info(f"\nCould not extract any item for {absolute_filename}")
-            return None
+                    json_content[f"item_{item_index}"] = item_section
 
-        return json_content
+        return all_items_null
 
     def process_filing(self, filing_metadata: Dict[str, Any]) -> int:
         """
@@ -1188,18 +1612,112 @@ class ExtractItems:
         return 1
 
 
-def main(config_param = None) -> None:
+# The ExtractItems object of a worker process, which init_worker() sets once when the worker starts
+WORKER_EXTRACTION: Optional[ExtractItems] = None
+
+
+def init_worker(extraction: ExtractItems) -> None:
     """
-    Gets the list of supported (10K, 8K, 10Q) files and extracts all textual items/sections by calling the extract_items() function.
+    Initializes a worker process of the extraction pool with its own copy of the ExtractItems object,
+    so that the object is sent to every worker once instead of with every filing.
+
+    Args:
+        extraction (ExtractItems): The ExtractItems object.
     """
-    if config_param is None:
-        # Load the configuration file
-        with open("config.json") as fin:
-            config = json.load(fin)["extract_items"]
-    else:
-        config = config_param["extract_items"]
+    global WORKER_EXTRACTION
+    WORKER_EXTRACTION = extraction
+
+
+def process_record(filing_metadata: Dict[str, Any]) -> int:
+    """
+    Processes a filing in a worker process of the extraction pool.
+
+    Args:
+        filing_metadata (Dict[str, Any]): The filing metadata, as a dictionary.
+
+    Returns:
+        int: 0 if the processing is skipped, 1 if the processing is performed.
+    """
+    return WORKER_EXTRACTION.process_filing(filing_metadata)
+
+
+def process_batch(batch: List[Dict[str, Any]]) -> Tuple[int, float]:
+    """
+    Processes a batch of filings in a worker process of the extraction pool.
+
+    Args:
+        batch (List[Dict[str, Any]]): The metadata of the filings, as dictionaries.
+
+    Returns:
+        Tuple[int, float]: The number of processed filings, and the seconds it took to process the batch.
+    """
+    start = time.perf_counter()
+    processed = sum(
+        WORKER_EXTRACTION.process_filing(filing_metadata) for filing_metadata in batch
+    )
+    return processed, time.perf_counter() - start
+
+
+def schedule_filings(
+    records: List[Dict[str, Any]], sizes: List[int], num_workers: int
+) -> Tuple[List[List[Dict[str, Any]]], List[int]]:
+    """
+    Orders the filings largest first and batches the small ones, so that the largest filings are started
+    early instead of leaving a long single-core tail, and many tiny filings share a single task.
+
+    Args:
+        records (List[Dict[str, Any]]): The metadata of the filings.
+        sizes (List[int]): The size of every filing in bytes.
+        num_workers (int): The number of worker processes.
+
+    Returns:
+        Tuple[List[List[Dict[str, Any]]], List[int]]: The batches, largest first, and their sizes in bytes.
+    """
+    # Leave at least a few batches per worker, so that the last batches even out the load of the workers
+    max_batch_bytes = min(MAX_BATCH_BYTES, sum(sizes) // (num_workers * 4))
+
+    batches, batch_sizes = [], []
+    for i in sorted(range(len(records)), key=lambda i: sizes[i], reverse=True):
+        if (
+            len(batches) == 0
+            or batch_sizes[-1] + sizes[i] > max_batch_bytes
+            or len(batches[-1]) >= MAX_BATCH_FILINGS
+        ):
+            batches.append([])
+            batch_sizes.append(0)
+        batches[-1].append(records[i])
+        batch_sizes[-1] += sizes[i]
+    return batches, batch_sizes
+
+
+def predict_makespan(batch_sizes: List[int], num_workers: int) -> int:
+    """
+    Predicts the work of the busiest worker when the batches are handed out in order to the first free worker.
+
+    Args:
+        batch_sizes (List[int]): The sizes of the batches in bytes, in the order in which they are handed out.
+        num_workers (int): The number of worker processes.
+
+    Returns:
+        int: The number of bytes processed by the busiest worker.
+    """
+    workers = [0] * num_workers
+    for batch_size in batch_sizes:
+        heapq.heapreplace(workers, workers[0] + batch_size)
+    return max(workers)
+
 
+def read_filings_metadata(config: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Reads the metadata of the filings to extract, i.e. of the downloaded filings of the configured filing types.
+
+    Args:
+        config (Dict[str, Any]): The extract_items configuration.
 
+    Returns:
+        Optional[pd.DataFrame]: The filings metadata with None for the missing values, or None if the
+            filings metadata file does not exist.
+    """
     filings_metadata_filepath = os.path.join(
         DATASET_DIR, config["filings_metadata_file"]
     )
@@ -1210,27 +1728,32 @@ def main(config_param = None) -> None:
         filings_metadata_df = filings_metadata_df.replace({np.nan: None})
     else:
         LOGGER.info(f'No such file "{filings_metadata_filepath}"')
-        return
+        return None
 
     # If the user provided filing types, filter out the filings that are not in the list
     if config["filing_types"]:
         filings_metadata_df = filings_metadata_df[
             filings_metadata_df["Type"].isin(config["filing_types"])
         ]
-    if len(filings_metadata_df) == 0:
-        LOGGER.info(f"No filings to process for filing types {config['filing_types']}.")
-        return
+    return filings_metadata_df
 
-    # For debugging one report
-    # debug_file_name = "1002135_10Q_1998_0000914760-99-000052.txt"
-    # filings_metadata_df = filings_metadata_df[filings_metadata_df["filename"] == debug_file_name]
 
+def create_extraction(config: Dict[str, Any]) -> Optional[ExtractItems]:
+    """
+    Creates the ExtractItems object of the configuration, and the extracted filings folder if it doesn't exist.
+
+    Args:
+        config (Dict[str, Any]): The extract_items configuration.
+
+    Returns:
+        Optional[ExtractItems]: The ExtractItems object, or None if the raw filings folder does not exist.
+    """
     raw_filings_folder = os.path.join(DATASET_DIR, config["raw_filings_folder"])
 
     # Check if the raw filings folder exists
     if not os.path.isdir(raw_filings_folder):
         LOGGER.info(f'No such directory: "{raw_filings_folder}')
-        return
+        return None
 
     extracted_filings_folder = os.path.join(
         DATASET_DIR, config["extracted_filings_folder"]
@@ -1240,7 +1763,7 @@ def main(config_param = None) -> None:
     if not os.path.isdir(extracted_filings_folder):
         os.mkdir(extracted_filings_folder)
 
-    extraction = ExtractItems(
+    return ExtractItems(
         remove_tables=config["remove_tables"],
         items_to_extract=config["items_to_extract"],
         include_signature=config["include_signature"],
@@ -1249,26 +1772,85 @@ def main(config_param = None) -> None:
         skip_extracted_filings=config["skip_extracted_filings"],
     )
 
+
+def main(config_param = None) -> None:
+    """
+    Gets the list of supported (10K, 8K, 10Q) files and extracts all textual items/sections by calling the extract_items() function.
+    """
+    if config_param is None:
+        # Load the configuration file
+        with open("config.json") as fin:
+            config = json.load(fin)["extract_items"]
+    else:
+        config = config_param["extract_items"]
+
+    filings_metadata_df = read_filings_metadata(config)
+    if filings_metadata_df is None:
+        return
+    if len(filings_metadata_df) == 0:
+        LOGGER.info(f"No filings to process for filing types {config['filing_types']}.")
+        return
+
+    # For debugging one report
+    # debug_file_name = "1002135_10Q_1998_0000914760-99-000052.txt"
+    # filings_metadata_df = filings_metadata_df[filings_metadata_df["filename"] == debug_file_name]
+
+    extraction = create_extraction(config)
+    if extraction is None:
+        return
+
+    num_workers = config.get("num_workers") or os.cpu_count() or 1
+
     LOGGER.info(
-        f"Starting the structured JSON extraction from {len(filings_metadata_df)} unstructured EDGAR filings."
+        f"Starting the structured JSON extraction from {len(filings_metadata_df)} unstructured EDGAR filings "
+        f"with {num_workers} workers."
     )
 
-    list_of_series = list(zip(*filings_metadata_df.iterrows()))[1]
+    # Send the workers plain dicts of strings, which are much cheaper to pickle than pandas series
+    records = filings_metadata_df.to_dict("records")
 
-    # Process filings in parallel using a process pool
-    with ProcessPool(processes=1) as pool:
-        processed = list(
-            tqdm(
-                pool.imap(extraction.process_filing, list_of_series),
-                total=len(list_of_series),
-                ncols=100,
+    # Schedule the filings by their size on disk, which the extraction time grows with
+    sizes = []
+    for filing_metadata in records:
+        try:
+            sizes.append(
+                extraction.raw_store.size(
+                    filing_metadata["Type"], filing_metadata["filename"]
+                )
             )
-        )
+        except OSError:
+            # Missing filings are reported by the workers
+            sizes.append(0)
+    batches, batch_sizes = schedule_filings(records, sizes, num_workers)
+    predicted_bytes = predict_makespan(batch_sizes, num_workers)
+
+    # Process filings in parallel using a process pool, with one ExtractItems object per worker
+    processed = 0
+    busy_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPool(
+        processes=num_workers, initializer=init_worker, initargs=(extraction,)
+    ) as pool, tqdm(total=len(records), ncols=100) as progress_bar:
+        for batch, (batch_processed, batch_seconds) in zip(
+            batches, pool.imap(process_batch, batches)
+        ):
+            processed += batch_processed
+            busy_seconds += batch_seconds
+            progress_bar.update(len(batch))
+    makespan = time.perf_counter() - start
 
     LOGGER.info("\nItem extraction is completed successfully.")
-    LOGGER.info(f"{sum(processed)} files were processed.")
-    LOGGER.info(f"Extracted filings are saved to: {extracted_filings_folder}")
-
+    LOGGER.info(f"{processed} files were processed.")
+
+    # The predicted makespan is the work of the busiest worker at the throughput that the workers achieved
+    if busy_seconds > 0:
+        bytes_per_second = sum(sizes) / busy_seconds
+        LOGGER.info(
+            f"Makespan: predicted {predicted_bytes / bytes_per_second:.1f}s "
+            f"(ideal {sum(sizes) / num_workers / bytes_per_second:.1f}s), actual {makespan:.1f}s "
+            f"for {len(batches)} batches on {num_workers} workers."
+        )
+    LOGGER.info(f"Extracted filings are saved to: {extraction.extracted_files_folder}")
 
 if __name__ == "__main__":
     main()
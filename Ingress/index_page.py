@@ -0,0 +1,200 @@
+from typing import Iterable, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# A row of the "Document Format Files" table: (Description, link of the Document, Type)
+DocumentRow = Tuple[str, Optional[str], str]
+
+# Elements whose strings BeautifulSoup does not include in .text, or that the fast parser does not handle
+UNSUPPORTED_TAGS = {"script", "style", "template"}
+
+SIC_LINKS_XPATH = etree.XPath("//a[contains(@href, 'SIC')]")
+
+
+def _text(element: etree._Element) -> str:
+    """
+    Returns the text of an element like BeautifulSoup's .text, or raises a ValueError if the element
+    contains nodes for which the two could differ.
+    """
+    for node in element.iter():
+        if not isinstance(node.tag, str) or node.tag in UNSUPPORTED_TAGS:
+            raise ValueError(f"Unsupported node in <{element.tag}>")
+    return "".join(element.itertext())
+
+
+def _contents(element: etree._Element) -> list:
+    """
+    Returns the children of an element, including its text nodes, like BeautifulSoup's .contents.
+    """
+    contents = [element.text] if element.text else []
+    for child in element:
+        contents.append(child)
+        if child.tail:
+            contents.append(child.tail)
+    return contents
+
+
+def _document_row(tr: etree._Element) -> DocumentRow:
+    """
+    Reads a row of the "Document Format Files" table, which must look like the rows that crawl() expects.
+    """
+    contents = _contents(tr)
+    if len(contents) < 8 or not all(
+        isinstance(contents[i], etree._Element) for i in (3, 5, 7)
+    ):
+        raise ValueError("Unexpected row in the Document Format Files table")
+
+    link = _contents(contents[5])
+    if (
+        len(link) == 0
+        or not isinstance(link[0], etree._Element)
+        or link[0].get("href") is None
+    ):
+        raise ValueError("Unexpected document link in the Document Format Files table")
+
+    return _text(contents[3]), link[0].get("href"), _text(contents[7])
+
+
+def parse_index_page(content: bytes) -> dict:
+    """
+    Extracts the details that crawl() needs from an EDGAR filing index page (-index.html).
+
+    Only the needed nodes are visited with lxml, instead of building a BeautifulSoup tree of the whole page.
+    The results are identical to parse_index_page_soup(). Pages with any structure for which that cannot be
+    guaranteed raise a ValueError, so that the caller falls back to parse_index_page_soup().
+
+    Args:
+        content (bytes): The content of the index page.
+
+    Returns:
+        dict: The "Filing Date", "Period of Report", "identInfo" (the text of the company identification paragraph)
+            and "SIC", each None if missing, and "Document Format Files", a list with the rows of every
+            Document Format Files table.
+
+    Raises:
+        ValueError: If the page cannot be parsed by the fast path.
+    """
+    # BeautifulSoup detects the encoding of the page, so only ASCII pages are guaranteed to decode the same way
+    if not content.isascii():
+        raise ValueError("The index page is not ASCII")
+
+    root = etree.fromstring(content, etree.HTMLParser())
+    if root is None:
+        raise ValueError("Empty index page")
+
+    index_page = {
+        "Filing Date": None,
+        "Period of Report": None,
+        "identInfo": None,
+        "SIC": None,
+        "Document Format Files": [],
+    }
+
+    for div in root.iter("div"):
+        classes = (div.get("class") or "").split()
+
+        # The value of an info head is in the element after the whitespace that follows it
+        if len(classes) > 0 and classes[0] == "infoHead":
+            label = _text(div)
+            if label in ["Filing Date", "Period of Report"]:
+                value = div.getnext()
+                if not div.tail or value is None or not isinstance(value.tag, str):
+                    raise ValueError(f'Unexpected "{label}" info')
+                index_page[label] = _text(value)
+
+    # The company identification paragraph of the first companyInfo div
+    company_info = next(
+        (
+            div
+            for div in root.iter("div")
+            if "companyInfo" in (div.get("class") or "").split()
+        ),
+        None,
+    )
+    if company_info is not None:
+        for p in company_info.iter("p"):
+            if "identInfo" in (p.get("class") or "").split():
+                index_page["identInfo"] = _text(p)
+                break
+
+    # The first SIC link inside an identInfo element
+    for link in SIC_LINKS_XPATH(root):
+        if any(
+            "identInfo" in (ancestor.get("class") or "").split()
+            for ancestor in link.iterancestors()
+        ):
+            index_page["SIC"] = _text(link)
+            break
+
+    for table in root.iter("table"):
+        if table.get("summary") == "Document Format Files":
+            index_page["Document Format Files"].append(
+                [_document_row(tr) for tr in list(table.iter("tr"))[1:]]
+            )
+
+    return index_page
+
+
+def _soup_document_rows(table) -> Iterable[DocumentRow]:
+    """
+    Lazily reads the rows of a "Document Format Files" table of a BeautifulSoup tree.
+    """
+    for tr in table.find_all("tr")[1:]:
+        try:
+            href = tr.contents[5].contents[0].attrs["href"]
+        except (IndexError, AttributeError, KeyError):
+            href = None
+        yield tr.contents[3].text, href, tr.contents[7].text
+
+
+def parse_index_page_soup(content: bytes) -> dict:
+    """
+    Extracts the details that crawl() needs from an EDGAR filing index page (-index.html) with BeautifulSoup.
+
+    This is the fallback of parse_index_page() and handles any page that BeautifulSoup can parse.
+
+    Args:
+        content (bytes): The content of the index page.
+
+    Returns:
+        dict: The same details as parse_index_page(). The rows of the tables are read lazily.
+    """
+    soup = BeautifulSoup(content, "lxml")
+
+    index_page = {
+        "Filing Date": None,
+        "Period of Report": None,
+        "identInfo": None,
+        "SIC": None,
+        "Document Format Files": [],
+    }
+
+    # Extraction of 'Filing Date' and 'Period of Report'
+    for form in soup.find_all("div", {"class": ["infoHead", "info"]}):
+        if form.attrs["class"][0] == "infoHead" and form.text == "Filing Date":
+            index_page["Filing Date"] = form.nextSibling.nextSibling.text
+
+        if form.attrs["class"][0] == "infoHead" and form.text == "Period of Report":
+            index_page["Period of Report"] = form.nextSibling.nextSibling.text
+
+    # Extracting the company info
+    try:
+        index_page["identInfo"] = (
+            soup.find("div", {"class": ["companyInfo"]})
+            .find("p", {"class": ["identInfo"]})
+            .text
+        )
+    except Exception:
+        pass
+
+    # Crawl for the Sector Industry Code (SIC)
+    sic = soup.select_one('.identInfo a[href*="SIC"]')
+    if sic is not None:
+        index_page["SIC"] = sic.text
+
+    for table in soup.find_all("table"):
+        if table.attrs.get("summary") == "Document Format Files":
+            index_page["Document Format Files"].append(_soup_document_rows(table))
+
+    return index_page
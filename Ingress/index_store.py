@@ -0,0 +1,127 @@
+import os
+import threading
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from metadata_store import FILINGS_METADATA_COLUMNS
+
+# The columns of the TSV index files created by download_filings.download_indices()
+INDEX_COLUMNS = FILINGS_METADATA_COLUMNS[:6]
+
+# The links in the index files are relative to the SEC Archives
+ARCHIVES_URL = "https://www.sec.gov/Archives/"
+
+# Rows per row group. Row groups are the unit that is skipped when its Type/CIK statistics do not match a filter.
+ROW_GROUP_SIZE = 4096
+
+INDEX_SCHEMA = pa.schema(
+    [
+        # Parquet dictionary encodes the pages of the repetitive CIK and Type columns on disk. They are read back as
+        # plain strings, since row groups are only skipped based on the statistics of non-dictionary columns.
+        ("CIK", pa.string()),
+        ("Company", pa.string()),
+        ("Type", pa.string()),
+        ("Date", pa.string()),
+        ("complete_text_file_link", pa.string()),
+        ("html_index", pa.string()),
+        # The position of the row in the TSV index file, to return the filings in their original order
+        ("position", pa.int32()),
+    ]
+)
+
+
+def parquet_filepath(tsv_filepath: str) -> str:
+    """
+    Returns:
+        str: The path of the Parquet copy of a TSV index file, e.g. 2020_QTR1.parquet for 2020_QTR1.tsv.
+    """
+    return f"{os.path.splitext(tsv_filepath)[0]}.parquet"
+
+
+def convert_index(tsv_filepath: str) -> str:
+    """
+    Converts a quarterly TSV index file into a Parquet file, unless an up-to-date Parquet file already exists.
+
+    The rows are sorted by Type and CIK, so that every row group only spans a few form types and CIKs and its
+    min/max statistics let readers skip it. Type and CIK are dictionary encoded in the Parquet pages.
+
+    Args:
+        tsv_filepath (str): The path of the TSV index file.
+
+    Returns:
+        str: The path of the Parquet file.
+    """
+    filepath = parquet_filepath(tsv_filepath)
+    if os.path.exists(filepath) and os.path.getmtime(filepath) >= os.path.getmtime(
+        tsv_filepath
+    ):
+        return filepath
+
+    df = pd.read_csv(tsv_filepath, sep="|", header=None, dtype=str, names=INDEX_COLUMNS)
+    df["position"] = range(len(df))
+    df = df.sort_values(["Type", "CIK"], kind="stable")
+
+    table = pa.Table.from_pandas(df, schema=INDEX_SCHEMA, preserve_index=False)
+    # Write to a temporary file of this process and thread first, so that readers never see a partial file
+    temp_filepath = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pq.write_table(table, temp_filepath, row_group_size=ROW_GROUP_SIZE)
+    os.replace(temp_filepath, filepath)
+
+    return filepath
+
+
+def read_indices(
+    tsv_filepaths: List[str], filing_types: List[str], ciks: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Reads the filings of the given types, and optionally CIKs, from the quarterly index files.
+
+    Every TSV index file is converted into a Parquet file the first time it is read. The filters are pushed down
+    to the Parquet files, so that only the row groups that may contain matching filings are read.
+    The links are only turned into URLs for the matching filings.
+
+    Args:
+        tsv_filepaths (List[str]): The paths of the TSV index files.
+        filing_types (List[str]): The filing types to keep, e.g., ['10-K', '8-K'].
+        ciks (Optional[List[str]]): The CIKs to keep. If None or empty, the filings of all CIKs are kept.
+
+    Returns:
+        pd.DataFrame: The matching filings with the columns of the filings metadata CSV file,
+            in the order of the index files.
+    """
+    parquet_filepaths = [convert_index(filepath) for filepath in tsv_filepaths]
+
+    tables = []
+    for filepath in parquet_filepaths:
+        condition = pc.field("Type").isin(filing_types)
+        if ciks:
+            condition = condition & pc.field("CIK").isin(ciks)
+        tables.append(
+            ds.dataset(filepath, format="parquet", schema=INDEX_SCHEMA)
+            .to_table(filter=condition)
+            .sort_by("position")
+        )
+    table = pa.concat_tables(tables)
+
+    df = pd.DataFrame(
+        {
+            column: table.column(column)
+            .cast(pa.string())
+            .to_numpy(zero_copy_only=False)
+            for column in INDEX_COLUMNS
+        },
+        columns=FILINGS_METADATA_COLUMNS,
+    )
+
+    # Prepend the URL for SEC Archives to the links
+    df["complete_text_file_link"] = ARCHIVES_URL + df["complete_text_file_link"].astype(
+        str
+    )
+    df["html_index"] = ARCHIVES_URL + df["html_index"].astype(str)
+
+    return df
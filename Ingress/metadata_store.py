@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import threading
+from typing import Iterable
+
+import pandas as pd
+
+# The columns of the filings metadata CSV file, in the order that extract_items.main() expects them
+FILINGS_METADATA_COLUMNS = [
+    "CIK",
+    "Company",
+    "Type",
+    "Date",
+    "complete_text_file_link",
+    "html_index",
+    "Filing Date",
+    "Period of Report",
+    "SIC",
+    "htm_file_link",
+    "State of Inc",
+    "State location",
+    "Fiscal Year End",
+    "filename",
+]
+
+
+class FilingsMetadataStore:
+    """
+    Stores the metadata of the downloaded filings in an SQLite table keyed by html_index.
+
+    Every crawled filing is committed as a single row, so appending a filing costs the same no matter how many
+    filings are already stored, and a crash or Ctrl + C never loses the filings committed before it.
+    The table is periodically compacted into the filings metadata CSV file, which keeps the schema that
+    extract_items.main() reads.
+    """
+
+    def __init__(self, csv_filepath: str, compaction_interval: int = 1000) -> None:
+        """
+        Opens the store next to the filings metadata CSV file, e.g. FILINGS_METADATA.db for FILINGS_METADATA.csv.
+
+        If the store does not exist yet but the CSV file does, the CSV file is imported into the new store.
+
+        Args:
+            csv_filepath (str): The path of the filings metadata CSV file.
+            compaction_interval (int): Export the CSV file after this many appended filings. Default is 1000.
+        """
+        self.csv_filepath = csv_filepath
+        self.db_filepath = f"{os.path.splitext(csv_filepath)[0]}.db"
+        self.compaction_interval = compaction_interval
+        self.appends_since_compaction = 0
+        self.lock = threading.Lock()
+
+        is_new = not os.path.exists(self.db_filepath)
+        self.connection = sqlite3.connect(self.db_filepath, check_same_thread=False)
+        # The write-ahead log makes every commit a cheap append to the log file
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        columns = ", ".join(
+            (
+                f'"{column}" TEXT PRIMARY KEY'
+                if column == "html_index"
+                else f'"{column}" TEXT'
+            )
+            for column in FILINGS_METADATA_COLUMNS
+        )
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS filings_metadata ({columns})"
+        )
+        self.connection.commit()
+
+        if is_new and os.path.exists(csv_filepath):
+            self.extend(pd.read_csv(csv_filepath, dtype=str))
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: The number of stored filings.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM filings_metadata"
+            ).fetchone()[0]
+
+    @staticmethod
+    def _to_row(series: pd.Series) -> tuple:
+        """
+        Converts a filing series to a table row, with None for the missing values.
+        """
+        return tuple(
+            None if pd.isna(series.get(column)) else str(series.get(column))
+            for column in FILINGS_METADATA_COLUMNS
+        )
+
+    def _insert(self, rows: Iterable[tuple]) -> None:
+        placeholders = ", ".join("?" for _ in FILINGS_METADATA_COLUMNS)
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO filings_metadata VALUES ({placeholders})", rows
+        )
+        self.connection.commit()
+
+    def append(self, series: pd.Series) -> None:
+        """
+        Stores the metadata of a single filing and exports the CSV file every compaction_interval filings.
+
+        Args:
+            series (pd.Series): The metadata of the filing, as returned by download_filings.crawl().
+        """
+        with self.lock:
+            self._insert([self._to_row(series)])
+            self.appends_since_compaction += 1
+            compact = self.appends_since_compaction >= self.compaction_interval
+
+        if compact:
+            self.export_csv()
+
+    def extend(self, df: pd.DataFrame) -> None:
+        """
+        Stores the metadata of several filings in a single transaction.
+
+        Args:
+            df (pd.DataFrame): The filings metadata.
+        """
+        with self.lock:
+            self._insert(self._to_row(series) for _, series in df.iterrows())
+
+    def remove(self, html_indices: Iterable[str]) -> None:
+        """
+        Removes the given filings from the store.
+
+        Args:
+            html_indices (Iterable[str]): The html_index values of the filings to remove.
+        """
+        with self.lock:
+            self.connection.executemany(
+                "DELETE FROM filings_metadata WHERE html_index = ?",
+                ((html_index,) for html_index in html_indices),
+            )
+            self.connection.commit()
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: All stored filings, with the columns of the filings metadata CSV file.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM filings_metadata ORDER BY rowid"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=FILINGS_METADATA_COLUMNS, dtype=str)
+
+    def export_csv(self) -> None:
+        """
+        Compacts the store into the filings metadata CSV file.
+
+        The CSV file is written to a temporary file first and then atomically moved in place,
+        so readers never see a partially written file.
+        """
+        df = self.to_dataframe()
+        temp_filepath = f"{self.csv_filepath}.tmp"
+        df.to_csv(temp_filepath, index=False, header=True)
+        os.replace(temp_filepath, self.csv_filepath)
+
+        with self.lock:
+            self.appends_since_compaction = 0
+            # Fold the write-ahead log back into the database file
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        """
+        Closes the connection to the store.
+        """
+        with self.lock:
+            self.connection.close()
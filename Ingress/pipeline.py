@@ -0,0 +1,158 @@
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator
+
+import pandas as pd
+from pathos.pools import ProcessPool
+from tqdm import tqdm
+
+import download_filings
+import extract_items
+from __init__ import DATASET_DIR
+from logger import Logger
+
+# Instantiate a logger object
+LOGGER = Logger(name="Pipeline").get_logger()
+
+# Marks the end of the filings on the extraction queue
+END_OF_FILINGS = None
+
+
+def main(config_param=None) -> None:
+    """
+    Downloads and extracts filings in a single pipelined run.
+
+    Every filing that download_filings.main() completes is put on a bounded queue, from which the extraction
+    workers take it while the other downloads are still in flight, instead of waiting for the whole download
+    to finish. The end-to-end time is thus close to the longer of the two phases rather than their sum.
+    Once the download finishes, the downloaded filings that were not extracted yet, e.g. from earlier runs,
+    are extracted as well, exactly like extract_items.main() would.
+
+    Args:
+        config_param (dict): The configuration, with a "download_filings" and an "extract_items" section.
+            Default is None, which loads config.json. The optional "queue_size" of the extract_items section
+            bounds the number of downloaded filings waiting for extraction (default 100).
+
+    Raises:
+        KeyboardInterrupt: If the download is interrupted by the user (Ctrl + C). Only the filings that were
+            already handed over are extracted.
+    """
+    if config_param is None:
+        # Load the configuration file
+        with open("config.json") as fin:
+            config = json.load(fin)
+    else:
+        config = config_param
+
+    extract_config = config["extract_items"]
+
+    # The extraction starts before the first filing is downloaded, so the raw filings folder must exist
+    os.makedirs(
+        os.path.join(DATASET_DIR, extract_config["raw_filings_folder"]), exist_ok=True
+    )
+    extraction = extract_items.create_extraction(extract_config)
+    if extraction is None:
+        return
+
+    # The pool takes the filings off the queue as soon as they arrive, so the number of filings waiting
+    # for extraction is bounded by slots that are only freed when a filing has been extracted
+    filing_queue = queue.Queue()
+    slots = threading.Semaphore(extract_config.get("queue_size", 100))
+    streamed_html_indices = set()
+
+    def on_filing(series: pd.Series) -> None:
+        if (
+            extract_config["filing_types"]
+            and series["Type"] not in extract_config["filing_types"]
+        ):
+            return
+        streamed_html_indices.add(series["html_index"])
+        # Blocks while the queue is full, so that the downloads never run too far ahead of the extraction
+        slots.acquire()
+        filing_queue.put(series.where(series.notna(), None).to_dict())
+
+    # The filings are dispatched one by one as they arrive, to workers with their own ExtractItems object
+    with ProcessPool(
+        processes=extract_config.get("num_workers") or os.cpu_count() or 1,
+        initializer=extract_items.init_worker,
+        initargs=(extraction,),
+    ) as pool:
+        processed = pool.imap(
+            extract_items.process_record, queued_filings(filing_queue)
+        )
+        # Count the extracted filings while the download runs, so that their results do not pile up
+        counter = ExtractionCounter(processed, slots)
+
+        try:
+            download_filings.main(config, on_filing=on_filing)
+        except KeyboardInterrupt:
+            # Stop without extracting the filings that were not handed over, the next run resumes the download
+            filing_queue.put(END_OF_FILINGS)
+            raise
+
+        # Extract the downloaded filings that were not handed over during the download
+        filings_metadata_df = extract_items.read_filings_metadata(extract_config)
+        if filings_metadata_df is not None:
+            filings_metadata_df = filings_metadata_df[
+                ~filings_metadata_df["html_index"].isin(streamed_html_indices)
+            ]
+            for record in filings_metadata_df.to_dict("records"):
+                slots.acquire()
+                filing_queue.put(record)
+
+        filing_queue.put(END_OF_FILINGS)
+        counter.join()
+
+    LOGGER.info("\nItem extraction is completed successfully.")
+    LOGGER.info(f"{counter.processed} files were processed.")
+    LOGGER.info(f"Extracted filings are saved to: {extraction.extracted_files_folder}")
+
+
+def queued_filings(filing_queue: queue.Queue) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the filings put on the queue, until END_OF_FILINGS.
+    """
+    while True:
+        filing = filing_queue.get()
+        if filing is END_OF_FILINGS:
+            return
+        yield filing
+
+
+class ExtractionCounter(threading.Thread):
+    """
+    Consumes the results of the extraction workers in the background, counts the processed filings
+    and frees a slot of the extraction queue for every finished filing.
+    """
+
+    def __init__(self, results: Iterable[int], slots: threading.Semaphore) -> None:
+        super().__init__(daemon=True)
+        self.results = results
+        self.slots = slots
+        self.processed = 0
+        self.start()
+
+    def run(self) -> None:
+        results = iter(self.results)
+        with tqdm(desc="Extracted", ncols=100) as progress_bar:
+            while True:
+                try:
+                    result = next(results)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    # A failed filing must not stop the extraction of the next ones, or the queue would fill up
+                    LOGGER.info(f"\nCould not extract a filing: {e}")
+                else:
+                    self.processed += result
+                    progress_bar.update()
+                self.slots.release()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        exit(0)
@@ -11,8 +11,8 @@ from langchain_text_splitters import CharacterTextSplitter
 from embedding_helper import EmbeddingModel
 from dateutil.parser import parse
 import constants
-import extract_items
-import download_filings
+import pipeline
+from ticker_index import TickerIndex
 
 # Initialize Qdrant client
 qdrant_client = QdrantClient(
@@ -65,8 +65,8 @@ def download_10_k(tickers):
             }
         }
 
-        download_filings.main(config)
-        extract_items.main(config)
+        # Extract the filings while they are being downloaded
+        pipeline.main(config)
     except Exception as ex:
         print(str(ex))
 
@@ -97,8 +97,8 @@ def download_10_q(tickers):
             }
         }
 
-        download_filings.main(config)
-        extract_items.main(config)
+        # Extract the filings while they are being downloaded
+        pipeline.main(config)
     except Exception as ex:
         print(str(ex))
 
@@ -148,7 +148,7 @@ def upload_10_k_to_qdrant(directory, out_dir):
                     no_error = True
                     data = json.load(file)
                     filename = os.path.basename(file_path)
-                    ticker = cik_ticker_mapping[str(data["cik"])]
+                    ticker = cik_ticker_mapping.ticker(data["cik"])
                     if ticker is None:
                         raise Exception(f"Unable to fild ticker. {file_path}") 
                     results = []
@@ -217,19 +217,12 @@ def check_10_k_item_content(item_name, content):
     return True
 
 def load_cik_ticker_mapping():
-    dir = rf"{os.path.dirname(os.path.abspath(__file__))}\company_tickers_exchange.json"
-    mapping = {}
-    with open(dir, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        
-        fields = data["fields"]
-        cik_index = fields.index("cik")
-        ticker_index = fields.index("ticker")
-        
-        for row in data["data"]:
-            mapping[str(row[cik_index])] = row[ticker_index]
-    
-    return mapping
+    # The ticker index is cached next to the datasets and built from the bundled company_tickers_exchange.json on first use
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return TickerIndex(
+        cache_filepath=os.path.join(current_dir, "datasets", "company_tickers.pickle"),
+        seed_filepath=os.path.join(current_dir, "company_tickers_exchange.json"),
+    )
          
 if __name__ == "__main__":
     # download_10_k(['AMD','NVDA'])
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+
+from filelock import FileLock
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket that caps the rate of requests sent to SEC EDGAR.
+
+    SEC EDGAR allows at most 10 requests per second per user agent. Every request, from every thread,
+    takes a token from the same bucket. When EDGAR answers with its throttling page, the limiter halves
+    its rate and pauses all threads for an exponentially growing period. Successful requests slowly
+    restore the rate back to the configured maximum.
+    """
+
+    def __init__(
+        self,
+        max_requests_per_second: float = 10,
+        min_requests_per_second: float = 1,
+        initial_backoff: float = 5,
+        max_backoff: float = 600,
+    ) -> None:
+        """
+        Initializes the rate limiter.
+
+        Args:
+            max_requests_per_second (float): The maximum rate of requests. Default is 10, which is the SEC EDGAR limit.
+            min_requests_per_second (float): The rate will never be reduced below this value. Default is 1.
+            initial_backoff (float): Seconds to pause all requests after the first throttling response. Default is 5.
+            max_backoff (float): Upper bound of the pause in seconds, reached by doubling the pause
+                    on consecutive throttling responses. Default is 600 (EDGAR blocks for about 10 minutes).
+        """
+        self.max_rate = max_requests_per_second
+        self.min_rate = min(min_requests_per_second, max_requests_per_second)
+        self.rate = max_requests_per_second
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff = initial_backoff
+
+        # The bucket holds a single token, so that requests are spaced 1 / rate seconds apart and the rate is
+        # never exceeded by a burst, neither at the start nor after an idle period
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request is allowed to be sent.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    # Refill the bucket according to the time passed since the last refill
+                    self.tokens = min(
+                        1.0, self.tokens + (now - self.last_refill) * self.rate
+                    )
+                    self.last_refill = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self) -> None:
+        """
+        Reports a throttling response from EDGAR: halves the rate and pauses all requests.
+        """
+        with self.lock:
+            now = time.monotonic()
+            # Several threads usually hit the throttling page at the same time; only back off once per pause
+            if now < self.paused_until:
+                return
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            self.paused_until = now + self.backoff
+            self.last_refill = self.paused_until
+            self.backoff = min(self.max_backoff, self.backoff * 2)
+
+    def succeeded(self) -> None:
+        """
+        Reports a successful response: resets the pause length and additively restores the rate.
+        """
+        with self.lock:
+            self.backoff = self.initial_backoff
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 0.1)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    A rate limiter whose budget is shared by several processes, e.g. the shards of a crawl running on
+    different machines under the same IP address and user agent.
+
+    The processes coordinate through a small JSON state file guarded by a file lock. Every request reserves the
+    next free slot of the shared schedule, so the combined rate of all processes never exceeds the maximum rate.
+    Throttling responses pause and slow down every process. The state file must be on storage that all processes
+    can lock, e.g. a local disk for processes on one machine or a shared network drive, and the clocks of the
+    machines must be synchronized.
+    """
+
+    def __init__(
+        self,
+        state_filepath: str,
+        max_requests_per_second: float = 10,
+        min_requests_per_second: float = 1,
+        initial_backoff: float = 5,
+        max_backoff: float = 600,
+    ) -> None:
+        """
+        Initializes the rate limiter.
+
+        Args:
+            state_filepath (str): The path of the state file shared by all processes. It is created if missing.
+            max_requests_per_second (float): The maximum combined rate of requests. Default is 10.
+            min_requests_per_second (float): The rate will never be reduced below this value. Default is 1.
+            initial_backoff (float): Seconds to pause all requests after the first throttling response. Default is 5.
+            max_backoff (float): Upper bound of the pause in seconds. Default is 600.
+        """
+        super().__init__(
+            max_requests_per_second=max_requests_per_second,
+            min_requests_per_second=min_requests_per_second,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+        )
+        self.state_filepath = state_filepath
+        self.file_lock = FileLock(f"{state_filepath}.lock")
+        # The rate restored by the successful responses since the last request
+        self.restored_rate = 0.0
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_filepath) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"rate": self.max_rate, "next_slot": 0.0, "paused_until": 0.0}
+
+    def _write_state(self, state: dict) -> None:
+        temp_filepath = f"{self.state_filepath}.tmp"
+        with open(temp_filepath, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_filepath, self.state_filepath)
+
+    def acquire(self) -> None:
+        """
+        Blocks until the shared schedule allows a request to be sent.
+        """
+        with self.lock:
+            restored_rate, self.restored_rate = self.restored_rate, 0.0
+
+        with self.file_lock:
+            state = self._read_state()
+            state["rate"] = min(self.max_rate, state["rate"] + restored_rate)
+            now = time.time()
+            slot = max(now, state["next_slot"], state["paused_until"])
+            state["next_slot"] = slot + 1 / state["rate"]
+            self._write_state(state)
+
+        with self.lock:
+            self.rate = state["rate"]
+        time.sleep(slot - now)
+
+    def throttled(self) -> None:
+        """
+        Reports a throttling response from EDGAR: halves the shared rate and pauses all processes.
+        """
+        with self.file_lock:
+            state = self._read_state()
+            now = time.time()
+            # Several processes usually hit the throttling page at the same time; only back off once per pause
+            if now < state["paused_until"]:
+                return
+            with self.lock:
+                state["rate"] = max(self.min_rate, state["rate"] / 2)
+                state["paused_until"] = now + self.backoff
+                self.backoff = min(self.max_backoff, self.backoff * 2)
+                self.restored_rate = 0.0
+            self._write_state(state)
+
+    def succeeded(self) -> None:
+        """
+        Reports a successful response: resets the pause length and additively restores the shared rate
+        with the next request.
+        """
+        with self.lock:
+            self.backoff = self.initial_backoff
+            self.restored_rate += 0.1
@@ -0,0 +1,245 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+from typing import BinaryIO, Iterator, Optional, Set, Union
+
+import zstandard
+
+# Chunk size of hashing and compressing raw filings
+CHUNK_SIZE = 1024 * 1024
+
+# The zstandard compression level. On EDGAR filings, level 10 compresses about 15x at about 60 MB/s,
+# far faster than filings are downloaded, and decompresses at several hundred MB/s.
+COMPRESSION_LEVEL = 10
+
+
+class RawFilingStore:
+    """
+    Stores the raw filings zstandard-compressed and keyed by the SHA-256 hash of their content.
+
+    The raw filings folder keeps its <Type>/<filename> layout as a manifest: a SQLite table maps every filing
+    to the hash of its content, and the content is stored once in objects/<first 2 hex digits>/<hash>.zst.
+    Filings with identical content, e.g. re-downloads and unchanged amendments, share a single object.
+    Plain files in the <Type> folders, e.g. from before the store existed, are still found and read as they are.
+
+    The manifest connection is opened lazily by each process, so the store can be passed to worker processes.
+    """
+
+    def __init__(self, folder: str, compression_level: int = COMPRESSION_LEVEL) -> None:
+        """
+        Initializes the store. Nothing is created on disk until a filing is added.
+
+        Args:
+            folder (str): The raw filings folder.
+            compression_level (int): The zstandard compression level of new objects. Default is 10.
+        """
+        self.folder = folder
+        self.compression_level = compression_level
+        self.manifest_filepath = os.path.join(folder, "manifest.db")
+        self.objects_folder = os.path.join(folder, "objects")
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # Connections and locks cannot be sent to other processes, which open their own
+        return {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in ["connection", "lock"]
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        """
+        Returns the manifest connection, or None if the manifest does not exist and is not to be created.
+        Must be called with the lock held.
+        """
+        if self.connection is None:
+            if not create and not os.path.exists(self.manifest_filepath):
+                return None
+            os.makedirs(self.folder, exist_ok=True)
+            self.connection = sqlite3.connect(
+                self.manifest_filepath, check_same_thread=False, timeout=60
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS manifest "
+                "(path TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER NOT NULL)"
+            )
+            self.connection.commit()
+        return self.connection
+
+    def _lookup(self, filing_type: str, filename: str) -> Optional[tuple]:
+        with self.lock:
+            connection = self._connect()
+            if connection is None:
+                return None
+            return connection.execute(
+                "SELECT sha256, size FROM manifest WHERE path = ?",
+                (f"{filing_type}/{filename}",),
+            ).fetchone()
+
+    def object_filepath(self, sha256: str) -> str:
+        """
+        Args:
+            sha256 (str): The hash of the content.
+
+        Returns:
+            str: The path of the compressed object of the content.
+        """
+        return os.path.join(self.objects_folder, sha256[:2], f"{sha256}.zst")
+
+    def put(self, filing_type: str, filename: str, source_filepath: str) -> str:
+        """
+        Moves a downloaded filing into the store. The content is only compressed if no filing with
+        the same content was stored before.
+
+        Args:
+            filing_type (str): The filing type, e.g. 10-K.
+            filename (str): The filename of the filing, as named by download_filings.crawl().
+            source_filepath (str): The path of the downloaded file, which is removed once it is stored.
+
+        Returns:
+            str: The hash of the content.
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        with open(source_filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                sha256.update(chunk)
+                size += len(chunk)
+        sha256 = sha256.hexdigest()
+
+        object_filepath = self.object_filepath(sha256)
+        if not os.path.exists(object_filepath):
+            os.makedirs(os.path.dirname(object_filepath), exist_ok=True)
+            # Compress to a temporary file first, so that an interrupted write never leaves a broken object
+            temp_filepath = (
+                f"{object_filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            compressor = zstandard.ZstdCompressor(level=self.compression_level)
+            with open(source_filepath, "rb") as source, open(temp_filepath, "wb") as f:
+                compressor.copy_stream(source, f, size=size, write_size=CHUNK_SIZE)
+            os.replace(temp_filepath, object_filepath)
+
+        with self.lock:
+            connection = self._connect(create=True)
+            connection.execute(
+                "INSERT OR REPLACE INTO manifest VALUES (?, ?, ?)",
+                (f"{filing_type}/{filename}", sha256, size),
+            )
+            connection.commit()
+
+        os.remove(source_filepath)
+        return sha256
+
+    def open(self, filing_type: str, filename: str) -> BinaryIO:
+        """
+        Opens a filing for reading. Stored filings are decompressed while they are read.
+
+        Args:
+            filing_type (str): The filing type, e.g. 10-K.
+            filename (str): The filename of the filing.
+
+        Returns:
+            BinaryIO: A binary stream of the content of the filing.
+
+        Raises:
+            FileNotFoundError: If the filing is neither in the store nor in the <Type> folder.
+        """
+        row = self._lookup(filing_type, filename)
+        if row is None:
+            return open(os.path.join(self.folder, filing_type, filename), "rb")
+
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(self.object_filepath(row[0]), "rb"),
+            read_size=CHUNK_SIZE,
+            closefd=True,
+        )
+
+    @contextlib.contextmanager
+    def map(self, filing_type: str, filename: str) -> Iterator[Union[bytes, mmap.mmap]]:
+        """
+        Provides the content of a filing as a buffer, without copying plain files into memory.
+        Plain files are memory-mapped, and stored filings are decompressed into memory.
+
+        Args:
+            filing_type (str): The filing type, e.g. 10-K.
+            filename (str): The filename of the filing.
+
+        Yields:
+            Union[bytes, mmap.mmap]: The content of the filing, which is only valid within the context.
+
+        Raises:
+            FileNotFoundError: If the filing is neither in the store nor in the <Type> folder.
+        """
+        if self._lookup(filing_type, filename) is not None:
+            with self.open(filing_type, filename) as f:
+                yield f.read()
+            return
+
+        with open(os.path.join(self.folder, filing_type, filename), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be memory-mapped
+                yield b""
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+    def size(self, filing_type: str, filename: str) -> int:
+        """
+        Args:
+            filing_type (str): The filing type, e.g. 10-K.
+            filename (str): The filename of the filing.
+
+        Returns:
+            int: The uncompressed size of the filing in bytes.
+        """
+        row = self._lookup(filing_type, filename)
+        if row is None:
+            return os.path.getsize(os.path.join(self.folder, filing_type, filename))
+        return row[1]
+
+    def filenames(self, filing_type: str) -> Set[str]:
+        """
+        Lists the filings of a filing type, both in the store and as plain files.
+
+        Args:
+            filing_type (str): The filing type, e.g. 10-K.
+
+        Returns:
+            Set[str]: The filenames of the filings.
+        """
+        filenames = set()
+        filing_type_folder = os.path.join(self.folder, filing_type)
+        if os.path.isdir(filing_type_folder):
+            filenames.update(os.listdir(filing_type_folder))
+
+        with self.lock:
+            connection = self._connect()
+            if connection is not None:
+                # The paths of a filing type are the range from "<Type>/" up to "<Type>0", since "0" follows "/"
+                filenames.update(
+                    path[len(filing_type) + 1 :]
+                    for (path,) in connection.execute(
+                        "SELECT path FROM manifest WHERE path >= ? AND path < ?",
+                        (f"{filing_type}/", f"{filing_type}0"),
+                    )
+                )
+        return filenames
+
+    def close(self) -> None:
+        """
+        Closes the connection to the manifest.
+        """
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,168 @@
+import io
+import mmap
+import re
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+# The tags of the SGML container of a filing. Like the regexes that split filings before, they match in any case.
+SGML_TAG_PATTERN = re.compile(rb"<(/?)(DOCUMENT|PDF)>", re.IGNORECASE)
+TYPE_TAG_PATTERN = re.compile(rb"<TYPE>", re.IGNORECASE)
+
+# The line of the <TYPE> tag of a document, matched on the decoded line
+TYPE_LINE_PATTERN = re.compile(
+    r"\n[^\S\r\n]*<TYPE>(.*?)\n", re.IGNORECASE | re.DOTALL | re.MULTILINE
+)
+
+# The content of a filing: a memory-mapped file, or the decompressed content of a stored filing
+Buffer = Union[bytes, mmap.mmap]
+
+
+def decode(data: bytes) -> str:
+    """
+    Decodes the content of a filing exactly like reading it as a text file: with the default encoding,
+    invalid bytes replaced by backslash escapes and universal newlines.
+
+    Args:
+        data (bytes): The content, or a part of it that starts and ends at a tag or at the ends of the content.
+
+    Returns:
+        str: The decoded text.
+    """
+    return io.TextIOWrapper(io.BytesIO(data), errors="backslashreplace").read()
+
+
+class SgmlDocument(NamedTuple):
+    """
+    A <DOCUMENT> of the SGML container of a filing.
+    """
+
+    # The offset of the <DOCUMENT> tag in the content
+    start: int
+    # The offset after the </DOCUMENT> tag
+    end: int
+    # The text of the <TYPE> tag, e.g. 10-K or EX-99.1, or None if the document has none
+    type: Optional[str]
+
+
+class SgmlIndex:
+    """
+    Index of the documents in the SGML container of a raw filing.
+
+    The content is scanned as bytes for the <DOCUMENT> and <PDF> tags, so the payloads of the exhibits,
+    e.g. PDFs, graphics and uuencoded files, are never decoded or copied. Only the <TYPE> line of each document
+    is decoded, and the text of a document is only decoded when it is requested.
+
+    The documents are the same as the regexes found on the decoded content before: the embedded PDFs from
+    <PDF> to the next </PDF> are removed first, and each document runs from <DOCUMENT> to the next </DOCUMENT>.
+    """
+
+    def __init__(self, buffer: Buffer) -> None:
+        """
+        Scans the content of a filing for its embedded PDFs and documents.
+
+        Args:
+            buffer (Buffer): The content of the filing, e.g. a memory-mapped file.
+        """
+        self.buffer = buffer
+        tags = [
+            (match.start(), match.end(), match[1] == b"/", match[2].upper())
+            for match in SGML_TAG_PATTERN.finditer(buffer)
+        ]
+
+        # The embedded PDFs, from a <PDF> tag to the next </PDF> tag
+        self.pdf_blocks: List[Tuple[int, int]] = []
+        pdf_start = None
+        for start, end, closing, name in tags:
+            if name != b"PDF":
+                continue
+            if pdf_start is None and not closing:
+                pdf_start = start
+            elif pdf_start is not None and closing:
+                self.pdf_blocks.append((pdf_start, end))
+                pdf_start = None
+
+        # The documents outside of the embedded PDFs, from a <DOCUMENT> tag to the next </DOCUMENT> tag
+        self.documents: List[SgmlDocument] = []
+        document_start = None
+        for start, end, closing, name in tags:
+            if name != b"DOCUMENT" or self._in_pdf_block(start):
+                continue
+            if document_start is None and not closing:
+                document_start = start
+            elif document_start is not None and closing:
+                self.documents.append(
+                    SgmlDocument(
+                        document_start, end, self._document_type(document_start, end)
+                    )
+                )
+                document_start = None
+
+    def _in_pdf_block(self, offset: int) -> bool:
+        return any(start <= offset < end for start, end in self.pdf_blocks)
+
+    def _pieces(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Returns the pieces of a part of the content between the embedded PDFs.
+        """
+        pieces = []
+        for pdf_start, pdf_end in self.pdf_blocks:
+            if pdf_end <= start or pdf_start >= end:
+                continue
+            pieces.append((start, pdf_start))
+            start = pdf_end
+        pieces.append((start, end))
+        return pieces
+
+    def _document_type(self, start: int, end: int) -> Optional[str]:
+        """
+        Returns the text of the first <TYPE> tag at the start of a line of a document, up to the end of the line.
+        """
+        for match in TYPE_TAG_PATTERN.finditer(self.buffer, start, end):
+            if self._in_pdf_block(match.start()):
+                continue
+            # The line of the tag, including the line breaks before and after it, which a removed PDF may split
+            line_start = -1
+            for piece_start, piece_end in reversed(self._pieces(start, match.start())):
+                line_start = max(
+                    self.buffer.rfind(b"\n", piece_start, piece_end),
+                    self.buffer.rfind(b"\r", piece_start, piece_end),
+                )
+                if line_start >= 0:
+                    break
+            line_end = -1
+            for piece_start, piece_end in self._pieces(match.end(), end):
+                line_ends = [
+                    offset
+                    for offset in [
+                        self.buffer.find(b"\n", piece_start, piece_end),
+                        self.buffer.find(b"\r", piece_start, piece_end),
+                    ]
+                    if offset >= 0
+                ]
+                if line_ends:
+                    line_end = min(line_ends)
+                    break
+            if line_start < 0 or line_end < 0:
+                continue
+            type_line = TYPE_LINE_PATTERN.match(self.text(line_start, line_end + 1))
+            if type_line:
+                return type_line[1]
+        return None
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Decodes a part of the content without the embedded PDFs.
+
+        Args:
+            start (int): The offset of the part. Default is 0.
+            end (Optional[int]): The offset after the part. Default is None, for the end of the content.
+
+        Returns:
+            str: The text of the part.
+        """
+        if end is None:
+            end = len(self.buffer)
+        # Every piece is decoded on its own, since the line breaks were translated before the PDFs were removed
+        return "".join(
+            decode(self.buffer[piece_start:piece_end])
+            for piece_start, piece_end in self._pieces(start, end)
+        )
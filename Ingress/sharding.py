@@ -0,0 +1,125 @@
+import hashlib
+import os
+
+import pandas as pd
+from filelock import FileLock
+
+from metadata_store import FILINGS_METADATA_COLUMNS
+
+
+def shard_of(cik: str, shard_count: int) -> int:
+    """
+    Returns the shard of a company. The shard only depends on the CIK, so all filings of a company are
+    crawled by the same node, and every node computes the same partition.
+
+    Args:
+        cik (str): The CIK of the company.
+        shard_count (int): The number of shards.
+
+    Returns:
+        int: The index of the shard, from 0 to shard_count - 1.
+    """
+    digest = hashlib.md5(str(cik).lstrip("0").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def filter_shard(df: pd.DataFrame, shard_index: int, shard_count: int) -> pd.DataFrame:
+    """
+    Keeps only the filings of the given shard.
+
+    Args:
+        df (pd.DataFrame): The filings, with a CIK column.
+        shard_index (int): The index of the shard to keep.
+        shard_count (int): The number of shards.
+
+    Returns:
+        pd.DataFrame: The filings of the shard.
+    """
+    if shard_count == 1:
+        return df
+    shards = df["CIK"].map(lambda cik: shard_of(cik, shard_count))
+    return df[shards == shard_index]
+
+
+def shard_filepath(filepath: str, shard_index: int, shard_count: int) -> str:
+    """
+    Returns the path of the file of a shard, e.g. FILINGS_METADATA.shard-1-of-4.csv for FILINGS_METADATA.csv.
+
+    Args:
+        filepath (str): The path of the file of the whole crawl.
+        shard_index (int): The index of the shard.
+        shard_count (int): The number of shards.
+
+    Returns:
+        str: The path of the file of the shard, or the given path if there is a single shard.
+    """
+    if shard_count == 1:
+        return filepath
+    root, ext = os.path.splitext(filepath)
+    return f"{root}.shard-{shard_index}-of-{shard_count}{ext}"
+
+
+def merge_shard_metadata(csv_filepath: str, shard_count: int) -> pd.DataFrame:
+    """
+    Merges the filings metadata CSV files of all shards into the filings metadata CSV file of the whole crawl.
+
+    The shards that have not exported their filings metadata yet keep their filings from the existing merged file,
+    so every node can merge as soon as its own shard finishes, and the last node produces the complete file.
+
+    Args:
+        csv_filepath (str): The path of the merged filings metadata CSV file.
+        shard_count (int): The number of shards.
+
+    Returns:
+        pd.DataFrame: The merged filings metadata.
+    """
+    # Nodes that finish at the same time merge one after another
+    with FileLock(f"{csv_filepath}.lock"):
+        if os.path.exists(csv_filepath):
+            merged_df = pd.read_csv(csv_filepath, dtype=str)
+            shards = merged_df["CIK"].map(lambda cik: shard_of(cik, shard_count))
+        else:
+            merged_df = pd.DataFrame(columns=FILINGS_METADATA_COLUMNS, dtype=str)
+            shards = pd.Series(dtype=int)
+
+        dfs = []
+        for shard_index in range(shard_count):
+            filepath = shard_filepath(csv_filepath, shard_index, shard_count)
+            if os.path.exists(filepath):
+                dfs.append(pd.read_csv(filepath, dtype=str))
+            else:
+                dfs.append(merged_df[shards == shard_index])
+
+        df = pd.concat(dfs, ignore_index=True)[FILINGS_METADATA_COLUMNS]
+
+        temp_filepath = f"{csv_filepath}.tmp"
+        df.to_csv(temp_filepath, index=False, header=True)
+        os.replace(temp_filepath, csv_filepath)
+
+    return df
+
+
+def seed_shard_metadata(csv_filepath: str, shard_index: int, shard_count: int) -> None:
+    """
+    Creates the filings metadata CSV file of a shard from the merged filings metadata CSV file, if the shard has none
+    yet, so that the filings downloaded before the crawl was sharded are not downloaded again.
+
+    Args:
+        csv_filepath (str): The path of the merged filings metadata CSV file.
+        shard_index (int): The index of the shard.
+        shard_count (int): The number of shards.
+    """
+    filepath = shard_filepath(csv_filepath, shard_index, shard_count)
+    if (
+        shard_count == 1
+        or os.path.exists(filepath)
+        or os.path.exists(f"{os.path.splitext(filepath)[0]}.db")
+        or not os.path.exists(csv_filepath)
+    ):
+        return
+
+    with FileLock(f"{csv_filepath}.lock"):
+        df = filter_shard(
+            pd.read_csv(csv_filepath, dtype=str), shard_index, shard_count
+        )
+    df.to_csv(filepath, index=False, header=True)
@@ -0,0 +1,168 @@
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+import requests
+
+# The submissions JSON of a company, e.g. https://data.sec.gov/submissions/CIK0000320193.json
+SUBMISSIONS_URL = "https://data.sec.gov/submissions/"
+
+# The filing documents, e.g. https://www.sec.gov/Archives/edgar/data/320193/000032019318000145/a10-k20189292018.htm
+ARCHIVES_URL = "https://www.sec.gov/Archives/"
+
+
+class SubmissionsResolver:
+    """
+    Resolves the details of filings from the structured submissions JSON of their company on SEC EDGAR.
+
+    A single request returns the primary document, the filing date and the report date of up to a thousand
+    recent filings of a company, together with the company info. Older filings are listed in additional pages,
+    which are only requested for filings that are not among the recent ones. Every page is requested at most once
+    and kept in a compact form, so crawling many filings of the same company costs one or two requests in total
+    instead of one index page per filing.
+    """
+
+    def __init__(
+        self,
+        get: Callable[[str], Optional[requests.Response]],
+        forms: Optional[Iterable[str]] = None,
+        submissions_url: str = SUBMISSIONS_URL,
+        archives_url: str = ARCHIVES_URL,
+    ) -> None:
+        """
+        Initializes the resolver.
+
+        Args:
+            get (Callable[[str], Optional[requests.Response]]): Sends a GET request to SEC EDGAR and returns
+                    the response, or None if it failed, e.g. download_filings.get_with_backoff() with a bound session.
+            forms (Optional[Iterable[str]]): Only keep the filings of these forms, e.g. ['10-K', '8-K'].
+                    Default is None, which keeps all filings.
+            submissions_url (str): The base URL of the submissions JSON files. Default is the SEC EDGAR URL.
+            archives_url (str): The base URL of the filing documents. Default is the SEC EDGAR URL.
+        """
+        self.get = get
+        self.submissions_url = submissions_url
+        self.archives_url = archives_url
+        self.forms = None if forms is None else set(forms)
+
+        # The companies by CIK and the filings by accession number, filled as the pages are downloaded
+        self.companies: Dict[str, Optional[dict]] = {}
+        self.filings: Dict[str, dict] = {}
+        self.loaded_pages = set()
+
+        self.lock = threading.Lock()
+        # One lock per page, so that threads crawling the same company wait for a single request
+        self.page_locks: Dict[str, threading.Lock] = {}
+
+    def _get_json(self, url: str) -> Optional[dict]:
+        try:
+            response = self.get(url)
+            if response is None or response.status_code != 200:
+                return None
+            return response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _load_page(self, name: str, cik: Optional[str] = None) -> None:
+        """
+        Downloads a submissions page once and adds its filings, and for the first page of a company
+        its company info, to the resolver.
+        """
+        with self.lock:
+            page_lock = self.page_locks.setdefault(name, threading.Lock())
+
+        with page_lock:
+            if name in self.loaded_pages:
+                return
+
+            data = self._get_json(f"{self.submissions_url}{name}")
+            # The first page has company info and the recent filings, the additional pages only filings
+            filings = data.get("filings", {}).get("recent", data) if data else {}
+
+            with self.lock:
+                for i, accession_number in enumerate(
+                    filings.get("accessionNumber", [])
+                ):
+                    if self.forms is not None and filings["form"][i] not in self.forms:
+                        continue
+                    self.filings[accession_number] = {
+                        "Filing Date": filings["filingDate"][i],
+                        "Period of Report": filings["reportDate"][i],
+                        "form": filings["form"][i],
+                        "primaryDocument": filings["primaryDocument"][i],
+                    }
+
+                if cik is not None:
+                    self.companies[cik] = None
+                    if data is not None:
+                        business_address = (
+                            data.get("addresses", {}).get("business") or {}
+                        )
+                        self.companies[cik] = {
+                            "Company Name": data.get("name") or None,
+                            "SIC": data.get("sic") or None,
+                            "State location": business_address.get("stateOrCountry")
+                            or None,
+                            "State of Inc": data.get("stateOfIncorporation") or None,
+                            "Fiscal Year End": data.get("fiscalYearEnd") or None,
+                            # The additional pages with older filings, by the range of their filing dates
+                            "files": data.get("filings", {}).get("files", []),
+                        }
+
+                self.loaded_pages.add(name)
+
+    def company_info(self, cik: str) -> Optional[dict]:
+        """
+        Returns the company info from the first submissions page, in the format of
+        download_filings.fetch_company_info().
+
+        Args:
+            cik (str): The CIK of the company.
+
+        Returns:
+            Optional[dict]: The company info, or None if the submissions JSON could not be downloaded.
+        """
+        cik = str(cik)
+        if cik not in self.companies:
+            self._load_page(f"CIK{cik.zfill(10)}.json", cik=cik)
+
+        company = self.companies.get(cik)
+        if company is None:
+            return None
+        return {key: value for key, value in company.items() if key != "files"}
+
+    def filing(
+        self, cik: str, accession_number: str, filing_date: str
+    ) -> Optional[dict]:
+        """
+        Returns the details of a filing.
+
+        Args:
+            cik (str): The CIK of the company.
+            accession_number (str): The accession number of the filing, e.g. 0000320193-18-000145.
+            filing_date (str): The filing date in the format YYYY-MM-DD, to find the page that lists older filings.
+
+        Returns:
+            Optional[dict]: The "Filing Date", "Period of Report", "form" and "primaryDocument" of the filing,
+                and the "url" of its primary document, or None if the filing could not be found.
+        """
+        cik = str(cik)
+        self.company_info(cik)
+        company = self.companies.get(cik)
+
+        if accession_number not in self.filings and company is not None:
+            for file in company["files"]:
+                if (
+                    file.get("filingFrom", "")
+                    <= filing_date
+                    <= file.get("filingTo", "")
+                ):
+                    self._load_page(file["name"])
+
+        filing = self.filings.get(accession_number)
+        if filing is None:
+            return None
+
+        return {
+            **filing,
+            "url": f"{self.archives_url}edgar/data/{cik}/{accession_number.replace('-', '')}/{filing['primaryDocument']}",
+        }
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from crawl_queue import DONE, FAILED, PENDING, CrawlQueue, crawl_job_key
+from metadata_store import FILINGS_METADATA_COLUMNS
+
+CONFIG = {
+    "start_year": 2018,
+    "end_year": 2018,
+    "quarters": [1],
+    "filing_types": ["10-K"],
+    "cik_tickers": ["AAPL"],
+}
+
+
+class TestCrawlQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filepath = os.path.join(self.tmp_dir.name, "CRAWL_QUEUE.db")
+        self.queue = CrawlQueue(self.db_filepath)
+        self.key = crawl_job_key(CONFIG)
+
+        self.df = pd.DataFrame(
+            [
+                [
+                    "320193",
+                    "APPLE INC",
+                    "10-K",
+                    "2018-11-05",
+                    f"https://www.sec.gov/Archives/edgar/data/320193/0000320193-18-00014{i}.txt",
+                    f"https://www.sec.gov/Archives/edgar/data/320193/0000320193-18-00014{i}-index.html",
+                ]
+                for i in range(3)
+            ],
+            columns=FILINGS_METADATA_COLUMNS[:6],
+        )
+        self.queue.start(key=self.key, df=self.df)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp_dir.cleanup()
+
+    def test_claim_and_finish(self):
+        list_of_series = self.queue.claim(max_attempts=3)
+
+        self.assertEqual(
+            [series["html_index"] for series in list_of_series],
+            self.df["html_index"].tolist(),
+        )
+        self.assertEqual(list_of_series[0]["CIK"], "320193")
+        self.assertEqual(self.queue.claim(max_attempts=3), [])
+
+        self.queue.done(self.df["html_index"][0])
+        self.queue.fail(self.df["html_index"][1], reason="HTTPError", retry_delay=60)
+
+        self.assertEqual(self.queue.count(DONE), 1)
+        self.assertEqual(self.queue.count(FAILED), 1)
+        self.assertEqual(
+            self.queue.failures(), [(self.df["html_index"][1], 1, "HTTPError")]
+        )
+        # The failed filing is not due for a retry yet
+        self.assertEqual(self.queue.claim(max_attempts=3), [])
+        self.assertGreater(self.queue.next_retry(max_attempts=3), time.time() + 50)
+
+    def test_retry_with_backoff(self):
+        html_index = self.df["html_index"][0]
+        self.queue.claim(max_attempts=2)
+
+        self.queue.fail(html_index, reason="Timeout", retry_delay=0)
+        self.assertEqual(
+            [series["html_index"] for series in self.queue.claim(max_attempts=2)],
+            [html_index],
+        )
+
+        # The filing ran out of attempts
+        self.queue.fail(html_index, reason="Timeout", retry_delay=0)
+        self.assertEqual(self.queue.claim(max_attempts=2), [])
+        self.assertIsNone(self.queue.next_retry(max_attempts=2))
+
+    def test_resume_after_crash(self):
+        self.queue.claim(max_attempts=3)
+        self.queue.done(self.df["html_index"][0])
+        self.queue.close()
+
+        # The filings that were in flight when the previous run stopped are pending again
+        self.queue = CrawlQueue(self.db_filepath)
+
+        self.assertTrue(self.queue.can_resume(self.key))
+        self.assertFalse(
+            self.queue.can_resume(crawl_job_key({**CONFIG, "filing_types": ["10-Q"]}))
+        )
+        self.assertEqual(self.queue.count(PENDING), 2)
+        self.assertEqual(
+            [series["html_index"] for series in self.queue.claim(max_attempts=3)],
+            self.df["html_index"].tolist()[1:],
+        )
+
+    def test_finished_job_is_not_resumed(self):
+        for series in self.queue.claim(max_attempts=3):
+            self.queue.done(series["html_index"])
+
+        self.assertFalse(self.queue.can_resume(self.key))
+
+        # Starting a new job replaces the finished one
+        self.queue.start(key=self.key, df=self.df.iloc[:1])
+        self.assertEqual(self.queue.count(), 1)
+        self.assertEqual(self.queue.count(PENDING), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
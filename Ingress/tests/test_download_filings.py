@@ -0,0 +1,458 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import zipfile
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+
+import download_filings
+import index_store
+from company_info_cache import CompanyInfoCache
+from download_filings import (
+    THROTTLING_MESSAGE,
+    crawl,
+    download,
+    download_index,
+    filter_new_filings,
+    select_new_filings,
+)
+from metadata_store import FILINGS_METADATA_COLUMNS, FilingsMetadataStore
+from rate_limiter import RateLimiter
+from submissions import SubmissionsResolver
+
+FILING_CONTENT = b"<SEC-DOCUMENT>" + b"x" * 5000 + b"</SEC-DOCUMENT>"
+
+
+class FilingRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the FILES by path, honoring Range requests, and the throttling page on any other path.
+    """
+
+    FILES = {"/filing.txt": FILING_CONTENT}
+    REQUESTS = []
+
+    def do_GET(self):
+        self.REQUESTS.append(self.path)
+        if self.path not in self.FILES:
+            body = f"<html><body>{THROTTLING_MESSAGE}</body></html>".encode()
+            self.send_response(403)
+        else:
+            body = self.FILES[self.path]
+            if "Range" in self.headers:
+                start = int(self.headers["Range"][len("bytes=") : -1])
+                body = body[start:]
+                self.send_response(206)
+            else:
+                self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFilingsMetadataStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_filepath = os.path.join(self.tmp_dir, "FILINGS_METADATA.csv")
+        shutil.copy(
+            os.path.join("tests", "fixtures", "FILINGS_METADATA_TEST.csv"),
+            self.csv_filepath,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_export_keeps_csv_schema(self):
+        with open(self.csv_filepath) as f:
+            expected_csv = f.read()
+
+        store = FilingsMetadataStore(self.csv_filepath)
+        store.export_csv()
+        store.close()
+
+        with open(self.csv_filepath) as f:
+            self.assertEqual(f.read(), expected_csv)
+
+    def test_append_survives_reopen(self):
+        store = FilingsMetadataStore(self.csv_filepath, compaction_interval=2)
+        series = store.to_dataframe().iloc[0].copy()
+        series["html_index"] = (
+            "https://www.sec.gov/Archives/edgar/data/1/new-index.html"
+        )
+        series["SIC"] = None
+        store.append(series)
+        # Appending the same filing again replaces it instead of duplicating it
+        store.append(series)
+        store.close()
+
+        # The second append triggered a compaction into the CSV file
+        df = pd.read_csv(self.csv_filepath, dtype=str)
+        self.assertEqual(len(df), 800)
+        self.assertTrue(pd.isna(df.iloc[-1]["SIC"]))
+
+        store = FilingsMetadataStore(self.csv_filepath)
+        self.assertEqual(len(store), 800)
+        store.close()
+
+
+class TestDownload(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FilingRequestHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.session = requests.Session()
+        self.rate_limiter = RateLimiter(
+            max_requests_per_second=1000, initial_backoff=0.01
+        )
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_download(self):
+        success = download(
+            f"{self.base_url}/filing.txt",
+            "filing.txt",
+            self.tmp_dir,
+            self.session,
+            self.rate_limiter,
+        )
+
+        self.assertTrue(success)
+        with open(os.path.join(self.tmp_dir, "filing.txt"), "rb") as f:
+            self.assertEqual(f.read(), FILING_CONTENT)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "filing.txt.part")))
+
+    def test_download_resumes_partial_file(self):
+        with open(os.path.join(self.tmp_dir, "filing.txt.part"), "wb") as f:
+            f.write(FILING_CONTENT[:3000])
+
+        success = download(
+            f"{self.base_url}/filing.txt",
+            "filing.txt",
+            self.tmp_dir,
+            self.session,
+            self.rate_limiter,
+        )
+
+        self.assertTrue(success)
+        with open(os.path.join(self.tmp_dir, "filing.txt"), "rb") as f:
+            self.assertEqual(f.read(), FILING_CONTENT)
+
+    def test_download_throttled(self):
+        success = download(
+            f"{self.base_url}/throttled.txt",
+            "throttled.txt",
+            self.tmp_dir,
+            self.session,
+            self.rate_limiter,
+        )
+
+        self.assertFalse(success)
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_download_index(self):
+        header = "".join(f"header line {i}\n" for i in range(11))
+        lines = [
+            "1000045|NICHOLAS FINANCIAL INC|10-Q|2018-02-14|edgar/data/1000045/0001193125-18-043599.txt\n",
+            "1000097|KINGDON CAPITAL MANAGEMENT, L.L.C.|SC 13G|2018-02-14|edgar/data/1000097/0000919574-18-001804.txt\n",
+        ]
+        zip_filepath = os.path.join(self.tmp_dir, "master.zip")
+        with zipfile.ZipFile(zip_filepath, "w") as zf:
+            zf.writestr("master.idx", (header + "".join(lines)).encode("latin-1"))
+        with open(zip_filepath, "rb") as f:
+            FilingRequestHandler.FILES["/master.zip"] = f.read()
+
+        index_filepath = os.path.join(self.tmp_dir, "2018_QTR1.tsv")
+        success = download_index(
+            f"{self.base_url}/master.zip",
+            index_filepath,
+            self.session,
+            self.rate_limiter,
+        )
+
+        self.assertTrue(success)
+        with open(index_filepath, encoding="utf-8") as f:
+            self.assertEqual(
+                f.read(),
+                "1000045|NICHOLAS FINANCIAL INC|10-Q|2018-02-14|edgar/data/1000045/0001193125-18-043599.txt"
+                "|edgar/data/1000045/0001193125-18-043599-index.html\n"
+                "1000097|KINGDON CAPITAL MANAGEMENT, L.L.C.|SC 13G|2018-02-14|edgar/data/1000097/0000919574-18-001804.txt"
+                "|edgar/data/1000097/0000919574-18-001804-index.html\n",
+            )
+
+
+class TestCrawl(unittest.TestCase):
+    """
+    Crawls filings from a local server that stands in for sec.gov and data.sec.gov.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FilingRequestHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+        submissions = {
+            "cik": "320193",
+            "name": "Apple Inc.",
+            "sic": "3571",
+            "fiscalYearEnd": "0929",
+            "stateOfIncorporation": "CA",
+            "addresses": {"business": {"stateOrCountry": "CA"}},
+            "filings": {
+                "recent": {
+                    "accessionNumber": [
+                        "0000320193-18-000145",
+                        "0000320193-18-000100",
+                        "0000320193-18-000090",
+                    ],
+                    "filingDate": ["2018-11-05", "2018-08-01", "2018-07-01"],
+                    "reportDate": ["2018-09-29", "", "2018-06-30"],
+                    "form": ["10-K", "10-K", "8-K"],
+                    "primaryDocument": [
+                        "a10-k20189292018.htm",
+                        "a10-k20180801.htm",
+                        "a8-k.htm",
+                    ],
+                },
+                "files": [],
+            },
+        }
+        with open(
+            os.path.join("tests", "fixtures", "EDGAR_INDEX_PAGE_TEST.html"), "rb"
+        ) as f:
+            index_page = f.read()
+
+        FilingRequestHandler.FILES.update(
+            {
+                "/submissions/CIK0000320193.json": json.dumps(submissions).encode(),
+                "/Archives/edgar/data/320193/000032019318000145/a10-k20189292018.htm": FILING_CONTENT,
+                # The index page of the filing whose report date is missing in the submissions JSON
+                "/Archives/edgar/data/320193/0000320193-18-000100-index.html": index_page,
+            }
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmp_dir, "10-K"))
+        self.session = requests.Session()
+        self.rate_limiter = RateLimiter(
+            max_requests_per_second=1000, initial_backoff=0.01
+        )
+        self.company_info_cache = CompanyInfoCache(
+            os.path.join(self.tmp_dir, "companies_info.json")
+        )
+        self.submissions = SubmissionsResolver(
+            get=lambda url: self.session.get(url),
+            forms=["10-K"],
+            submissions_url=f"{self.base_url}/submissions/",
+            archives_url=f"{self.base_url}/Archives/",
+        )
+        FilingRequestHandler.REQUESTS.clear()
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def crawl(self, accession_number):
+        series = pd.Series(index=FILINGS_METADATA_COLUMNS, dtype=object)
+        series["CIK"] = "320193"
+        series["Type"] = "10-K"
+        series["Date"] = "2018-11-05"
+        series["complete_text_file_link"] = (
+            f"{self.base_url}/Archives/edgar/data/320193/{accession_number}.txt"
+        )
+        series["html_index"] = (
+            f"{self.base_url}/Archives/edgar/data/320193/{accession_number}-index.html"
+        )
+        return crawl(
+            filing_types=["10-K"],
+            series=series,
+            raw_filings_folder=self.tmp_dir,
+            company_info_cache=self.company_info_cache,
+            session=self.session,
+            rate_limiter=self.rate_limiter,
+            submissions=self.submissions,
+        )
+
+    def test_crawl_from_submissions(self):
+        series = self.crawl("0000320193-18-000145")
+
+        self.assertEqual(series["Filing Date"], "2018-11-05")
+        self.assertEqual(series["Period of Report"], "2018-09-29")
+        self.assertEqual(series["SIC"], "3571")
+        self.assertEqual(series["State of Inc"], "CA")
+        self.assertEqual(series["State location"], "CA")
+        self.assertEqual(series["Fiscal Year End"], "0929")
+        self.assertEqual(series["filename"], "320193_10K_2018_0000320193-18-000145.htm")
+        with open(os.path.join(self.tmp_dir, "10-K", series["filename"]), "rb") as f:
+            self.assertEqual(f.read(), FILING_CONTENT)
+
+        # Neither the index page nor the company page were crawled
+        self.assertEqual(
+            FilingRequestHandler.REQUESTS,
+            [
+                "/submissions/CIK0000320193.json",
+                "/Archives/edgar/data/320193/000032019318000145/a10-k20189292018.htm",
+            ],
+        )
+
+    def test_crawl_falls_back_to_index_page(self):
+        series = self.crawl("0000320193-18-000100")
+
+        # The details come from the index page, which links to the document of the fixture
+        self.assertEqual(series["Period of Report"], "2018-09-29")
+        self.assertEqual(series["SIC"], "3571")
+        self.assertEqual(
+            series["htm_file_link"],
+            f"{self.base_url}/Archives/edgar/data/320193/000032019318000145/a10-k20189292018.htm",
+        )
+        self.assertIn(
+            "/Archives/edgar/data/320193/0000320193-18-000100-index.html",
+            FilingRequestHandler.REQUESTS,
+        )
+
+
+class TestFilterNewFilings(unittest.TestCase):
+    def test_filter_new_filings(self):
+        old_df = pd.read_csv(
+            os.path.join("tests", "fixtures", "FILINGS_METADATA_TEST.csv"), dtype=str
+        )
+        new_series = old_df.iloc[0].copy()
+        new_series["html_index"] = (
+            "https://www.sec.gov/Archives/edgar/data/1/new-index.html"
+        )
+        df = pd.concat([old_df, new_series.to_frame().T])
+
+        with tempfile.TemporaryDirectory() as raw_filings_folder:
+            # Only the first two old filings are still in the download folder
+            for _, series in old_df.iloc[:2].iterrows():
+                os.makedirs(
+                    os.path.join(raw_filings_folder, series["Type"]), exist_ok=True
+                )
+                open(
+                    os.path.join(
+                        raw_filings_folder, series["Type"], series["filename"]
+                    ),
+                    "w",
+                ).close()
+
+            new_df, missing_html_indices = filter_new_filings(
+                df, old_df, raw_filings_folder
+            )
+
+        self.assertEqual(len(new_df), len(old_df) - 1)
+        self.assertNotIn(old_df.iloc[0]["html_index"], new_df["html_index"].tolist())
+        self.assertIn(new_series["html_index"], new_df["html_index"].tolist())
+        self.assertEqual(missing_html_indices, old_df["html_index"].iloc[2:].tolist())
+
+
+class TestSelectNewFilings(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.indices_folder = os.path.join(self.tmp_dir, "INDICES")
+        os.makedirs(self.indices_folder)
+        # Two quarters with filings of many companies, so that both shards get some of them
+        for quarter in [1, 2]:
+            with open(
+                os.path.join(self.indices_folder, f"2020_QTR{quarter}.tsv"), "w"
+            ) as f:
+                for cik in range(1000, 1200):
+                    link = f"edgar/data/{cik}/0000000000-20-00000{quarter}"
+                    f.write(
+                        f"{cik}|COMPANY {cik}|10-K|2020-0{quarter}-15|{link}.txt|{link}-index.html\n"
+                    )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_shards_share_indices_folder(self):
+        shard_count = 2
+        results = [None] * shard_count
+
+        def select(shard_index):
+            config = {
+                "start_year": 2020,
+                "end_year": 2020,
+                "quarters": [1, 2],
+                "skip_present_indices": True,
+                "filing_types": ["10-K"],
+                "cik_tickers": None,
+                "shard_index": shard_index,
+                "shard_count": shard_count,
+            }
+            metadata_store = FilingsMetadataStore(
+                csv_filepath=os.path.join(
+                    self.tmp_dir, f"FILINGS_METADATA.{shard_index}.csv"
+                )
+            )
+            try:
+                results[shard_index] = select_new_filings(
+                    config=config,
+                    indices_folder=self.indices_folder,
+                    raw_filings_folder=os.path.join(self.tmp_dir, "RAW_FILINGS"),
+                    metadata_store=metadata_store,
+                    session=None,
+                    rate_limiter=None,
+                )
+            finally:
+                metadata_store.close()
+
+        # The shards start at the same time, and the indices are already downloaded
+        with mock.patch.object(download_filings, "download_indices"), mock.patch.object(
+            index_store.pq, "write_table", wraps=index_store.pq.write_table
+        ) as write_table:
+            threads = [
+                threading.Thread(target=select, args=(shard_index,))
+                for shard_index in range(shard_count)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Every index is converted once, by the shard that takes the lock first
+        self.assertEqual(write_table.call_count, 2)
+        self.assertFalse(
+            any(
+                filename.endswith(".tmp")
+                for filename in os.listdir(self.indices_folder)
+            )
+        )
+        # The shards split the filings of both quarters between them
+        self.assertTrue(all(len(df) > 0 for df in results))
+        self.assertEqual(
+            sorted(pd.concat(results)["html_index"]),
+            sorted(
+                f"https://www.sec.gov/Archives/edgar/data/{cik}/0000000000-20-00000{quarter}-index.html"
+                for cik in range(1000, 1200)
+                for quarter in [1, 2]
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
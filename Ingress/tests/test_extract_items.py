@@ -1,13 +1,26 @@
 import json
 import os
+import shutil
+import tempfile
 import unittest
 import zipfile
+from unittest import mock
 
 import numpy as np
 import pandas as pd
+from bs4 import BeautifulSoup
 from tqdm import tqdm
 
-from extract_items import ExtractItems
+import extract_items
+from extract_items import (
+    ITEM_PATTERNS,
+    ExtractItems,
+    HeaderIndex,
+    ItemPatterns,
+    predict_makespan,
+    schedule_filings,
+)
+from item_lists import item_list_8k
 
 
 def extract_zip(input_zip):
@@ -324,6 +337,372 @@ class TestExtractItems(unittest.TestCase):
             self.fail(f"Extraction failed for the following items:\n{failure_report}")
 
 
+class TestScheduleFilings(unittest.TestCase):
+    def test_largest_first_with_batched_small_filings(self):
+        sizes = [10, 5_000_000, 20, 3_000_000, 30, 40]
+        records = [{"filename": f"{i}.htm"} for i in range(len(sizes))]
+
+        batches, batch_sizes = schedule_filings(records, sizes, num_workers=2)
+
+        self.assertEqual(
+            [[record["filename"] for record in batch] for batch in batches],
+            [["1.htm"], ["3.htm"], ["5.htm", "4.htm", "2.htm", "0.htm"]],
+        )
+        self.assertEqual(batch_sizes, [5_000_000, 3_000_000, 100])
+
+    def test_predict_makespan(self):
+        # The second worker takes the 3 and then the 2, while the first one is still busy with the 5
+        self.assertEqual(predict_makespan([5, 3, 2], num_workers=2), 5)
+        self.assertEqual(predict_makespan([5, 3, 3], num_workers=2), 6)
+        self.assertEqual(predict_makespan([5, 3, 3], num_workers=1), 11)
+
+
+class TestItemPatterns(unittest.TestCase):
+    def test_precompiled_table(self):
+        patterns = dict(ITEM_PATTERNS.patterns)
+        text = "\nTable of Contents\nITEM 7A. Quantitative\nText\nItem 8: Financial\n"
+
+        # The headers of all filing types are compiled up front, and looked up afterwards
+        self.assertIs(ITEM_PATTERNS.header("7A"), patterns[("header", "7A", True)])
+        self.assertIn(("header", "part_2__1A", False), patterns)
+        self.assertIn(("table_header", "5.02"), patterns)
+        self.assertEqual(ITEM_PATTERNS.header("7A").search(text).start(), 18)
+
+        section = ITEM_PATTERNS.section("7A", "8", ignore_case=False)
+        self.assertIs(ITEM_PATTERNS.section("7A", "8", ignore_case=False), section)
+        self.assertIsNone(section.search(text))
+        self.assertEqual(
+            ITEM_PATTERNS.section("7A", "8", ignore_case=True).search(text)[1],
+            "\nItem 8:",
+        )
+
+        # Items outside of the item lists are compiled on demand
+        self.assertEqual(
+            ItemPatterns([]).header("IV").pattern, ITEM_PATTERNS.header("IV").pattern
+        )
+
+
+class TestHeaderIndex(unittest.TestCase):
+    def assert_same_sections(self, text, item_index, next_item_index):
+        index = HeaderIndex(text)
+        offsets = [
+            match.start() for match in ITEM_PATTERNS.header(item_index).finditer(text)
+        ]
+        self.assertTrue(offsets)
+        for offset in offsets:
+            for ignore_case in [False, True]:
+                expected = [
+                    (offset + match.start(), offset + match.start(1))
+                    for match in ITEM_PATTERNS.section(
+                        item_index, next_item_index, ignore_case
+                    ).finditer(text[offset:])
+                ]
+                sections = index.sections(
+                    item_index, next_item_index, offset, ignore_case
+                )
+                self.assertEqual(
+                    [(section.start, section.next_start) for section in sections],
+                    expected,
+                )
+
+    def test_sections_match_the_section_pattern(self):
+        text = (
+            "\nTABLE OF CONTENTS\nItem 7. MD&A 12\nItem 7A. Market Risk 20\n"
+            "ITEM 8. Statements 25\n\nITEM 7. MANAGEMENT'S DISCUSSION\nAs noted in\n"
+            "item 7A below, revenue grew.\n  ITEM 7A: MARKET RISK\nRates.\n"
+            "ITEM 7A\nITEM 8. FINANCIAL STATEMENTS\nSee notes.\n"
+        )
+        self.assert_same_sections(text, "7", "7A")
+        self.assert_same_sections(text, "7A", "8")
+        self.assert_same_sections(text, "7", "8")
+
+    def test_header_right_after_item_header(self):
+        # The section pattern only ends at the header of Item 9B with "ITEM 9A(" as the header of Item 9A
+        text = "\nITEM 9A(T).\nITEM 9B. OTHER INFORMATION\nNone.\n"
+        self.assert_same_sections(text, "9A", "9B")
+        self.assertEqual(len(HeaderIndex(text).sections("9A", "9B", 0, False)), 1)
+
+
+class TestSelectiveExtraction(unittest.TestCase):
+    def add_item_sections(self, items_to_extract, text):
+        extraction = ExtractItems(
+            remove_tables=False,
+            items_to_extract=items_to_extract,
+            include_signature=False,
+            raw_files_folder="",
+            extracted_files_folder="",
+            skip_extracted_filings=True,
+        )
+        extraction.determine_items_to_extract({"Type": "10-K"})
+        json_content = {}
+        with mock.patch.object(
+            extraction, "parse_item", wraps=extraction.parse_item
+        ) as parse_item:
+            extraction.add_item_sections(text, {"Type": "10-K"}, json_content)
+        return json_content, parse_item
+
+    def test_requested_items(self):
+        text = "\nTABLE OF CONTENTS\n" + "".join(
+            f"Item {item}. Title {item} {i}\n"
+            for i, item in enumerate(["1", "1A", "7"])
+        )
+        for item in ["1", "1A", "1B", "2", "7", "7A", "8", "9A"]:
+            text += (
+                f"\nITEM {item}. TITLE {item}\nThe text of item {item}, see Item 7.\n"
+            )
+
+        all_items, _ = self.add_item_sections([], text)
+        json_content, parse_item = self.add_item_sections(["7", "1A"], text)
+
+        self.assertEqual(
+            json_content,
+            {"item_1A": all_items["item_1A"], "item_7": all_items["item_7"]},
+        )
+        self.assertIn("The text of item 7", json_content["item_7"])
+        # The items before Item 7 are only parsed for their positions, and the items after it not at all
+        self.assertEqual(
+            [call.args[1] for call in parse_item.call_args_list],
+            ["1", "1A", "1B", "1C", "2", "3", "4", "5", "6", "7"],
+        )
+        self.assertEqual(
+            [
+                call.args[1]
+                for call in parse_item.call_args_list
+                if call.kwargs["extract_text"]
+            ],
+            ["1A", "7"],
+        )
+
+
+class TestGet10qParts(unittest.TestCase):
+    def test_retries_reuse_the_header_index(self):
+        # PART II starts in the ToC, so PART II is much longer than PART I and is parsed again with ignored matches
+        text = (
+            "\nINDEX\nPART I. FINANCIAL INFORMATION\nItem 1. Statements 3\n"
+            "PART II. OTHER INFORMATION\nItem 1. Legal Proceedings 20\n"
+            "\nPART I. FINANCIAL INFORMATION\nItem 1. Statements\n"
+            + "Revenue grew. " * 100
+            + "\nPART II. OTHER INFORMATION\nItem 1. Legal Proceedings\n"
+            + "Litigation. " * 800
+            + "\nSIGNATURES\nChief Financial Officer\n"
+        )
+        extraction = ExtractItems(
+            remove_tables=False,
+            items_to_extract=[],
+            include_signature=False,
+            raw_files_folder="",
+            extracted_files_folder="",
+            skip_extracted_filings=True,
+        )
+        extraction.determine_items_to_extract({"Type": "10-Q"})
+
+        with mock.patch.object(
+            extract_items, "HeaderIndex", wraps=HeaderIndex
+        ) as header_index, mock.patch.object(
+            extraction, "parse_10q_parts", wraps=extraction.parse_10q_parts
+        ) as parse_10q_parts:
+            texts = extraction.get_10q_parts(text, {"filename": "10-Q.htm"})
+
+        self.assertGreater(parse_10q_parts.call_count, 2)
+        self.assertEqual(header_index.call_count, 1)
+
+        # The same parts are found when every parse indexes the text again
+        with mock.patch.object(extraction, "get_header_index", side_effect=HeaderIndex):
+            self.assertEqual(
+                extraction.get_10q_parts(text, {"filename": "10-Q.htm"}), texts
+            )
+
+
+class TestHtmlTreeToText(unittest.TestCase):
+    def test_same_text_as_strip_html(self):
+        html = (
+            '<!DOCTYPE html PUBLIC "-//W3C//DTD HTML 4.01//EN">\n<html><head><title>8-K &amp; Exhibits</title>'
+            "<style>p { margin: 0 }</style></head><body><!-- Created with a generator -->"
+            "<div><p>Item 2.02<span>\xa0Results</span> of Operations</p><br><br clear='all'/>"
+            "<ul><li>First</li><li>Second &lt;item&gt;</li></ul>"
+            "<table><tr><th>Year</th><th>2019</th></tr><tr><td>Revenue</td><td>1,234</td></tr></table>"
+            "<script>document.write('</p><br>');</script></div>SIGNATURES</body></html>"
+        )
+        doc = BeautifulSoup(html, "lxml")
+
+        text = ExtractItems.html_tree_to_text(doc)
+
+        self.assertEqual(text, ExtractItems.strip_html(str(doc)))
+        self.assertIn("Revenue  1,234  \n\n", text)
+        self.assertEqual(
+            ExtractItems.html_tree_to_text(doc.table),
+            ExtractItems.strip_html(str(doc.table)),
+        )
+
+
+class TestCleanText(unittest.TestCase):
+    def test_clean_text(self):
+        text = (
+            "\nP A R T  II\n I T E M 1A. Risk\x97Factors\xa0and\u2009\u200bmore\n"
+            "\nitem 7- Management\x92s discussion \x93MD&A\x94 \u2013 results\n"
+            "\nTABLE OF CONTENTS\n\n- 12 -\n\n34\nPage 5\nSee Note F-3 \x95 \u2018A\u2019 \x99\n"
+            "\nS I G N A T U R E S  \nBy: /s/ CFO\n"
+        )
+
+        self.assertEqual(
+            ExtractItems.clean_text(text),
+            "\nPART  II\n ITEM 1A. Risk-Factors and  more\n"
+            "\nitem 7 -  Management\u2019s discussion \u201cMD&A\u201d - results\n"
+            "\n\n- 12 -\nSee Note \u2022 \u2018A\u2019 \u2122\n"
+            "\nSIGNATURES  \nBy: /s/ CFO\n",
+        )
+
+    def test_headers_in_any_case(self):
+        # The dotted and dotless I match I when ignoring case
+        self.assertEqual(
+            ExtractItems.clean_text(
+                "\n\u0131 t e m 2- Properties\n\u0130tem 3\u2022 Legal"
+            ),
+            "\n\u0131tem 2 -  Properties\n\u0130tem 3 \u2022  Legal",
+        )
+
+
+class TestRemoveHtmlTables(unittest.TestCase):
+    def test_remove_html_tables(self):
+        def table(text, attributes=""):
+            return f"<table><tr{attributes}><td>{text}</td><td>1,234</td></tr></table>"
+
+        html = (
+            "<html><body>"
+            + table("Plain")
+            + table("Bgcolor", ' bgcolor="#CCEEFF"')
+            + table("Background", ' style="font-size:10pt;background-color:#cceeff"')
+            + table("White", ' style="background: white"')
+            + table("Escaped", ' style="b\\61 ckground: red"')
+            + table("\nItem 2.02 Results", ' bgcolor="silver"')
+            + "</body></html>"
+        )
+        extraction = ExtractItems(
+            remove_tables=True,
+            items_to_extract=[],
+            include_signature=False,
+            raw_files_folder="",
+            extracted_files_folder="",
+            skip_extracted_filings=True,
+        )
+        extraction.determine_items_to_extract({"Type": "8-K", "Date": "2019-01-01"})
+
+        doc = extraction.remove_html_tables(BeautifulSoup(html, "lxml"), is_html=True)
+
+        # Tables with a background color are removed, unless they contain an item header
+        self.assertEqual(
+            [tbl.td.get_text() for tbl in doc.find_all("table")],
+            ["Plain", "White", "\nItem 2.02 Results"],
+        )
+
+    def test_table_headers(self):
+        pattern = ITEM_PATTERNS.table_headers(item_list_8k)
+
+        for text in [
+            "\nItem 2.02 Results",
+            "\n ITEM 9.01: Exhibits",
+            "\nItem 2.02",
+            "\nItem 10.01 ",
+        ]:
+            self.assertEqual(
+                bool(pattern.search(text)),
+                any(
+                    ITEM_PATTERNS.table_header(item_index).search(text)
+                    for item_index in item_list_8k
+                ),
+            )
+
+
+class TestExtractItemsMain(unittest.TestCase):
+    def setUp(self):
+        self.dataset_dir = tempfile.mkdtemp()
+
+        filings_metadata_df = pd.read_csv(
+            os.path.join("tests", "fixtures", "FILINGS_METADATA_TEST.csv"), dtype=str
+        )
+        # Alternate 8-K filings from before and after August 23, 2004, which have different items,
+        # so that every worker processes both kinds
+        filings_metadata_df = filings_metadata_df[filings_metadata_df["Type"] == "8-K"]
+        is_obsolete = filings_metadata_df["Date"] <= "2004-08-23"
+        self.filings_metadata_df = pd.concat(
+            [
+                (
+                    filings_metadata_df[is_obsolete].iloc[i : i + 1]
+                    if j == 0
+                    else filings_metadata_df[~is_obsolete].iloc[i : i + 1]
+                )
+                for i in range(3)
+                for j in range(2)
+            ]
+        )
+        self.filings_metadata_df.to_csv(
+            os.path.join(self.dataset_dir, "FILINGS_METADATA.csv"), index=False
+        )
+
+        for filing_type in self.filings_metadata_df["Type"].unique():
+            zip_filepath = os.path.join(
+                "tests", "fixtures", "RAW_FILINGS", f"{filing_type}.zip"
+            )
+            if not os.path.exists(zip_filepath):
+                self.skipTest(f"Missing fixture {zip_filepath}")
+            with zipfile.ZipFile(zip_filepath) as zf:
+                for filename in self.filings_metadata_df[
+                    self.filings_metadata_df["Type"] == filing_type
+                ]["filename"]:
+                    zf.extract(
+                        f"{filing_type}/{filename}",
+                        os.path.join(self.dataset_dir, "RAW_FILINGS"),
+                    )
+
+        self.config = {
+            "extract_items": {
+                "raw_filings_folder": "RAW_FILINGS",
+                "extracted_filings_folder": "EXTRACTED_FILINGS",
+                "filings_metadata_file": "FILINGS_METADATA.csv",
+                "filing_types": [],
+                "include_signature": False,
+                "items_to_extract": [],
+                "remove_tables": True,
+                "skip_extracted_filings": False,
+                "num_workers": 2,
+            }
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.dataset_dir)
+
+    def test_main_with_workers(self):
+        with mock.patch.object(extract_items, "DATASET_DIR", self.dataset_dir):
+            extract_items.main(self.config)
+
+        # The workers extract the same filings as a fresh ExtractItems object per filing
+        for filing_metadata in self.filings_metadata_df.replace({np.nan: None}).to_dict(
+            "records"
+        ):
+            extraction = ExtractItems(
+                remove_tables=True,
+                items_to_extract=[],
+                include_signature=False,
+                raw_files_folder=os.path.join(self.dataset_dir, "RAW_FILINGS"),
+                extracted_files_folder="",
+                skip_extracted_filings=False,
+            )
+            extraction.determine_items_to_extract(filing_metadata)
+
+            with open(
+                os.path.join(
+                    self.dataset_dir,
+                    "EXTRACTED_FILINGS",
+                    filing_metadata["Type"],
+                    f"{filing_metadata['filename'].split('.')[0]}.json",
+                ),
+                encoding="utf-8",
+            ) as f:
+                self.assertEqual(
+                    json.load(f), extraction.extract_items(filing_metadata)
+                )
+
+
 if __name__ == "__main__":
     test = TestExtractItems()
     test.test_extract_items_10K()
@@ -0,0 +1,68 @@
+import os
+import unittest
+
+from index_page import parse_index_page, parse_index_page_soup
+
+
+def parse_soup(content: bytes) -> dict:
+    index_page = parse_index_page_soup(content)
+    index_page["Document Format Files"] = [
+        list(rows) for rows in index_page["Document Format Files"]
+    ]
+    return index_page
+
+
+class TestParseIndexPage(unittest.TestCase):
+    def setUp(self):
+        with open(
+            os.path.join("tests", "fixtures", "EDGAR_INDEX_PAGE_TEST.html"), "rb"
+        ) as f:
+            self.content = f.read()
+
+    def test_parse_index_page(self):
+        index_page = parse_index_page(self.content)
+
+        self.assertEqual(index_page, parse_soup(self.content))
+        self.assertEqual(index_page["Filing Date"], "2018-11-05")
+        self.assertEqual(index_page["Period of Report"], "2018-09-29")
+        self.assertEqual(index_page["SIC"], "3571")
+        self.assertIn("State of Incorp.: CA", index_page["identInfo"])
+        self.assertEqual(
+            index_page["Document Format Files"][0][-1],
+            (
+                "Complete submission text file",
+                "/Archives/edgar/data/320193/000032019318000145/0000320193-18-000145.txt",
+                "\xa0",
+            ),
+        )
+
+    def test_missing_company_info(self):
+        content = self.content.replace(b'class="companyInfo"', b'class="filerInfo"')
+
+        index_page = parse_index_page(content)
+
+        self.assertEqual(index_page, parse_soup(content))
+        self.assertIsNone(index_page["identInfo"])
+
+    def test_unsupported_pages_raise(self):
+        for content in [
+            # Non-ASCII pages are decoded by BeautifulSoup's encoding detection
+            self.content.replace(b"Apple Inc.", "Apple Inc.®".encode("utf-8")),
+            # Comments are not part of BeautifulSoup's .text
+            self.content.replace(
+                b'<div class="info">2018-09-29</div>',
+                b'<div class="info">2018-09-29<!-- end --></div>',
+            ),
+            # Rows that crawl() reads positionally must have the usual layout
+            self.content.replace(
+                b'<td scope="row"><a href="/Archives/edgar/data/320193/000032019318000145/a10-kexhibit41.htm">',
+                b'<td scope="row"> <a href="/Archives/edgar/data/320193/000032019318000145/a10-kexhibit41.htm">',
+            ),
+        ]:
+            with self.assertRaises(ValueError):
+                parse_index_page(content)
+            self.assertEqual(parse_soup(content)["Period of Report"], "2018-09-29")
+
+
+if __name__ == "__main__":
+    unittest.main()
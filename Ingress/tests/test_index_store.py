@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from index_store import parquet_filepath, read_indices
+from metadata_store import FILINGS_METADATA_COLUMNS
+
+INDEX_LINES = [
+    "1000045|NICHOLAS FINANCIAL INC|10-Q|2018-02-14|edgar/data/1000045/0001193125-18-043599.txt|edgar/data/1000045/0001193125-18-043599-index.html\n",
+    "1000097|KINGDON CAPITAL MANAGEMENT, L.L.C.|SC 13G|2018-02-14|edgar/data/1000097/0000919574-18-001804.txt|edgar/data/1000097/0000919574-18-001804-index.html\n",
+    "1000045|NICHOLAS FINANCIAL INC|8-K|2018-01-30|edgar/data/1000045/0001193125-18-023880.txt|edgar/data/1000045/0001193125-18-023880-index.html\n",
+    "1000180|SANDISK CORP|10-K|2018-02-13|edgar/data/1000180/0001000180-18-000005.txt|edgar/data/1000180/0001000180-18-000005-index.html\n",
+    "1000045|NICHOLAS FINANCIAL INC|10-Q|2018-03-14|edgar/data/1000045/0001193125-18-080000.txt|edgar/data/1000045/0001193125-18-080000-index.html\n",
+]
+
+
+class TestReadIndices(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tsv_filepaths = []
+        for i, lines in enumerate([INDEX_LINES[:3], INDEX_LINES[3:]]):
+            filepath = os.path.join(self.tmp_dir.name, f"2018_QTR{i + 1}.tsv")
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write("".join(lines))
+            self.tsv_filepaths.append(filepath)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_indices_matches_tsv(self):
+        df = read_indices(self.tsv_filepaths, ["10-Q", "10-K"], ["1000045", "1000180"])
+
+        expected_df = pd.concat(
+            pd.read_csv(
+                filepath,
+                sep="|",
+                header=None,
+                dtype=str,
+                names=FILINGS_METADATA_COLUMNS,
+            )
+            for filepath in self.tsv_filepaths
+        )
+        expected_df = expected_df[
+            expected_df.Type.isin(["10-Q", "10-K"])
+            & expected_df.CIK.isin(["1000045", "1000180"])
+        ].reset_index(drop=True)
+        for column in ["complete_text_file_link", "html_index"]:
+            expected_df[column] = "https://www.sec.gov/Archives/" + expected_df[column]
+
+        self.assertEqual(df.columns.tolist(), FILINGS_METADATA_COLUMNS)
+        pd.testing.assert_frame_equal(df.fillna(""), expected_df.fillna(""))
+        for filepath in self.tsv_filepaths:
+            self.assertTrue(os.path.exists(parquet_filepath(filepath)))
+
+    def test_read_indices_all_ciks(self):
+        df = read_indices(self.tsv_filepaths, ["10-Q"])
+
+        self.assertEqual(
+            df["Date"].tolist(),
+            ["2018-02-14", "2018-03-14"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
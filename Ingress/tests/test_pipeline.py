@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+import pandas as pd
+
+import extract_items
+import pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.dataset_dir = tempfile.mkdtemp()
+
+        filings_metadata_df = pd.read_csv(
+            os.path.join("tests", "fixtures", "FILINGS_METADATA_TEST.csv"), dtype=str
+        )
+        self.filings_metadata_df = filings_metadata_df[
+            filings_metadata_df["Type"] == "8-K"
+        ].iloc[:3]
+
+        with zipfile.ZipFile(
+            os.path.join("tests", "fixtures", "RAW_FILINGS", "8-K.zip")
+        ) as zf:
+            for filename in self.filings_metadata_df["filename"]:
+                zf.extract(
+                    f"8-K/{filename}", os.path.join(self.dataset_dir, "RAW_FILINGS")
+                )
+
+        # The first filing was downloaded by an earlier run, but never extracted
+        self.filings_metadata_df.iloc[:1].to_csv(
+            os.path.join(self.dataset_dir, "FILINGS_METADATA.csv"), index=False
+        )
+
+        self.config = {
+            "download_filings": {},
+            "extract_items": {
+                "raw_filings_folder": "RAW_FILINGS",
+                "extracted_filings_folder": "EXTRACTED_FILINGS",
+                "filings_metadata_file": "FILINGS_METADATA.csv",
+                "filing_types": ["8-K"],
+                "include_signature": False,
+                "items_to_extract": [],
+                "remove_tables": True,
+                "skip_extracted_filings": True,
+                "queue_size": 1,
+            },
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.dataset_dir)
+
+    def fake_download(self, config, on_filing):
+        # Hands over the other filings one by one, as download_filings.main() does when it completes them
+        for i in range(1, len(self.filings_metadata_df)):
+            on_filing(self.filings_metadata_df.iloc[i].copy())
+            self.filings_metadata_df.iloc[: i + 1].to_csv(
+                os.path.join(self.dataset_dir, "FILINGS_METADATA.csv"), index=False
+            )
+        # There are no more filings to download
+        return
+
+    def test_pipeline(self):
+        with mock.patch.object(
+            pipeline, "DATASET_DIR", self.dataset_dir
+        ), mock.patch.object(
+            extract_items, "DATASET_DIR", self.dataset_dir
+        ), mock.patch.object(
+            pipeline.download_filings, "main", self.fake_download
+        ):
+            pipeline.main(self.config)
+
+        # Every filing was extracted exactly once
+        self.assertEqual(
+            sorted(
+                os.listdir(os.path.join(self.dataset_dir, "EXTRACTED_FILINGS", "8-K"))
+            ),
+            sorted(
+                f"{filename.split('.')[0]}.json"
+                for filename in self.filings_metadata_df["filename"]
+            ),
+        )
+
+    def test_pipeline_interrupted(self):
+        def interrupted_download(config, on_filing):
+            raise KeyboardInterrupt
+
+        with mock.patch.object(
+            pipeline, "DATASET_DIR", self.dataset_dir
+        ), mock.patch.object(
+            extract_items, "DATASET_DIR", self.dataset_dir
+        ), mock.patch.object(
+            pipeline.download_filings, "main", interrupted_download
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                pipeline.main(self.config)
+
+        # The filings of the earlier runs are not extracted after the interruption
+        extracted_folder = os.path.join(self.dataset_dir, "EXTRACTED_FILINGS", "8-K")
+        self.assertFalse(
+            os.path.exists(extracted_folder) and os.listdir(extracted_folder)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
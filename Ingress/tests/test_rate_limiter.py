@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+
+from rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_cap(self):
+        rate_limiter = RateLimiter(max_requests_per_second=50)
+
+        def send():
+            for _ in range(10):
+                rate_limiter.acquire()
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=send) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Only the first of the 30 requests from all threads is sent right away
+        self.assertGreaterEqual(time.monotonic() - start, 29 / 50)
+
+    def test_no_burst(self):
+        rate = 20
+        rate_limiter = RateLimiter(max_requests_per_second=rate)
+        timestamps = []
+        timestamps_lock = threading.Lock()
+
+        def send():
+            for _ in range(6):
+                rate_limiter.acquire()
+                with timestamps_lock:
+                    timestamps.append(time.monotonic())
+
+        # Send requests at the start, and again after an idle period
+        for _ in range(2):
+            threads = [threading.Thread(target=send) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            time.sleep(0.5)
+
+        # No 1 second window holds more than `rate` requests. The timestamps are taken right after acquire()
+        # returns, so a small scheduling delay is allowed for.
+        timestamps.sort()
+        for first, last in zip(timestamps, timestamps[rate:]):
+            self.assertGreaterEqual(last - first, 1 - 0.05)
+
+    def test_throttled(self):
+        rate_limiter = RateLimiter(max_requests_per_second=50, initial_backoff=0.3)
+
+        rate_limiter.throttled()
+        # Another thread that hits the throttling page during the pause does not back off again
+        rate_limiter.throttled()
+        self.assertEqual(rate_limiter.rate, 25)
+        self.assertEqual(rate_limiter.backoff, 0.6)
+
+        start = time.monotonic()
+        rate_limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_throttled_not_below_min_rate(self):
+        rate_limiter = RateLimiter(
+            max_requests_per_second=10, min_requests_per_second=4, initial_backoff=0
+        )
+
+        for _ in range(5):
+            rate_limiter.throttled()
+
+        self.assertEqual(rate_limiter.rate, 4)
+
+    def test_succeeded(self):
+        rate_limiter = RateLimiter(max_requests_per_second=50, initial_backoff=0.3)
+        rate_limiter.throttled()
+
+        rate_limiter.succeeded()
+        self.assertAlmostEqual(rate_limiter.rate, 25.1)
+        self.assertEqual(rate_limiter.backoff, 0.3)
+
+        # The rate is restored up to the configured maximum, never above it
+        for _ in range(1000):
+            rate_limiter.succeeded()
+        self.assertEqual(rate_limiter.rate, 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
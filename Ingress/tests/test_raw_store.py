@@ -0,0 +1,125 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from extract_items import ExtractItems
+from raw_store import RawFilingStore
+
+
+class TestRawFilingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = RawFilingStore(self.tmp_dir)
+        os.makedirs(os.path.join(self.tmp_dir, "10-K"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, filename, content):
+        filepath = os.path.join(self.tmp_dir, "10-K", filename)
+        with open(filepath, "wb") as f:
+            f.write(content)
+        return filepath
+
+    def test_put_and_open(self):
+        content = b"<html><body>Annual report</body></html>" * 1000
+        sha256 = self.store.put("10-K", "a.htm", self.write("a.htm", content))
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "10-K", "a.htm")))
+        self.assertLess(os.path.getsize(self.store.object_filepath(sha256)), 1000)
+        with self.store.open("10-K", "a.htm") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(self.store.size("10-K", "a.htm"), len(content))
+
+    def test_identical_content_is_stored_once(self):
+        content = b"<html>Amendment</html>"
+        sha256 = self.store.put("10-K", "a.htm", self.write("a.htm", content))
+        self.assertEqual(
+            self.store.put("10-K", "b.htm", self.write("b.htm", content)), sha256
+        )
+
+        objects = [
+            filename
+            for _, _, filenames in os.walk(os.path.join(self.tmp_dir, "objects"))
+            for filename in filenames
+        ]
+        self.assertEqual(objects, [f"{sha256}.zst"])
+
+    def test_plain_files(self):
+        self.write("plain.htm", b"plain")
+        self.store.put("10-K", "a.htm", self.write("a.htm", b"stored"))
+
+        # A new store, e.g. in another process, finds both the stored and the plain filings
+        store = pickle.loads(pickle.dumps(self.store))
+        self.assertEqual(store.filenames("10-K"), {"a.htm", "plain.htm"})
+        self.assertEqual(store.filenames("10-K/A"), set())
+        with store.open("10-K", "plain.htm") as f:
+            self.assertEqual(f.read(), b"plain")
+        with self.assertRaises(FileNotFoundError):
+            store.open("10-K", "missing.htm")
+        store.close()
+
+    def test_map(self):
+        self.write("plain.htm", b"plain")
+        self.write("empty.htm", b"")
+        self.store.put("10-K", "a.htm", self.write("a.htm", b"stored"))
+
+        for filename, content in [
+            ("plain.htm", b"plain"),
+            ("empty.htm", b""),
+            ("a.htm", b"stored"),
+        ]:
+            with self.store.map("10-K", filename) as buffer:
+                self.assertEqual(buffer[:], content)
+        with self.assertRaises(FileNotFoundError):
+            with self.store.map("10-K", "missing.htm"):
+                pass
+
+    def test_extract_items_reads_the_store(self):
+        filings_metadata_df = pd.read_csv(
+            os.path.join("tests", "fixtures", "FILINGS_METADATA_TEST.csv"), dtype=str
+        ).replace({np.nan: None})
+        filing_metadata = filings_metadata_df[
+            filings_metadata_df["Type"] == "8-K"
+        ].iloc[0]
+
+        with zipfile.ZipFile(
+            os.path.join("tests", "fixtures", "RAW_FILINGS", "8-K.zip")
+        ) as zf:
+            content = zf.read(f"8-K/{filing_metadata['filename']}")
+        plain_folder = os.path.join(self.tmp_dir, "plain")
+        os.makedirs(os.path.join(plain_folder, "8-K"))
+        with open(
+            os.path.join(plain_folder, "8-K", filing_metadata["filename"]), "wb"
+        ) as f:
+            f.write(content)
+        self.store.put(
+            "8-K", filing_metadata["filename"], self.write("download.htm", content)
+        )
+
+        extracted_filings = []
+        for raw_files_folder in [plain_folder, self.tmp_dir]:
+            extraction = ExtractItems(
+                remove_tables=True,
+                items_to_extract=[],
+                include_signature=False,
+                raw_files_folder=raw_files_folder,
+                extracted_files_folder="",
+                skip_extracted_filings=True,
+            )
+            extraction.determine_items_to_extract(filing_metadata)
+            extracted_filings.append(extraction.extract_items(filing_metadata))
+
+        self.assertEqual(extracted_filings[0], extracted_filings[1])
+        self.assertGreater(len(extracted_filings[0]), len(filing_metadata))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import mmap
+import os
+import re
+import tempfile
+import unittest
+
+from sgml_documents import SgmlIndex
+
+CONTAINER = (
+    b"<SEC-DOCUMENT>0000950123-10-078896.txt : 20100820\r\n"
+    b"<DOCUMENT>\r\n<TYPE>8-K\r\n<SEQUENCE>1\r\n<TEXT>\r\n"
+    b"<html><body><table><tr><td>Item 2.02 Results \xe2\x80\x94 Q2</td></tr></table></body></html>\r\n"
+    b"</TEXT>\r\n</DOCUMENT>\r\n"
+    b"<DOCUMENT>\r\n<TYPE>EX-99.1\r\n<TEXT>\r\n<PDF>\r\nJVBERi0xLjQKJ<DOCUMENT>\r\n</PDF>\r\n"
+    b"Press release\r\n</TEXT>\r\n</DOCUMENT>\r\n"
+    b"<DOCUMENT>\r\n<TYPE>GRAPHIC\r\n<TEXT>\r\nbegin 644 logo.jpg\r\nM_]C_X``02D9)\r\nend\r\n"
+    b"</TEXT>\r\n</DOCUMENT>\r\n"
+    b"</SEC-DOCUMENT>\r\n"
+)
+
+
+def regex_documents(content: bytes):
+    """
+    Splits a filing into its documents with the regexes that extract_items() used before the SgmlIndex.
+    """
+    flags = re.IGNORECASE | re.DOTALL | re.MULTILINE
+    text = io.TextIOWrapper(io.BytesIO(content), errors="backslashreplace").read()
+    text = re.sub(r"<PDF>.*?</PDF>", "", text, flags=flags)
+    documents = re.findall("<DOCUMENT>.*?</DOCUMENT>", text, flags=flags)
+    types = [
+        re.search(r"\n[^\S\r\n]*<TYPE>(.*?)\n", document, flags=flags).group(1)
+        for document in documents
+    ]
+    return text, documents, types
+
+
+class TestSgmlIndex(unittest.TestCase):
+    def test_documents(self):
+        text, documents, types = regex_documents(CONTAINER)
+        index = SgmlIndex(CONTAINER)
+
+        self.assertEqual(
+            [document.type for document in index.documents],
+            ["8-K", "EX-99.1", "GRAPHIC"],
+        )
+        self.assertEqual([document.type for document in index.documents], types)
+        self.assertEqual(
+            [index.text(document.start, document.end) for document in index.documents],
+            documents,
+        )
+        self.assertEqual(index.text(), text)
+        self.assertIn("Results — Q2", index.text(*index.documents[0][:2]))
+
+    def test_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "filing.txt")
+            with open(filepath, "wb") as f:
+                f.write(CONTAINER)
+            with open(filepath, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as buffer:
+                index = SgmlIndex(buffer)
+                self.assertEqual(index.text(), SgmlIndex(CONTAINER).text())
+                self.assertEqual(index.documents, SgmlIndex(CONTAINER).documents)
+
+    def test_without_documents(self):
+        content = b"<PDF>unterminated\nplain text filing\n"
+        index = SgmlIndex(content)
+
+        self.assertEqual(index.documents, [])
+        self.assertEqual(index.text(), regex_documents(content)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+from metadata_store import FILINGS_METADATA_COLUMNS
+from rate_limiter import SharedRateLimiter
+from sharding import (
+    filter_shard,
+    merge_shard_metadata,
+    seed_shard_metadata,
+    shard_filepath,
+    shard_of,
+)
+
+
+def filings_metadata(ciks):
+    return pd.DataFrame(
+        [
+            [cik, f"COMPANY {cik}", "10-K", "2018-11-05"]
+            + [f"https://www.sec.gov/Archives/edgar/data/{cik}/{cik}-index.html"] * 2
+            + [None] * 8
+            for cik in ciks
+        ],
+        columns=FILINGS_METADATA_COLUMNS,
+    )
+
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_filepath = os.path.join(self.tmp_dir.name, "FILINGS_METADATA.csv")
+        self.ciks = [str(cik) for cik in range(1000, 1100)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_partition(self):
+        df = filings_metadata(self.ciks)
+        shards = [filter_shard(df, shard_index, 3) for shard_index in range(3)]
+
+        # Every company is in exactly one shard, whatever the padding of its CIK
+        self.assertEqual(sorted(pd.concat(shards)["CIK"]), sorted(self.ciks))
+        self.assertTrue(all(len(shard) > 0 for shard in shards))
+        self.assertEqual(shard_of("0000320193", 3), shard_of("320193", 3))
+        self.assertIs(filter_shard(df, 0, 1), df)
+
+    def test_shard_filepath(self):
+        self.assertEqual(
+            shard_filepath(self.csv_filepath, 1, 4),
+            os.path.join(self.tmp_dir.name, "FILINGS_METADATA.shard-1-of-4.csv"),
+        )
+        self.assertEqual(shard_filepath(self.csv_filepath, 0, 1), self.csv_filepath)
+
+    def test_seed_and_merge(self):
+        filings_metadata(self.ciks[:50]).to_csv(self.csv_filepath, index=False)
+
+        # The shards start from the filings that were downloaded before the crawl was sharded
+        for shard_index in range(2):
+            seed_shard_metadata(self.csv_filepath, shard_index, 2)
+        shard_0 = pd.read_csv(shard_filepath(self.csv_filepath, 0, 2), dtype=str)
+        self.assertTrue(all(shard_of(cik, 2) == 0 for cik in shard_0["CIK"]))
+
+        # Only shard 0 finished crawling its new filings
+        new_filings = filter_shard(filings_metadata(self.ciks[50:]), 0, 2)
+        pd.concat([shard_0, new_filings]).to_csv(
+            shard_filepath(self.csv_filepath, 0, 2), index=False
+        )
+        os.remove(shard_filepath(self.csv_filepath, 1, 2))
+
+        df = merge_shard_metadata(self.csv_filepath, 2)
+
+        self.assertEqual(list(df.columns), FILINGS_METADATA_COLUMNS)
+        self.assertEqual(
+            sorted(df["CIK"]),
+            sorted(self.ciks[:50] + new_filings["CIK"].tolist()),
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_csv(self.csv_filepath, dtype=str), df.astype(object)
+        )
+
+
+class TestSharedRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_filepath = os.path.join(self.tmp_dir.name, "RATE_LIMIT.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_shared_budget(self):
+        # Two limiters stand in for two nodes, which together must not exceed 50 requests per second
+        rate_limiters = [
+            SharedRateLimiter(self.state_filepath, max_requests_per_second=50)
+            for _ in range(2)
+        ]
+
+        def send(rate_limiter):
+            for _ in range(10):
+                rate_limiter.acquire()
+
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=send, args=(rate_limiter,))
+            for rate_limiter in rate_limiters
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.monotonic() - start, 19 / 50)
+
+    def test_throttled_pauses_all(self):
+        rate_limiters = [
+            SharedRateLimiter(
+                self.state_filepath, max_requests_per_second=50, initial_backoff=0.3
+            )
+            for _ in range(2)
+        ]
+
+        rate_limiters[0].throttled()
+        start = time.monotonic()
+        rate_limiters[1].acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+        self.assertEqual(rate_limiters[1].rate, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
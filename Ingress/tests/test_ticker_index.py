@@ -0,0 +1,142 @@
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from ticker_index import TickerIndex
+
+RAG_CONSTANTS_FILEPATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "Rag", "constants.py"
+)
+
+COMPANY_TICKERS = {
+    "fields": ["cik", "name", "ticker", "exchange"],
+    "data": [
+        [320193, "Apple Inc.", "AAPL", "Nasdaq"],
+        [1652044, "Alphabet Inc.", "GOOGL", "Nasdaq"],
+        [1652044, "Alphabet Inc.", "GOOG", "Nasdaq"],
+    ],
+}
+
+
+class CompanyTickersRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves COMPANY_TICKERS with an ETag, answering 304 when the client already has it.
+    """
+
+    requests = 0
+
+    def do_GET(self):
+        CompanyTickersRequestHandler.requests += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(COMPANY_TICKERS).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTickerIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.tmp_dir.name, "company_tickers.pickle")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lookups_from_seed(self):
+        seed_filepath = os.path.join(self.tmp_dir.name, "company_tickers_exchange.json")
+        with open(seed_filepath, "w") as f:
+            json.dump(COMPANY_TICKERS, f)
+
+        ticker_index = TickerIndex(self.cache_filepath, seed_filepath=seed_filepath)
+
+        self.assertEqual(ticker_index.cik("aapl"), "320193")
+        self.assertEqual(ticker_index.cik("GOOGL"), "1652044")
+        self.assertEqual(ticker_index.ticker("0000320193"), "AAPL")
+        # The last ticker of a company is kept
+        self.assertEqual(ticker_index.ticker(1652044), "GOOG")
+        self.assertEqual(ticker_index.resolve_ticker("alphabet inc."), "GOOG")
+        self.assertEqual(ticker_index.resolve_ticker("googl"), "GOOG")
+        self.assertEqual(ticker_index.resolve_ticker("320193"), "AAPL")
+        self.assertIsNone(ticker_index.cik("MSFT"))
+        self.assertTrue(ticker_index.is_stale())
+
+        # The seeded index is persisted, so the seed file is not needed anymore
+        os.remove(seed_filepath)
+        self.assertEqual(len(TickerIndex(self.cache_filepath)), 3)
+
+    def test_corrupted_cache_rebuilt_from_seed(self):
+        seed_filepath = os.path.join(self.tmp_dir.name, "company_tickers_exchange.json")
+        with open(seed_filepath, "w") as f:
+            json.dump(COMPANY_TICKERS, f)
+        TickerIndex(self.cache_filepath, seed_filepath=seed_filepath)
+
+        # A save that was cut short leaves a truncated cache file
+        with open(self.cache_filepath, "r+b") as f:
+            f.truncate(os.path.getsize(self.cache_filepath) // 2)
+
+        ticker_index = TickerIndex(self.cache_filepath, seed_filepath=seed_filepath)
+        self.assertEqual(ticker_index.cik("AAPL"), "320193")
+        self.assertEqual(len(TickerIndex(self.cache_filepath)), 3)
+        # No temporary files are left next to the cache file
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir.name)),
+            ["company_tickers.pickle", "company_tickers_exchange.json"],
+        )
+
+    def test_rag_index_from_bundled_seed(self):
+        # Load the index like Rag/Agent.py does on its first run, without a user agent to refresh it
+        spec = importlib.util.spec_from_file_location(
+            "rag_constants", RAG_CONSTANTS_FILEPATH
+        )
+        rag_constants = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(rag_constants)
+
+        ticker_index = TickerIndex(
+            self.cache_filepath, seed_filepath=rag_constants.TICKER_INDEX_SEED_FILEPATH
+        )
+
+        self.assertGreater(len(ticker_index), 0)
+        self.assertEqual(ticker_index.resolve_ticker("aapl"), "AAPL")
+        self.assertEqual(ticker_index.resolve_ticker("320193"), "AAPL")
+        self.assertEqual(ticker_index.resolve_ticker("Apple Inc."), "AAPL")
+
+    def test_conditional_refresh(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), CompanyTickersRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = (
+            f"http://127.0.0.1:{server.server_address[1]}/company_tickers_exchange.json"
+        )
+
+        try:
+            with requests.Session() as session:
+                ticker_index = TickerIndex(self.cache_filepath)
+                self.assertTrue(ticker_index.refresh(session, url=url))
+                self.assertFalse(ticker_index.is_stale())
+
+                ticker_index = TickerIndex(self.cache_filepath)
+                self.assertEqual(ticker_index.etag, '"v1"')
+                self.assertTrue(ticker_index.refresh(session, url=url))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(CompanyTickersRequestHandler.requests, 2)
+        self.assertEqual(ticker_index.cik("AAPL"), "320193")
+
+
+if __name__ == "__main__":
+    unittest.main()
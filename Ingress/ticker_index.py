@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+from typing import Optional
+
+import requests
+
+LOGGER = logging.getLogger(__name__)
+
+# The list of companies with their CIK, name, ticker and exchange, published by SEC EDGAR
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
+
+
+class TickerIndex:
+    """
+    An index of the companies on SEC EDGAR for constant-time lookups by ticker, CIK or company name.
+
+    The index is persisted as a pickle file, which loads much faster than the JSON file it is built from.
+    It is refreshed from SEC EDGAR with conditional requests, so an unchanged list costs a single 304 response,
+    and lookups never need the network once the index has been loaded.
+    """
+
+    def __init__(
+        self, cache_filepath: str, seed_filepath: Optional[str] = None
+    ) -> None:
+        """
+        Loads the index from its cache file or, if there is none yet or it cannot be read,
+        from a company_tickers_exchange.json file.
+
+        Args:
+            cache_filepath (str): The path of the pickle file that persists the index.
+            seed_filepath (Optional[str]): A company_tickers_exchange.json file to build the index from
+                    when the cache file does not exist yet or cannot be read. Default is None.
+        """
+        self.cache_filepath = cache_filepath
+        self.etag = None
+        self.last_modified = None
+        self.refreshed_at = 0.0
+        self.ticker2cik = {}
+        self.cik2ticker = {}
+        self.cik2name = {}
+        self.name2cik = {}
+
+        if os.path.exists(cache_filepath):
+            try:
+                with open(cache_filepath, "rb") as f:
+                    state = pickle.load(f)
+            except (
+                pickle.UnpicklingError,
+                EOFError,
+                AttributeError,
+                ImportError,
+                IndexError,
+            ) as err:
+                # A truncated or corrupted cache file is rebuilt from the seed file, if any
+                LOGGER.info(f'Failed loading "{cache_filepath}" - {err}')
+            else:
+                self.__dict__.update(state)
+                return
+
+        if seed_filepath is not None and os.path.exists(seed_filepath):
+            with open(seed_filepath, encoding="utf-8") as f:
+                self._build(json.load(f))
+            # The seeded index is still stale, but the next load does not need to parse the JSON file again
+            self.save()
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: The number of tickers in the index.
+        """
+        return len(self.ticker2cik)
+
+    def _build(self, data: dict) -> None:
+        """
+        Builds the lookup tables from the contents of company_tickers_exchange.json.
+        """
+        fields = data["fields"]
+        cik_index = fields.index("cik")
+        name_index = fields.index("name")
+        ticker_index = fields.index("ticker")
+
+        self.ticker2cik, self.cik2ticker, self.cik2name, self.name2cik = {}, {}, {}, {}
+        for row in data["data"]:
+            cik = str(row[cik_index])
+            # For companies with several tickers, the last one is kept, as qdrant_data_import always did
+            self.cik2ticker[cik] = row[ticker_index]
+            self.cik2name[cik] = row[name_index]
+            if row[ticker_index] is not None:
+                self.ticker2cik[row[ticker_index].upper()] = cik
+            if row[name_index] is not None:
+                self.name2cik[row[name_index].lower()] = cik
+
+    def save(self) -> None:
+        """
+        Persists the index to its cache file. The file is written to a unique temporary file first and then
+        atomically moved in place, so that processes saving the index at the same time do not clash.
+        """
+        cache_folder = os.path.dirname(os.path.abspath(self.cache_filepath))
+        os.makedirs(cache_folder, exist_ok=True)
+        fd, temp_filepath = tempfile.mkstemp(dir=cache_folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                state = {
+                    key: value
+                    for key, value in self.__dict__.items()
+                    if key != "cache_filepath"
+                }
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filepath, self.cache_filepath)
+        except BaseException:
+            os.remove(temp_filepath)
+            raise
+
+    def is_stale(self, max_age: float = 86400) -> bool:
+        """
+        Args:
+            max_age (float): The number of seconds after which the index should be refreshed. Default is one day.
+
+        Returns:
+            bool: True if the index is empty or was last refreshed more than max_age seconds ago.
+        """
+        return len(self) == 0 or time.time() - self.refreshed_at > max_age
+
+    def refresh(
+        self,
+        session: requests.Session,
+        rate_limiter=None,
+        url: str = COMPANY_TICKERS_URL,
+    ) -> bool:
+        """
+        Refreshes the index from SEC EDGAR, unless the list of companies has not changed since the last refresh.
+
+        Args:
+            session (requests.Session): The session to send the request with. It must set the User-Agent
+                    header that SEC EDGAR requires.
+            rate_limiter: An optional rate limiter shared with other requests to SEC EDGAR,
+                    see Ingress/rate_limiter.py. Default is None.
+            url (str): The URL of company_tickers_exchange.json. Default is the SEC EDGAR URL.
+
+        Returns:
+            bool: True if the index is up to date, False if the refresh failed and the cached index was kept.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = session.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+                self._build(response.json())
+                self.etag = response.headers.get("ETag")
+                self.last_modified = response.headers.get("Last-Modified")
+        except (requests.RequestException, ValueError) as err:
+            LOGGER.info(f'Failed refreshing "{url}" - {err}')
+            return False
+
+        self.refreshed_at = time.time()
+        self.save()
+        return True
+
+    def cik(self, ticker: str) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The CIK of the company with the given ticker, or None if the ticker is unknown.
+        """
+        return self.ticker2cik.get(ticker.upper())
+
+    def ticker(self, cik) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The ticker of the company with the given CIK, or None if the CIK is unknown.
+        """
+        return self.cik2ticker.get(str(cik).lstrip("0"))
+
+    def company_name(self, cik) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The name of the company with the given CIK, or None if the CIK is unknown.
+        """
+        return self.cik2name.get(str(cik).lstrip("0"))
+
+    def resolve_ticker(self, value: str) -> Optional[str]:
+        """
+        Resolves a ticker, a CIK or an exact company name to the ticker of the company. Companies with several
+        tickers always resolve to the same one, which is the ticker that ticker() returns for their CIK.
+
+        Returns:
+            Optional[str]: The ticker, or None if the value does not match any company.
+        """
+        value = str(value).strip()
+        if value.isdigit():
+            return self.ticker(value)
+        cik = self.ticker2cik.get(value.upper(), self.name2cik.get(value.lower()))
+        return None if cik is None else self.ticker(cik)
@@ -1,5 +1,7 @@
 import openai
 import json
+import os
+import requests
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import Filter, FieldCondition, MatchValue
 from embedding_helper import EmbeddingModel
@@ -7,6 +9,7 @@ from transformers import BertTokenizer, BertForSequenceClassification
 import torch
 import constants
 import prompts
+from ticker_index import TickerIndex
 from fastapi import FastAPI, Request
 import uvicorn
 from pydantic import BaseModel
@@ -28,6 +31,17 @@ class Agent:
         # Define your embedding model
         self.embedding_model = EmbeddingModel()
 
+        # Load the cached ticker index, built from the bundled list of companies on the first run,
+        # and refresh it from SEC EDGAR at most once a day if a user agent is set
+        self.ticker_index = TickerIndex(
+            cache_filepath=os.path.join(os.path.dirname(os.path.abspath(__file__)), "company_tickers.pickle"),
+            seed_filepath=constants.TICKER_INDEX_SEED_FILEPATH
+        )
+        if self.ticker_index.is_stale() and constants.SEC_USER_AGENT:
+            with requests.Session() as session:
+                session.headers.update({"User-Agent": constants.SEC_USER_AGENT})
+                self.ticker_index.refresh(session)
+
         # Initialize the FinBERT model and tokenizer
         self.finbert_tokenizer = BertTokenizer.from_pretrained('yiyanghkust/finbert-tone')
         self.finbert_model = BertForSequenceClassification.from_pretrained('yiyanghkust/finbert-tone')
@@ -84,9 +98,11 @@ class Agent:
             
             combined_conditions = []       
             for json_filter in json_filters:
+                # The model may answer with a company name or a CIK instead of the ticker stored in Qdrant
+                ticker = self.ticker_index.resolve_ticker(json_filter["ticker"]) or json_filter["ticker"]
                 condition = Filter(
                     must=[
-                        FieldCondition(key="ticker", match=MatchValue(value=json_filter["ticker"])),
+                        FieldCondition(key="ticker", match=MatchValue(value=ticker)),
                         FieldCondition(key="year", match=MatchValue(value=int(json_filter["year"]))),
                         FieldCondition(key="quarter", match=MatchValue(value=json_filter["quarter"])),
                         FieldCondition(key="report_type", match=MatchValue(value=json_filter["report_type"]))
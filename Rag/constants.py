@@ -1,6 +1,14 @@
+import os
+
 QDRANT_URL=""
 QDRANT_API_KEY=""
 COLLECTION_NAME="financial_reports_collection"
 
 OPENAI_KEY=""
-EMBEDDING_MODEL="text-embedding-ada-002"
\ No newline at end of file
+EMBEDDING_MODEL="text-embedding-ada-002"
+
+# User agent for requests to SEC EDGAR, e.g. "YourName (your-email@example.com)"
+SEC_USER_AGENT=""
+
+# The list of companies that the ticker index is built from until it is refreshed from SEC EDGAR
+TICKER_INDEX_SEED_FILEPATH=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Ingress", "company_tickers_exchange.json")